@@ -0,0 +1,2 @@
+# Puts Helpers/ on sys.path so the tests import figma_generator when pytest
+# runs from the repository root
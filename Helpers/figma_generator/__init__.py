@@ -0,0 +1,158 @@
+"""
+Design token generators for Figma boards.
+
+Every function is pure unless it is one of the explicit file helpers, so the
+package can stay loaded in a long-lived worker. Submodules are imported on
+first attribute access; importing the package itself does no work and does
+not pull in NumPy.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    # colors
+    "hex_to_rgb": "colors",
+    "rgb_to_hsl": "colors",
+    "hsl_to_rgb": "colors",
+    "rgb_to_hex": "colors",
+    "normalize_hex": "colors",
+    # palette
+    "DEFAULT_COLORS": "palette",
+    "DEFAULT_SHADE_VALUES": "palette",
+    "generate_shade_grid": "palette",
+    "rgb_array_to_hex": "palette",
+    "generate_palette": "palette",
+    "LazyPalette": "ramps",
+    "shade_key": "ramps",
+    "parse_shade_key": "ramps",
+    "render_palette_svg": "palette",
+    "write_palette_svg": "palette",
+    "build_palette_tree": "palette",
+    # perceptual
+    "COLOR_SPACES": "perceptual",
+    "perceptual_shade_grid": "perceptual",
+    "gamut_map": "perceptual",
+    # compact
+    "save_color_maps": "compact",
+    "load_color_maps": "compact",
+    "CompactColorMaps": "compact",
+    # contrast
+    "WCAG_LEVELS": "contrast",
+    "ContrastResult": "contrast",
+    "relative_luminance": "contrast",
+    "contrast_ratio": "contrast",
+    "semantic_pairs": "contrast",
+    "audit_index": "contrast",
+    "audit_indexes": "contrast",
+    # derive
+    "Role": "derive",
+    "ROLE_RULES": "derive",
+    "THEME_VARIANTS": "derive",
+    "derive_themes": "derive",
+    "derive_brand_themes": "derive",
+    # diff
+    "MapDiff": "diff",
+    "PatchRecorder": "diff",
+    "diff_maps": "diff",
+    "json_patch": "diff",
+    "apply_json_patch": "diff",
+    "svg_patch": "diff",
+    "apply_svg_patch": "diff",
+    "diff_builds": "diff",
+    "apply_patches": "diff",
+    # exporters
+    "EXPORTERS": "exporters",
+    "ResolvedModel": "exporters",
+    "register_exporter": "exporters",
+    "export_tokens": "exporters",
+    # nearest
+    "PaletteIndex": "nearest",
+    "Match": "nearest",
+    "rewrite_css": "nearest",
+    # semantic
+    "render_semantic_svg": "semantic",
+    "write_semantic_svg": "semantic",
+    "render_token_svg": "semantic",
+    "build_semantics_tree": "semantic",
+    "layout_semantics": "semantic",
+    "group_svgs_by_theme_and_category": "semantic",
+    # tokens
+    "TokenIndex": "tokens",
+    "Token": "tokens",
+    "UnresolvedTokenError": "tokens",
+    # typography
+    "DEFAULT_TYPOGRAPHY": "typography",
+    "build_variations": "typography",
+    "generate_css": "typography",
+    "css_class_names": "typography",
+    "render_typography_svg": "typography",
+    "write_typography_svg": "typography",
+    "build_typography_tree": "typography",
+    "layout_typography": "typography",
+    "DEFAULT_TYPE_SCALE": "typography",
+    "build_type_scale": "typography",
+    "build_fluid_sizes": "typography",
+    "fluid_font_size": "typography",
+    # fonts
+    "FontMetrics": "fonts",
+    "load_font_metrics": "fonts",
+    "read_font_metrics": "fonts",
+    # svg
+    "SvgWriter": "svg",
+    "Group": "svg",
+    "Label": "svg",
+    "Swatch": "svg",
+    "Markup": "svg",
+    "write_tree": "svg",
+    # layout
+    "pack_shelves": "layout",
+    "bounding_box": "layout",
+    # templates
+    "SvgTemplate": "templates",
+    "TemplateNode": "templates",
+    "load_template": "templates",
+    "DEFAULT_TEMPLATES": "templates",
+    # cache
+    "GENERATOR_VERSION": "cache",
+    "input_key": "cache",
+    "BuildCache": "cache",
+    "FragmentCache": "cache",
+    "render_to_string": "svg",
+    # push
+    "FigmaClient": "push",
+    "FigmaError": "push",
+    "MockFigmaServer": "push",
+    "PushState": "push",
+    "push_payload": "push",
+    "push_brands": "push",
+    # profiling
+    "Profiler": "profiling",
+    # files
+    "load_json": "files",
+    "save_json": "files",
+    "save_to_file": "files",
+    "save_svg": "files",
+    # server
+    "TokenStore": "server",
+    "start_server": "server",
+    # batch
+    "load_brand_spec": "batch",
+    "generate_brand": "batch",
+    "run_batch": "batch",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
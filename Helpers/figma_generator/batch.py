@@ -0,0 +1,543 @@
+"""
+Batch generation of many design systems over a process pool.
+
+Each *.json file in the specs directory describes one brand:
+
+    {
+        "name": "acme",
+        "colors": {"primary": "ffc800", "grey": "6B7280"},
+        "shade_values": [0, 10, 20, 50, 80, 90, 100],
+        "color_space": "oklch",
+        "minify": true,
+        "templates": {"palette": "swatch.svg"},
+        "layout": {"columns": 12, "max_width": 4000},
+        "themes": {"light": "light.json", "dark": {"primary": "primary-400"}},
+        "typography": {"font_family": "Inter", "bold_weight": "800"},
+        "font_dirs": ["fonts/"],
+        "type_scale": {"base_size": 16, "ratio": 1.25},
+        "breakpoints": {"768": 1.125, "1280": 1.25},
+        "derive_themes": {"dark_dimmed": {"base": "dark", "surface_offset": 6}}
+    }
+
+Only "colors" is required. The name defaults to the file name, shade values
+to DEFAULT_SHADE_VALUES, the color space to "hsl" ("oklch" and "lab" are
+perceptual), themes to the material templates (inline dicts or paths
+relative to the spec file) and typography to DEFAULT_TYPOGRAPHY. "minify"
+writes the SVG boards and the typography CSS in their minified form.
+"templates" maps "palette", "semantic" and "typography" to SVG components
+(paths relative to the spec file) that replace the built-in board markup;
+true uses the ones in template_svg. "layout" sets the swatches per row of a
+color group ("columns") and the canvas width the boards pack their groups
+and columns into ("max_width"). "type_scale" replaces the fixed typography
+sizes with a modular scale and writes fluid clamp() font sizes to the CSS;
+true uses DEFAULT_TYPE_SCALE, a dict overrides some of its keys.
+"breakpoints" maps viewport min-widths to font-size scales, each written as
+a media query of the CSS. "derive_themes" computes the themes from the
+palette with the role rules of derive.py instead of the material templates:
+true derives every THEME_VARIANTS entry, a dict maps theme names to variant
+options and derives them next to light and dark. Themes listed in "themes"
+still take precedence. "font_dirs" lists font directories (relative to the
+spec file) the typography board is measured with, true searches the system
+ones; by default it uses the built-in metrics of fonts.py.
+
+Usage:
+    python -m figma_generator.batch specs/ build/ --processes 8 --cache-dir .cache
+
+With --font-dir DIR (repeatable), brands without their own "font_dirs" are
+measured with the fonts in DIR.
+
+With --patches DIR, every brand also gets DIR/<name>/ with a changelog of
+its tokens and minimal patches of the rewritten artifacts (see diff.py).
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import BuildCache, input_key
+from .compact import save_color_maps
+from .derive import THEME_VARIANTS, derive_themes
+from .diff import PatchRecorder
+from .files import TEMPLATE_DIR, load_json, save_json, save_svg, save_to_file
+from .fonts import font_dirs as system_font_dirs
+from .fonts import font_files
+from .palette import (
+    DEFAULT_SHADE_VALUES,
+    ELEMENTS_PER_ROW,
+    generate_palette,
+    write_palette_svg,
+)
+from .profiling import active_profiler, disable, enable, profiled, stage
+from .semantic import write_semantic_svg
+from .templates import DEFAULT_TEMPLATES, load_template
+from .tokens import TokenIndex
+from .typography import (
+    TYPOGRAPHY_FILENAME,
+    DEFAULT_TYPE_SCALE,
+    DEFAULT_TYPOGRAPHY,
+    build_fluid_sizes,
+    build_type_scale,
+    build_variations,
+    generate_css,
+    write_typography_svg,
+)
+
+THEME_NAMES = ("light", "dark")
+
+
+def load_brand_spec(spec_path, font_dirs=None):
+    """
+    Loads a brand spec and fills in the defaults.
+
+    Args:
+        spec_path (str): Path to the brand's JSON spec.
+        font_dirs (list): Font directories for specs without "font_dirs".
+
+    Returns:
+        dict: Spec with "name", "colors", "shade_values", "color_space",
+        "minify", "templates", "layout", "themes", "typography",
+        "type_scale", "breakpoints", "derive_themes" and "font_dirs" keys;
+        "type_scale" is None for fixed sizes, "derive_themes" (theme
+        name -> variant options) None for the material templates and
+        "font_dirs" None for the built-in font metrics.
+    """
+    spec = load_json(spec_path)
+    spec_dir = os.path.dirname(os.path.abspath(spec_path))
+    if "colors" not in spec:
+        raise ValueError(f"{spec_path}: brand spec has no 'colors'")
+
+    derived = spec.get("derive_themes")
+    if derived is True:
+        derived = dict(THEME_VARIANTS)
+    elif derived is not None:
+        derived = {name: THEME_VARIANTS[name] for name in THEME_NAMES} | derived
+
+    themes = {}
+    for theme_name in THEME_NAMES:
+        theme = spec.get("themes", {}).get(theme_name)
+        if theme is None:
+            if derived is not None:
+                continue
+            theme = os.path.join(TEMPLATE_DIR, f"{theme_name}_theme_semantic.json")
+        elif isinstance(theme, str):
+            theme = os.path.join(spec_dir, theme)
+        themes[theme_name] = load_json(theme) if isinstance(theme, str) else theme
+
+    templates = spec.get("templates", {})
+    if templates is True:
+        templates = dict(DEFAULT_TEMPLATES)
+    unknown = set(templates) - set(DEFAULT_TEMPLATES)
+    if unknown:
+        raise ValueError(f"{spec_path}: unknown template boards {sorted(unknown)}")
+    templates = {
+        board: os.path.join(spec_dir, path) for board, path in templates.items()
+    }
+
+    spec_fonts = spec.get("font_dirs")
+    if spec_fonts is True:
+        font_dirs = system_font_dirs()
+    elif spec_fonts is not None:
+        font_dirs = [os.path.join(spec_dir, path) for path in spec_fonts]
+    if font_dirs is not None:
+        font_dirs = tuple(font_dirs)
+
+    type_scale = spec.get("type_scale")
+    if type_scale is True:
+        type_scale = {}
+    if type_scale is not None:
+        type_scale = {**DEFAULT_TYPE_SCALE, **type_scale}
+
+    return {
+        "name": spec.get("name", os.path.splitext(os.path.basename(spec_path))[0]),
+        "colors": spec["colors"],
+        "shade_values": spec.get("shade_values", DEFAULT_SHADE_VALUES),
+        "color_space": spec.get("color_space", "hsl"),
+        "minify": bool(spec.get("minify", False)),
+        "templates": templates,
+        "layout": spec.get("layout", {}),
+        "themes": themes,
+        "typography": {**DEFAULT_TYPOGRAPHY, **spec.get("typography", {})},
+        "type_scale": type_scale,
+        "breakpoints": spec.get("breakpoints", {}),
+        "derive_themes": derived,
+        "font_dirs": font_dirs,
+    }
+
+
+@profiled("brand")
+def generate_brand(spec, output_dir, cache_dir=None, patch_dir=None):
+    """
+    Writes every artifact of one brand to its own folder.
+
+    Args:
+        spec (dict): Brand spec as returned by load_brand_spec.
+        output_dir (str): Parent directory; files go to output_dir/<name>/.
+        cache_dir (str): Optional build cache directory. Artifacts whose
+            inputs are unchanged are skipped, and boards only re-render the
+            color groups and categories that changed.
+        patch_dir (str): Optional parent directory of the brand's patches;
+            the changelog and patches against the previous files go to
+            patch_dir/<name>/.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    brand_dir = os.path.join(output_dir, spec["name"])
+    os.makedirs(brand_dir, exist_ok=True)
+    cache = None
+    if cache_dir is not None:
+        cache = BuildCache(os.path.join(cache_dir, spec["name"]))
+    colors, shade_values = spec["colors"], spec["shade_values"]
+    color_space = spec.get("color_space", "hsl")
+    palette_inputs = (colors, shade_values, color_space)
+    # Minified boards are written whole, fragments are cached unminified
+    minify = spec.get("minify", False)
+    templates = {
+        board: load_template(path)
+        for board, path in spec.get("templates", {}).items()
+    }
+    # The compiled plans key the boards, so editing a template rebuilds them
+    plans = {board: template.plan for board, template in templates.items()}
+    layout = spec.get("layout", {})
+    columns = layout.get("columns", ELEMENTS_PER_ROW)
+    max_width = layout.get("max_width")
+    typography = dict(spec["typography"])
+    font_family = typography.pop("font_family")
+    type_scale = spec.get("type_scale")
+    if type_scale is None:
+        variations = build_variations(**typography)
+        fluid_sizes = None
+    else:
+        # The scale replaces the fixed sizes, only the weights carry over
+        variations = build_type_scale(
+            type_scale["base_size"],
+            type_scale["ratio"],
+            typography["bold_weight"],
+            typography["regular_weight"],
+            typography["light_weight"],
+        )
+        fluid_sizes = build_fluid_sizes(type_scale)
+    breakpoints = spec.get("breakpoints", {})
+    font_dirs = spec.get("font_dirs")
+    typography_inputs = (font_family, variations, minify, plans.get("typography"))
+    if font_dirs is not None:
+        # The board is measured with these fonts, so they key it too
+        typography_inputs += (font_files(font_dirs),)
+
+    # The palette, the derived themes and the token index are only computed
+    # if an artifact that needs them is stale
+    computed = {}
+
+    def color_map():
+        if "color_map" not in computed:
+            computed["color_map"] = generate_palette(colors, shade_values, color_space)
+        return computed["color_map"]
+
+    # Theme name -> the inputs of its template, known without deriving it.
+    # Explicit templates take precedence over the derived ones
+    variants = spec.get("derive_themes")
+    theme_inputs = {
+        theme: (*palette_inputs, variant) for theme, variant in (variants or {}).items()
+    }
+    theme_inputs.update(spec["themes"])
+
+    def themes():
+        if "themes" not in computed:
+            computed["themes"] = spec["themes"]
+            if variants:
+                derived = derive_themes(color_map(), variants)
+                computed["themes"] = {**derived, **spec["themes"]}
+        return computed["themes"]
+
+    def token_index():
+        if "token_index" not in computed:
+            computed["token_index"] = TokenIndex.from_maps(color_map(), themes())
+        return computed["token_index"]
+
+    # (file name, inputs, build(path, fragment_cache))
+    artifacts = [
+        (
+            "primitive_colors_map.json",
+            palette_inputs,
+            lambda path, fragments: save_json(path, color_map()),
+        ),
+        (
+            "primitive_colors.svg",
+            (*palette_inputs, minify, plans.get("palette"), columns, max_width),
+            lambda path, fragments: save_svg(
+                path,
+                write_palette_svg,
+                colors,
+                shade_values,
+                None if minify else fragments,
+                color_space,
+                minify,
+                templates.get("palette"),
+                columns,
+                max_width,
+            ),
+        ),
+        (
+            "semantic.svg",
+            (
+                *palette_inputs,
+                theme_inputs["light"],
+                theme_inputs["dark"],
+                minify,
+                plans.get("semantic"),
+                max_width,
+            ),
+            lambda path, fragments: save_svg(
+                path,
+                write_semantic_svg,
+                token_index(),
+                None if minify else fragments,
+                minify,
+                templates.get("semantic"),
+                max_width,
+            ),
+        ),
+        (
+            "token_index.bin",
+            (*palette_inputs, theme_inputs),
+            lambda path, fragments: token_index().save(path),
+        ),
+        (
+            "color_maps.bin",
+            (*palette_inputs, theme_inputs),
+            lambda path, fragments: save_color_maps(
+                path,
+                {
+                    "primitive_colors_map": color_map(),
+                    **{
+                        f"{theme}_theme_colors": token_index().theme_colors(theme)
+                        for theme in theme_inputs
+                    },
+                },
+            ),
+        ),
+    ]
+    for theme_name in theme_inputs:
+        artifacts.append(
+            (
+                f"{theme_name}_theme_colors.json",
+                (*palette_inputs, theme_inputs[theme_name]),
+                lambda path, fragments, theme=theme_name: save_json(
+                    path, token_index().theme_colors(theme)
+                ),
+            )
+        )
+        if variants:
+            # The derived templates, in the shape of the material ones
+            artifacts.append(
+                (
+                    f"{theme_name}_theme_semantic.json",
+                    (theme_inputs[theme_name],),
+                    lambda path, fragments, theme=theme_name: save_json(
+                        path, themes()[theme]
+                    ),
+                )
+            )
+    artifacts += [
+        (
+            TYPOGRAPHY_FILENAME,
+            (font_family, variations),
+            lambda path, fragments: save_json(
+                path, {"font_family": font_family, "variations": variations}
+            ),
+        ),
+        (
+            "custom_typography.css",
+            (font_family, variations, type_scale, breakpoints, minify),
+            lambda path, fragments: save_to_file(
+                path,
+                generate_css(
+                    font_family, variations, fluid_sizes, breakpoints, minify
+                ),
+            ),
+        ),
+        (
+            "typography_variations.svg",
+            typography_inputs,
+            lambda path, fragments: save_svg(
+                path,
+                write_typography_svg,
+                font_family,
+                variations,
+                minify,
+                templates.get("typography"),
+                font_dirs,
+            ),
+        ),
+    ]
+
+    recorder = None
+    if patch_dir is not None:
+        recorder = PatchRecorder(os.path.join(patch_dir, spec["name"]), spec["name"])
+
+    written = []
+    for filename, inputs, build in artifacts:
+        path = os.path.join(brand_dir, filename)
+        with stage("artifact", brand=spec["name"], file=filename):
+            key = None
+            if cache is not None:
+                key = input_key(filename, inputs)
+                if cache.is_fresh(path, key):
+                    continue
+            if recorder is not None:
+                recorder.before(path)
+            if cache is None:
+                written.append(build(path, None))
+            else:
+                fragments = cache.fragments(filename)
+                written.append(build(path, fragments))
+                cache.record(path, key)
+                cache.save_fragments(filename, fragments)
+            if recorder is not None:
+                recorder.after(path)
+
+    if cache is not None:
+        cache.save()
+    if recorder is not None and written:
+        recorder.save()
+    return written
+
+
+def _generate_brand_from_file(task):
+    # Top-level so it can be pickled for the process pool
+    spec_path, output_dir, cache_dir, patch_dir, font_dirs, allocations = task
+    if allocations is None:
+        spec = load_brand_spec(spec_path, font_dirs)
+        return generate_brand(spec, output_dir, cache_dir, patch_dir), []
+
+    # Record into a fresh profiler and send its events back to the parent
+    profiler = enable(allocations=allocations)
+    try:
+        spec = load_brand_spec(spec_path, font_dirs)
+        written = generate_brand(spec, output_dir, cache_dir, patch_dir)
+    finally:
+        disable()
+    return written, profiler.events
+
+
+def run_batch(
+    spec_dir,
+    output_dir,
+    processes=None,
+    cache_dir=None,
+    patch_dir=None,
+    font_dirs=None,
+):
+    """
+    Generates every brand in a directory of specs in parallel.
+
+    Args:
+        spec_dir (str): Directory holding one *.json spec per brand.
+        output_dir (str): Directory receiving one folder per brand.
+        processes (int): Worker processes; defaults to the CPU count.
+        cache_dir (str): Optional build cache; see generate_brand.
+        patch_dir (str): Optional directory of per-brand patches; see
+            generate_brand.
+        font_dirs (list): Font directories for the brands whose spec has no
+            "font_dirs"; see load_brand_spec.
+
+    While a profiler is enabled, the workers profile their brands too and
+    their stages are added to it, one trace process per worker.
+
+    Returns:
+        dict: "brands", "files", "seconds" and "brands_per_second".
+    """
+    spec_paths = sorted(
+        os.path.join(spec_dir, filename)
+        for filename in os.listdir(spec_dir)
+        if filename.endswith(".json")
+    )
+    profiler = active_profiler()
+    allocations = None if profiler is None else profiler.allocations
+    tasks = [
+        (spec_path, output_dir, cache_dir, patch_dir, font_dirs, allocations)
+        for spec_path in spec_paths
+    ]
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Hand out several brands per task so small specs don't drown in IPC
+    workers = processes or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+
+    start = time.perf_counter()
+    files = 0
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for written, events in executor.map(
+            _generate_brand_from_file, tasks, chunksize=chunksize
+        ):
+            files += len(written)
+            if profiler is not None:
+                profiler.events.extend(events)
+    seconds = time.perf_counter() - start
+
+    return {
+        "brands": len(tasks),
+        "files": files,
+        "seconds": seconds,
+        "brands_per_second": len(tasks) / seconds if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate palettes, themes and typography for many brands."
+    )
+    parser.add_argument("spec_dir", help="directory of brand spec JSON files")
+    parser.add_argument("output_dir", help="directory for per-brand output folders")
+    parser.add_argument(
+        "--processes", type=int, default=None, help="worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--cache-dir", default=None, help="skip artifacts whose inputs are unchanged"
+    )
+    parser.add_argument(
+        "--patches",
+        metavar="DIR",
+        help="write a changelog and minimal patches of every rewritten brand",
+    )
+    parser.add_argument(
+        "--font-dir",
+        action="append",
+        metavar="DIR",
+        help="measure the typography boards with the fonts in DIR (repeatable)",
+    )
+    parser.add_argument(
+        "--profile", metavar="TRACE", help="write a Chrome trace of every stage"
+    )
+    parser.add_argument(
+        "--profile-allocations",
+        action="store_true",
+        help="also track allocations per stage (slow)",
+    )
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.profile:
+        profiler = enable(allocations=args.profile_allocations)
+
+    summary = run_batch(
+        args.spec_dir,
+        args.output_dir,
+        args.processes,
+        args.cache_dir,
+        args.patches,
+        args.font_dir,
+    )
+    print(
+        f"Generated {summary['brands']} brands ({summary['files']} files) in "
+        f"{summary['seconds']:.2f}s: {summary['brands_per_second']:.1f} brands/s"
+    )
+    if profiler is not None:
+        disable()
+        print(profiler.format_summary())
+        print(f"Trace written to {profiler.save(args.profile)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Benchmark suite for the palette, semantic and typography generators.
+
+Every case builds synthetic inputs, then records the best wall time over a
+few runs, the peak traced memory of one more run and the number of bytes
+produced. Results can be stored as a baseline and later runs compared
+against it; cases that got slower or bigger than the tolerance allows are
+flagged and the command exits with status 1.
+
+Usage:
+    python -m figma_generator.bench                     # quick matrix
+    python -m figma_generator.bench --full              # 10-10,000 colors, 50-1,000 stops
+    python -m figma_generator.bench --save-baseline bench.json
+    python -m figma_generator.bench --baseline bench.json --tolerance 0.25
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from .palette import generate_palette, write_palette_svg
+from .semantic import RECOGNIZED_CATEGORIES, write_semantic_svg
+from .tokens import TokenIndex
+from .typography import generate_css, write_typography_svg
+
+QUICK_COLORS = [10, 100, 1000]
+QUICK_STOPS = [50]
+QUICK_TOKENS = [100, 1000]
+QUICK_VARIANTS = [100, 1000]
+
+FULL_COLORS = [10, 100, 1000, 10000]
+FULL_STOPS = [50, 200, 1000]
+FULL_TOKENS = [100, 1000, 10000]
+FULL_VARIANTS = [100, 1000, 10000]
+
+
+class _CountingSink:
+    # Text stream that only counts what is written to it
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+
+# Synthetic inputs
+def synthetic_colors(count, seed=0):
+    rng = random.Random(seed)
+    return {f"color{i}": "%06x" % rng.randrange(1 << 24) for i in range(count)}
+
+
+def synthetic_stops(count):
+    # Evenly spread, unique lightness stops between 0 and 100
+    if count == 1:
+        return [50]
+    return [round(i * 100 / (count - 1), 3) for i in range(count)]
+
+
+def synthetic_themes(color_map, count, seed=0):
+    rng = random.Random(seed)
+    primitives = list(color_map)
+    prefixes = RECOGNIZED_CATEGORIES + ["outline"]
+    themes = {}
+    for theme in ("light", "dark"):
+        themes[theme] = {
+            f"{prefixes[i % len(prefixes)]}_{i}": rng.choice(primitives)
+            for i in range(count)
+        }
+    return themes
+
+
+def synthetic_variations(count, per_group=10):
+    variations = {}
+    for i in range(count):
+        group = variations.setdefault(f"Group {i // per_group}", {})
+        group[f"Variant {i % per_group}"] = (str(10 + i % 40), "1.4", "400")
+    return variations
+
+
+# Cases: (name, params, setup) where setup returns a zero-argument callable
+# that runs the generator and returns the number of bytes it produced
+def _palette_case(colors, stops):
+    def setup():
+        color_inputs = synthetic_colors(colors)
+        shade_values = synthetic_stops(stops)
+
+        def run():
+            color_map = generate_palette(color_inputs, shade_values)
+            return len(json.dumps(color_map))
+
+        return run
+
+    return "generate_palette", {"colors": colors, "stops": stops}, setup
+
+
+def _palette_svg_case(colors, stops):
+    def setup():
+        color_inputs = synthetic_colors(colors)
+        shade_values = synthetic_stops(stops)
+
+        def run():
+            sink = _CountingSink()
+            write_palette_svg(sink, color_inputs, shade_values)
+            return sink.size
+
+        return run
+
+    return "write_palette_svg", {"colors": colors, "stops": stops}, setup
+
+
+def _semantic_svg_case(tokens):
+    def setup():
+        color_map = generate_palette(synthetic_colors(20), synthetic_stops(50))
+        index = TokenIndex.from_maps(color_map, synthetic_themes(color_map, tokens))
+
+        def run():
+            sink = _CountingSink()
+            write_semantic_svg(sink, index)
+            return sink.size
+
+        return run
+
+    return "write_semantic_svg", {"tokens": tokens}, setup
+
+
+def _typography_svg_case(variants):
+    def setup():
+        variations = synthetic_variations(variants)
+
+        def run():
+            sink = _CountingSink()
+            write_typography_svg(sink, "Roboto", variations)
+            return sink.size
+
+        return run
+
+    return "write_typography_svg", {"variants": variants}, setup
+
+
+def _typography_css_case(variants):
+    def setup():
+        variations = synthetic_variations(variants)
+        return lambda: len(generate_css("Roboto", variations))
+
+    return "generate_css", {"variants": variants}, setup
+
+
+def build_cases(full=False):
+    colors = FULL_COLORS if full else QUICK_COLORS
+    stops = FULL_STOPS if full else QUICK_STOPS
+    tokens = FULL_TOKENS if full else QUICK_TOKENS
+    variants = FULL_VARIANTS if full else QUICK_VARIANTS
+
+    cases = []
+    for color_count in colors:
+        for stop_count in stops:
+            cases.append(_palette_case(color_count, stop_count))
+            cases.append(_palette_svg_case(color_count, stop_count))
+    cases += [_semantic_svg_case(count) for count in tokens]
+    cases += [_typography_svg_case(count) for count in variants]
+    cases += [_typography_css_case(count) for count in variants]
+    return cases
+
+
+def case_id(name, params):
+    return name + "[" + ",".join(f"{key}={value}" for key, value in params.items()) + "]"
+
+
+def measure(run, repeat=3):
+    """
+    Measures one benchmark callable.
+
+    Wall time is the best of `repeat` untraced runs; peak memory comes from
+    a separate run under tracemalloc, which would otherwise skew the timing.
+
+    Returns:
+        dict: "seconds", "peak_bytes" and "output_bytes".
+    """
+    best = float("inf")
+    output_bytes = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        output_bytes = run()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": best, "peak_bytes": peak, "output_bytes": output_bytes}
+
+
+def run_benchmarks(cases, repeat=3, report=print):
+    results = {}
+    for name, params, setup in cases:
+        key = case_id(name, params)
+        results[key] = measure(setup(), repeat)
+        result = results[key]
+        report(
+            f"{key:<52} {result['seconds'] * 1000:>10.2f} ms "
+            f"{result['peak_bytes'] / 2**20:>9.2f} MiB peak "
+            f"{result['output_bytes'] / 2**20:>9.2f} MiB out"
+        )
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Flags cases that regressed against a baseline.
+
+    Output size must match exactly; time and peak memory may grow by
+    `tolerance` (a fraction) before they are flagged.
+
+    Returns:
+        list: Human-readable regression messages.
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{key}: {metric} {previous[metric]:.4g} -> {result[metric]:.4g}"
+                )
+        if result["output_bytes"] != previous["output_bytes"]:
+            regressions.append(
+                f"{key}: output_bytes "
+                f"{previous['output_bytes']} -> {result['output_bytes']}"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the generators.")
+    parser.add_argument("--full", action="store_true", help="run the full size matrix")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--filter", default="", help="only run cases containing this")
+    parser.add_argument("--baseline", help="compare against this baseline JSON")
+    parser.add_argument("--save-baseline", help="write the results to this JSON")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown or memory growth as a fraction (default 0.2)",
+    )
+    args = parser.parse_args(argv)
+
+    cases = [
+        case
+        for case in build_cases(args.full)
+        if args.filter in case_id(case[0], case[1])
+    ]
+    results = run_benchmarks(cases, args.repeat)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=4)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
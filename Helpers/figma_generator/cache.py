@@ -0,0 +1,139 @@
+"""
+Content-addressed build cache.
+
+Every artifact is keyed by a hash of its inputs and GENERATOR_VERSION. An
+artifact whose key and file on disk are unchanged since the last build is
+skipped. Boards that have to be rebuilt reuse the rendered color groups and
+category columns whose own inputs did not change.
+
+Layout of a cache directory:
+
+    manifest.json               artifact path -> [key, size, mtime_ns]
+    fragments/<artifact>.json   fragment key -> rendered markup
+"""
+
+import hashlib
+import json
+import os
+
+from .svg import Markup, render_to_string, write_tree
+
+# Bump whenever a change to the generators alters their output
+GENERATOR_VERSION = "6"
+
+
+def input_key(*parts):
+    """
+    Hashes JSON-serializable inputs together with GENERATOR_VERSION.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = json.dumps(
+        [GENERATOR_VERSION, parts], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FragmentCache:
+    """
+    Rendered board fragments keyed by the hash of their inputs.
+
+    Only fragments looked up or stored during a build are kept when the
+    cache is saved, so stale entries do not pile up.
+    """
+
+    key = staticmethod(input_key)
+
+    def __init__(self, fragments=None):
+        self._fragments = fragments or {}
+        self._used = {}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r") as file:
+            return cls(json.load(file))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self._used, file, separators=(",", ":"))
+
+    def __contains__(self, key):
+        return key in self._fragments or key in self._used
+
+    def node(self, key):
+        # Reuse a fragment rendered by a previous build
+        markup = self._used.get(key)
+        if markup is None:
+            markup = self._used[key] = self._fragments[key]
+        return Markup(markup)
+
+    def store(self, key, node):
+        # Render a freshly built node once and keep the markup
+        markup = self._used[key] = render_to_string(write_tree, node)
+        return Markup(markup)
+
+    @property
+    def used(self):
+        return bool(self._used)
+
+
+class BuildCache:
+    """
+    Manifest of built artifacts for one output folder.
+
+    Args:
+        cache_dir (str): Directory holding the manifest and fragments.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._manifest_path = os.path.join(cache_dir, "manifest.json")
+        self._manifest = {}
+        self._dirty = False
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, "r") as file:
+                self._manifest = json.load(file)
+
+    @staticmethod
+    def _stamp(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def is_fresh(self, artifact_path, key):
+        """
+        Checks whether an artifact was built from the same inputs and has
+        not been modified or removed since.
+        """
+        entry = self._manifest.get(artifact_path)
+        if entry is None or entry[0] != key:
+            return False
+        try:
+            return entry[1:] == self._stamp(artifact_path)
+        except FileNotFoundError:
+            return False
+
+    def record(self, artifact_path, key):
+        self._manifest[artifact_path] = [key] + self._stamp(artifact_path)
+        self._dirty = True
+
+    def _fragments_path(self, artifact_name):
+        return os.path.join(self.cache_dir, "fragments", f"{artifact_name}.json")
+
+    def fragments(self, artifact_name):
+        return FragmentCache.load(self._fragments_path(artifact_name))
+
+    def save_fragments(self, artifact_name, fragment_cache):
+        if fragment_cache.used:
+            fragment_cache.save(self._fragments_path(artifact_name))
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._manifest_path, "w") as file:
+            json.dump(self._manifest, file, indent=4)
+        self._dirty = False
@@ -0,0 +1,130 @@
+# Color conversion utility functions
+def hex_to_rgb(hex_color):
+    """
+    Converts a Hex color string to RGB format.
+
+    Args:
+        hex_color (str): Hex color string, with or without a leading "#".
+            The string is read two digits at a time, so a short value such
+            as "f87c4" parses as (0xf8, 0x7c, 0x4).
+
+    Returns:
+        tuple: RGB color tuple.
+    """
+    value = hex_color.lstrip("#")
+    return tuple(int(value[i : i + 2], 16) for i in (0, 2, 4))
+
+
+def normalize_hex(hex_color):
+    """
+    Validates a Hex color string and expands it to six lowercase digits.
+
+    Args:
+        hex_color (str): "#rgb" or "#rrggbb", with or without the "#".
+
+    Returns:
+        str: Six lowercase hex digits without "#".
+
+    Raises:
+        ValueError: If the string is not a three or six digit hex color.
+    """
+    value = hex_color.lstrip("#")
+    if len(value) == 3:
+        value = "".join(digit * 2 for digit in value)
+    try:
+        if len(value) != 6:
+            raise ValueError
+        int(value, 16)
+    except ValueError:
+        raise ValueError(f"invalid hex color {hex_color!r}") from None
+    return value.lower()
+
+
+def rgb_to_hsl(rgb):
+    """
+    Converts RGB color format to HSL format.
+
+    Args:
+        rgb (tuple): RGB color tuple.
+
+    Returns:
+        tuple: HSL color tuple.
+    """
+    # Convert RGB values to a range of [0, 1]
+    r, g, b = [x / 255.0 for x in rgb]
+    # Determine the min and max RGB values
+    max_color = max(r, g, b)
+    min_color = min(r, g, b)
+    # Calculate lightness
+    l = (max_color + min_color) / 2
+
+    # Calculate hue and saturation
+    if max_color == min_color:
+        h = s = 0  # achromatic
+    else:
+        d = max_color - min_color
+        s = d / (2 - max_color - min_color) if l > 0.5 else d / (max_color + min_color)
+        # Calculate hue based on which color is max
+        if max_color == r:
+            h = (g - b) / d + (6 if g < b else 0)
+        elif max_color == g:
+            h = (b - r) / d + 2
+        else:
+            h = (r - g) / d + 4
+        h /= 6
+
+    return h, s, l
+
+
+def hsl_to_rgb(hsl):
+    """
+    Converts HSL color format to RGB format.
+
+    Args:
+        hsl (tuple): HSL color tuple.
+
+    Returns:
+        tuple: RGB color tuple.
+    """
+    h, s, l = hsl
+
+    def hue_to_rgb(p, q, t):
+        """
+        Helper function for converting hue to RGB.
+        """
+        if t < 0:
+            t += 1
+        if t > 1:
+            t -= 1
+        if t < 1 / 6:
+            return p + (q - p) * 6 * t
+        if t < 1 / 2:
+            return q
+        if t < 2 / 3:
+            return p + (q - p) * (2 / 3 - t) * 6
+        return p
+
+    # Calculate RGB values from HSL
+    if s == 0:
+        r = g = b = l  # achromatic
+    else:
+        q = l * (1 + s) if l < 0.5 else l + s - l * s
+        p = 2 * l - q
+        r = hue_to_rgb(p, q, h + 1 / 3)
+        g = hue_to_rgb(p, q, h)
+        b = hue_to_rgb(p, q, h - 1 / 3)
+
+    return int(r * 255), int(g * 255), int(b * 255)
+
+
+def rgb_to_hex(rgb):
+    """
+    Converts RGB color format to Hex format.
+
+    Args:
+        rgb (tuple): RGB color tuple.
+
+    Returns:
+        str: Hex color string.
+    """
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
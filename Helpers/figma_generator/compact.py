@@ -0,0 +1,327 @@
+"""
+Compact binary color maps.
+
+Stores one or more name -> hex maps (primitive_colors_map.json, the
+*_theme_colors.json files) in a single file. Keys are split at their last
+"-" ("grey-variant" + "400") and both parts go to a deduplicated string
+table shared by every map, so ramp names, shade suffixes and semantic names
+repeated across themes are stored once. Colors are packed as 3-byte RGB.
+Values that do not round-trip through "#rrggbb" (uppercase hex such as the
+unresolved "#FFFFFF", short or malformed colors) are kept verbatim as
+exceptions, so converting back to JSON is lossless.
+
+Layout (little endian):
+
+    header          "<8sII": magic, map count, string id width (2 or 4 bytes)
+    directory       "<IIII" per map: name string id, entry count,
+                    exception count, data offset
+    string table    see pack_strings
+    map data        per map at its offset, each array padded to 4 bytes:
+                    (head, tail) string id pairs per key, the head being
+                    all ones for keys without "-"; uint32 (entry, string
+                    id) exception pairs; uint8 RGB
+
+Usage:
+    python -m figma_generator.compact pack tokens.bin \
+        primitive_colors_map.json light_theme_colors.json dark_theme_colors.json
+    python -m figma_generator.compact unpack tokens.bin out/
+"""
+
+import argparse
+import os
+import struct
+
+import numpy as np
+
+from .colors import hex_to_rgb, normalize_hex
+from .files import load_json, save_json
+
+COMPACT_MAGIC = b"FGCMAP02"
+_HEADER = struct.Struct("<8sII")
+_DIRECTORY_ENTRY = struct.Struct("<IIII")
+_STRING_TABLE = struct.Struct("<II")
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def _pad(size, alignment=4):
+    return -size % alignment
+
+
+def _id_dtype(width):
+    return np.dtype("<u2") if width == 2 else np.dtype("<u4")
+
+
+def _padded(array):
+    data = array.tobytes()
+    return data + b"\0" * _pad(len(data))
+
+
+def pack_strings(strings):
+    """
+    Encodes a string table, the one shared by the compact color maps and
+    the token index snapshot.
+
+    Layout: "<II" string count and byte size, then the strings as UTF-8
+    separated by newlines, padded to 4 bytes.
+
+    Args:
+        strings (list): Strings without newlines; position is the string id.
+
+    Returns:
+        bytes: The encoded table.
+    """
+    for text in strings:
+        if "\n" in text:
+            raise ValueError(f"table strings cannot contain newlines: {text!r}")
+    table = "\n".join(strings).encode("utf-8")
+    header = _STRING_TABLE.pack(len(strings), len(table))
+    return header + table + b"\0" * _pad(len(table))
+
+
+def unpack_strings(data, offset):
+    """
+    Decodes a string table written by pack_strings.
+
+    Args:
+        data: Buffer holding the table, e.g. a uint8 array.
+        offset (int): Position of the table in data.
+
+    Returns:
+        tuple: (list of strings, offset right after the padded table).
+    """
+    count, size = _STRING_TABLE.unpack_from(data, offset)
+    offset += _STRING_TABLE.size
+    strings = bytes(data[offset : offset + size]).decode("utf-8").split("\n")
+    return (strings if count else []), offset + size + _pad(size)
+
+
+def _pack_value(value):
+    # RGB of a hex value and whether "#rrggbb" reproduces it exactly
+    if not isinstance(value, str):
+        raise ValueError(f"color map values must be strings, got {value!r}")
+    try:
+        rgb = hex_to_rgb(normalize_hex(value))
+    except ValueError:
+        return (0, 0, 0), False
+    return rgb, value == "#%02x%02x%02x" % rgb
+
+
+def save_color_maps(path, maps):
+    """
+    Writes color maps to a compact binary file.
+
+    Args:
+        path (str): Destination file.
+        maps (dict): Map name -> (key -> hex) dict, e.g.
+            {"primitive_colors_map": {...}, "light_theme_colors": {...}}.
+
+    Returns:
+        str: The path written.
+    """
+    strings = {}
+
+    def string_id(text):
+        return strings.setdefault(text, len(strings))
+
+    sections = []
+    for name, color_map in maps.items():
+        name_id = string_id(name)
+        key_ids = np.empty((len(color_map), 2), dtype=np.int64)
+        rgb = np.empty((len(color_map), 3), dtype=np.uint8)
+        exceptions = []
+        for i, (key, value) in enumerate(color_map.items()):
+            head, separator, tail = key.rpartition("-")
+            key_ids[i] = (string_id(head) if separator else -1, string_id(tail))
+            rgb[i], exact = _pack_value(value)
+            if not exact:
+                exceptions.append((i, string_id(value)))
+        exceptions = np.asarray(exceptions, dtype="<u4").reshape(len(exceptions), 2)
+        sections.append((name_id, key_ids, exceptions, rgb))
+
+    # Two byte ids whenever the table is small enough, all ones marks "no head"
+    width = 2 if len(strings) < 0xFFFF else 4
+    id_dtype = _id_dtype(width)
+    string_table = pack_strings(list(strings))
+    offset = _HEADER.size + _DIRECTORY_ENTRY.size * len(sections)
+    offset += len(string_table)
+    directory = []
+    blobs = []
+    for name_id, key_ids, exceptions, rgb in sections:
+        key_ids[key_ids < 0] = np.iinfo(id_dtype).max
+        blob = _padded(key_ids.astype(id_dtype)) + _padded(exceptions) + _padded(rgb)
+        directory.append(
+            _DIRECTORY_ENTRY.pack(name_id, len(key_ids), len(exceptions), offset)
+        )
+        blobs.append(blob)
+        offset += len(blob)
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(COMPACT_MAGIC, len(sections), width))
+        file.write(b"".join(directory))
+        file.write(string_table)
+        file.write(b"".join(blobs))
+    return path
+
+
+def _hex_strings(rgb):
+    # "#rrggbb" for every row, formatted with a lookup table in one pass
+    chars = np.empty((len(rgb), 8), dtype=np.uint8)
+    chars[:, 0] = ord("#")
+    chars[:, 1:7:2] = _HEX_DIGITS[rgb >> 4]
+    chars[:, 2:7:2] = _HEX_DIGITS[rgb & 15]
+    chars[:, 7] = ord("\n")
+    return chars.tobytes().decode("ascii").split("\n")[:-1]
+
+
+class CompactColorMaps:
+    """
+    Reader for files written by save_color_maps.
+
+    Arrays are views into the file's buffer; with mmap=True nothing but the
+    header and string table is read until a map is accessed.
+
+    Args:
+        path (str): Compact color maps file.
+        mmap (bool): Memory-map the file instead of reading it.
+    """
+
+    def __init__(self, path, mmap=False):
+        if mmap:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            with open(path, "rb") as file:
+                data = np.frombuffer(file.read(), dtype=np.uint8)
+
+        magic, count, width = _HEADER.unpack_from(data)
+        if magic != COMPACT_MAGIC:
+            raise ValueError(f"{path} is not a compact color maps file")
+        entry_size = _DIRECTORY_ENTRY.size
+        directory = [
+            _DIRECTORY_ENTRY.unpack_from(data, _HEADER.size + i * entry_size)
+            for i in range(count)
+        ]
+        offset = _HEADER.size + _DIRECTORY_ENTRY.size * count
+        self.strings, _ = unpack_strings(data, offset)
+
+        # "<head>-" for every string, used to rebuild split keys
+        self._prefixes = [string + "-" for string in self.strings]
+
+        self._data = data
+        self._id_dtype = _id_dtype(width)
+        self._directory = {
+            self.strings[name_id]: (entries, exceptions, data_offset)
+            for name_id, entries, exceptions, data_offset in directory
+        }
+
+    @property
+    def names(self):
+        return list(self._directory)
+
+    def _arrays(self, name):
+        entries, exception_count, offset = self._directory[name]
+        data = self._data
+        size = 2 * entries * self._id_dtype.itemsize
+        key_ids = data[offset : offset + size].view(self._id_dtype)
+        offset += size + _pad(size)
+        exceptions = data[offset : offset + 8 * exception_count].view("<u4")
+        offset += 8 * exception_count
+        rgb = data[offset : offset + 3 * entries].reshape(entries, 3)
+        return key_ids.reshape(entries, 2), exceptions.reshape(exception_count, 2), rgb
+
+    def _keys(self, key_ids):
+        strings, prefixes = self.strings, self._prefixes
+        no_head = np.iinfo(self._id_dtype).max
+        return [
+            strings[tail] if head == no_head else prefixes[head] + strings[tail]
+            for head, tail in zip(key_ids[:, 0].tolist(), key_ids[:, 1].tolist())
+        ]
+
+    def keys(self, name):
+        return self._keys(self._arrays(name)[0])
+
+    def rgb(self, name):
+        """
+        Returns:
+            numpy.ndarray: uint8 view of shape (entries, 3) with the packed
+            colors of one map.
+        """
+        return self._arrays(name)[2]
+
+    def color_map(self, name):
+        """
+        Rebuilds one map exactly as it was saved.
+
+        Returns:
+            dict: Key -> hex, in the original order.
+        """
+        key_ids, exceptions, rgb = self._arrays(name)
+        values = _hex_strings(rgb)
+        for entry, string_id in exceptions.tolist():
+            values[entry] = self.strings[string_id]
+        return dict(zip(self._keys(key_ids), values))
+
+    def color_maps(self):
+        return {name: self.color_map(name) for name in self._directory}
+
+
+def load_color_maps(path, mmap=False):
+    """
+    Loads every map of a compact color maps file.
+
+    Returns:
+        dict: Map name -> (key -> hex) dict.
+    """
+    return CompactColorMaps(path, mmap).color_maps()
+
+
+def pack_json(path, json_paths):
+    """
+    Packs JSON color maps into one compact file, named after the JSON files.
+
+    Args:
+        path (str): Destination file.
+        json_paths (list): Paths of maps such as primitive_colors_map.json.
+    """
+    maps = {
+        os.path.splitext(os.path.basename(json_path))[0]: load_json(json_path)
+        for json_path in json_paths
+    }
+    return save_color_maps(path, maps)
+
+
+def unpack_json(path, output_dir):
+    """
+    Writes every map of a compact file back to <name>.json, formatted like
+    the generated artifacts.
+
+    Returns:
+        list: Paths of the written JSON files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    return [
+        save_json(os.path.join(output_dir, f"{name}.json"), color_map)
+        for name, color_map in load_color_maps(path).items()
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack or unpack compact color maps.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="pack JSON color maps into one file")
+    pack.add_argument("output")
+    pack.add_argument("json_files", nargs="+")
+    unpack = commands.add_parser("unpack", help="write the maps back as JSON")
+    unpack.add_argument("input")
+    unpack.add_argument("output_dir")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        pack_json(args.output, args.json_files)
+        print(f"Packed {len(args.json_files)} maps into {args.output}")
+    else:
+        written = unpack_json(args.input, args.output_dir)
+        print(f"Unpacked {len(written)} maps into {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
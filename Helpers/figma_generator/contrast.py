@@ -0,0 +1,340 @@
+"""
+WCAG contrast audit of the semantic color pairs.
+
+Every on_* token is paired with the surface it sits on (on_primary with
+primary, on_surface_variant with surface_variant or surface, inverse_on_surface
+with inverse_surface). The pairs of every theme of every brand are gathered
+into flat arrays and their contrast ratios are computed in one pass. For
+pairs below the target level, the foreground's primitive ramp is searched for
+the closest shade that passes.
+
+Usage:
+    python -m figma_generator.contrast                      # the repo's palette
+    python -m figma_generator.contrast build/*/ --level AAA --report audit.json
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from .files import DEFAULT_COLOR_MAP_PATH, DEFAULT_THEME_PATHS, load_json, save_json
+from .perceptual import srgb_to_linear
+from .tokens import TokenIndex
+
+# Minimum contrast ratios from WCAG 2.x
+WCAG_LEVELS = {"AA": 4.5, "AAA": 7.0, "AA-large": 3.0, "AAA-large": 4.5}
+
+# Weights of the linear R, G and B channels in relative luminance
+_LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+ContrastResult = namedtuple(
+    "ContrastResult",
+    [
+        "theme",
+        "foreground",
+        "background",
+        "foreground_hex",
+        "background_hex",
+        "ratio",
+        "aa",
+        "aaa",
+        "suggestion",
+        "suggestion_ratio",
+    ],
+)
+
+
+def relative_luminance(rgb):
+    """
+    Computes the WCAG relative luminance of sRGB colors.
+
+    Args:
+        rgb (numpy.ndarray): Array of shape (..., 3) with values in 0-255.
+
+    Returns:
+        numpy.ndarray: Luminance in the range 0-1, of shape (...).
+    """
+    return srgb_to_linear(rgb) @ _LUMINANCE_WEIGHTS
+
+
+def contrast_ratio(luminance_a, luminance_b):
+    """
+    Computes WCAG contrast ratios between two arrays of luminances.
+
+    Returns:
+        numpy.ndarray: Ratios between 1 and 21.
+    """
+    lighter = np.maximum(luminance_a, luminance_b)
+    darker = np.minimum(luminance_a, luminance_b)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def _background_of(name, names):
+    # on_primary -> primary, inverse_on_surface -> inverse_surface and
+    # on_primary_fixed_variant -> primary_fixed when no *_variant surface exists
+    parts = name.split("_")
+    if "on" not in parts:
+        return None
+    parts.remove("on")
+    background = "_".join(parts)
+    if background not in names and background.endswith("_variant"):
+        background = background[: -len("_variant")]
+    return background if background in names else None
+
+
+def semantic_pairs(names):
+    """
+    Finds the foreground/background pairs among semantic token names.
+
+    Args:
+        names (list): Semantic names of one theme.
+
+    Returns:
+        list: (foreground, background) name tuples in template order.
+    """
+    name_set = set(names)
+    pairs = []
+    for name in names:
+        background = _background_of(name, name_set)
+        if background is not None:
+            pairs.append((name, background))
+    return pairs
+
+
+@lru_cache(maxsize=64)
+def _pair_positions(names):
+    # Token positions of the pairs, shared by every theme with the same names
+    position = {name: i for i, name in enumerate(names)}
+    pairs = semantic_pairs(names)
+    foreground = np.array([position[fg] for fg, _ in pairs], dtype=np.intp)
+    background = np.array([position[bg] for _, bg in pairs], dtype=np.intp)
+    return pairs, foreground, background
+
+
+def _ramp_bounds(primitives):
+    # Start and length of the ramp ("<name>-<shade>" keys in a row) holding
+    # each primitive
+    starts = np.empty(len(primitives), dtype=np.intp)
+    lengths = np.empty(len(primitives), dtype=np.intp)
+    ramps = [key.rpartition("-")[0] for key in primitives]
+    run_start = 0
+    for i in range(1, len(ramps) + 1):
+        if i == len(ramps) or ramps[i] != ramps[run_start]:
+            starts[run_start:i] = run_start
+            lengths[run_start:i] = i - run_start
+            run_start = i
+    return starts, lengths
+
+
+def _nearest_passing(luminance, starts, lengths, foreground, background, threshold):
+    # For each failing pair, the primitive in the foreground's ramp closest to
+    # the current shade whose contrast with the background reaches threshold
+    longest = int(lengths[foreground].max())
+    steps = np.arange(longest)
+    in_ramp = steps[np.newaxis, :] < lengths[foreground, np.newaxis]
+    candidates = starts[foreground, np.newaxis] + np.where(in_ramp, steps, 0)
+
+    ratios = contrast_ratio(luminance[candidates], luminance[background, np.newaxis])
+    passing = in_ramp & (ratios >= threshold)
+    distance = np.abs(candidates - foreground[:, np.newaxis]).astype(np.float64)
+    distance[~passing] = np.inf
+
+    best = np.argmin(distance, axis=1)
+    rows = np.arange(len(foreground))
+    found = passing[rows, best]
+    return np.where(found, candidates[rows, best], -1), ratios[rows, best]
+
+
+def audit_indexes(indexes, level="AA"):
+    """
+    Audits the semantic pairs of many token indexes in one vectorized pass.
+
+    Args:
+        indexes (dict): Brand name -> TokenIndex.
+        level (str): Target level for suggestions, a key of WCAG_LEVELS.
+
+    Returns:
+        dict: Brand name -> list of ContrastResult. Pairs with unresolved
+        tokens are skipped. suggestion is the closest primitive in the
+        foreground's ramp that reaches the level, or None when the pair
+        already passes or no shade in the ramp does.
+    """
+    threshold = WCAG_LEVELS[level]
+    brands = list(indexes.items())
+    if not brands:
+        return {}
+
+    # Flatten the primitives of every brand into one luminance array
+    luminance, starts, lengths = [], [], []
+    offsets = []
+    offset = 0
+    for _, index in brands:
+        luminance.append(relative_luminance(index.rgb))
+        ramp_starts, ramp_lengths = _ramp_bounds(index.primitives)
+        starts.append(ramp_starts + offset)
+        lengths.append(ramp_lengths)
+        offsets.append(offset)
+        offset += len(index.primitives)
+    luminance = np.concatenate(luminance)
+    starts = np.concatenate(starts)
+    lengths = np.concatenate(lengths)
+
+    # Gather every resolved pair of every theme
+    rows = []
+    foreground, background = [], []
+    for (brand, index), brand_offset in zip(brands, offsets):
+        for theme, names in index.themes.items():
+            pairs, fg_positions, bg_positions = _pair_positions(tuple(names))
+            references = np.asarray(index.references[theme])
+            fg_refs = references[fg_positions]
+            bg_refs = references[bg_positions]
+            resolved = (fg_refs >= 0) & (bg_refs >= 0)
+            for pair, is_resolved in zip(pairs, resolved.tolist()):
+                if is_resolved:
+                    rows.append((brand, index, brand_offset, theme, pair))
+            foreground.append(fg_refs[resolved] + brand_offset)
+            background.append(bg_refs[resolved] + brand_offset)
+    foreground = np.concatenate(foreground) if foreground else np.empty(0, np.intp)
+    background = np.concatenate(background) if background else np.empty(0, np.intp)
+
+    ratios = contrast_ratio(luminance[foreground], luminance[background])
+    suggestions = np.full(len(rows), -1, dtype=np.intp)
+    suggestion_ratios = np.zeros(len(rows))
+    failing = np.flatnonzero(ratios < threshold)
+    if len(failing):
+        suggestions[failing], suggestion_ratios[failing] = _nearest_passing(
+            luminance,
+            starts,
+            lengths,
+            foreground[failing],
+            background[failing],
+            threshold,
+        )
+
+    results = {brand: [] for brand, _ in brands}
+    for row, ratio, fg, bg, suggestion, suggestion_ratio in zip(
+        rows,
+        ratios.tolist(),
+        foreground.tolist(),
+        background.tolist(),
+        suggestions.tolist(),
+        suggestion_ratios.tolist(),
+    ):
+        brand, index, brand_offset, theme, (fg_name, bg_name) = row
+        hex_values = index.hex
+        if suggestion < 0:
+            suggestion, suggestion_ratio = None, None
+        else:
+            suggestion = index.primitives[suggestion - brand_offset]
+        results[brand].append(
+            ContrastResult(
+                theme,
+                fg_name,
+                bg_name,
+                hex_values[fg - brand_offset],
+                hex_values[bg - brand_offset],
+                ratio,
+                ratio >= WCAG_LEVELS["AA"],
+                ratio >= WCAG_LEVELS["AAA"],
+                suggestion,
+                suggestion_ratio,
+            )
+        )
+    return results
+
+
+def audit_index(index, level="AA"):
+    """
+    Audits the semantic pairs of one token index.
+
+    Returns:
+        list: ContrastResult for every resolved pair, see audit_indexes.
+    """
+    return audit_indexes({"": index}, level)[""]
+
+
+def load_brand_indexes(paths):
+    """
+    Loads token index snapshots written by the batch generator.
+
+    Args:
+        paths (list): token_index.bin files or brand output folders
+            containing one.
+
+    Returns:
+        dict: Brand name (the folder name) -> memory-mapped TokenIndex.
+    """
+    indexes = {}
+    for path in paths:
+        if os.path.isdir(path):
+            path = os.path.join(path, "token_index.bin")
+        brand = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        indexes[brand] = TokenIndex.load(path, mmap=True)
+    return indexes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check the contrast of every on_*/surface token pair."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="brand output folders or token_index.bin files (default: this repo)",
+    )
+    parser.add_argument("--level", choices=list(WCAG_LEVELS), default="AA")
+    parser.add_argument("--report", help="write every result to this JSON file")
+    parser.add_argument(
+        "--strict", action="store_true", help="exit with status 1 if a pair fails"
+    )
+    args = parser.parse_args(argv)
+
+    if args.paths:
+        indexes = load_brand_indexes(args.paths)
+    else:
+        color_map = load_json(DEFAULT_COLOR_MAP_PATH)
+        themes = {theme: load_json(path) for theme, path in DEFAULT_THEME_PATHS.items()}
+        indexes = {"figma-generator": TokenIndex.from_maps(color_map, themes)}
+
+    start = time.perf_counter()
+    results = audit_indexes(indexes, args.level)
+    seconds = time.perf_counter() - start
+
+    threshold = WCAG_LEVELS[args.level]
+    pair_count = failures = 0
+    for brand, brand_results in results.items():
+        for result in brand_results:
+            pair_count += 1
+            if result.ratio >= threshold:
+                continue
+            failures += 1
+            fix = "no passing shade in the ramp"
+            if result.suggestion is not None:
+                fix = f"use {result.suggestion} ({result.suggestion_ratio:.2f}:1)"
+            print(
+                f"{brand} {result.theme}: {result.foreground} on "
+                f"{result.background} is {result.ratio:.2f}:1, {fix}"
+            )
+
+    if args.report:
+        save_json(
+            args.report,
+            {
+                brand: [result._asdict() for result in brand_results]
+                for brand, brand_results in results.items()
+            },
+        )
+    print(
+        f"{pair_count} pairs in {len(results)} brands, {failures} below "
+        f"{args.level} ({seconds:.3f}s)"
+    )
+    return 1 if args.strict and failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
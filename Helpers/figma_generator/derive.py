@@ -0,0 +1,277 @@
+"""
+Algorithmic theme derivation.
+
+Computes semantic templates (role -> primitive key, the shape of
+light_theme_semantic.json) from role rules instead of maintaining them by
+hand. Every role has a ramp and a target tone (the 0-100 lightness stop of
+the primitive keys, "primary-400" being tone 40) for light and for dark
+themes. A theme variant picks one of the two, and can raise the minimum
+contrast between every on_* role and the role it sits on, lift the
+surfaces or swap ramps:
+
+    light_high_contrast     {"base": "light", "contrast": 7.0}
+    dark_dimmed             {"base": "dark", "surface_offset": 6}
+    light_tinted            {"base": "light", "ramps": {"grey": "primary"}}
+
+Each role takes the shade of its ramp closest to its target tone. Then
+every on_* role below the minimum contrast with its background moves to the
+closest shade that reaches it, or to the shade with the most contrast when
+none does. All roles x variants x brands are solved together as padded
+arrays over the primitive ramps.
+
+Usage:
+    python -m figma_generator.derive out/                 # the repo's palette
+    python -m figma_generator.derive out/ build/*/ --variants light dark
+"""
+
+import argparse
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from .colors import hex_to_rgb
+from .contrast import WCAG_LEVELS, contrast_ratio, relative_luminance, semantic_pairs
+from .files import DEFAULT_COLOR_MAP_PATH, load_json, save_json
+from .semantic import get_category
+
+# Ramp and target tones of a role
+Role = namedtuple("Role", ["ramp", "light", "dark"])
+
+# Tones of the roles every accent ramp gets, light then dark
+_ACCENT_TONES = {
+    "{}": (40, 80),
+    "on_{}": (100, 20),
+    "{}_container": (90, 30),
+    "on_{}_container": (10, 90),
+    "{}_fixed": (90, 90),
+    "{}_fixed_dim": (80, 80),
+    "on_{}_fixed": (10, 10),
+    "on_{}_fixed_variant": (30, 30),
+}
+ACCENT_RAMPS = ("primary", "secondary", "tertiary", "error")
+
+# Role -> Role, in the order of the material templates
+ROLE_RULES = {
+    pattern.format(ramp): Role(ramp, *tones)
+    for ramp in ACCENT_RAMPS
+    for pattern, tones in _ACCENT_TONES.items()
+}
+ROLE_RULES.update(
+    {
+        "surface_dim": Role("grey", 87, 20),
+        "surface": Role("grey", 98, 6),
+        "surface_bright": Role("grey", 98, 24),
+        "surface_container_lowest": Role("grey", 100, 4),
+        "surface_container_low": Role("grey", 96, 10),
+        "surface_container": Role("grey", 94, 12),
+        "surface_container_high": Role("grey", 92, 17),
+        "surface_container_highest": Role("grey", 90, 22),
+        "on_surface": Role("grey", 10, 90),
+        "on_surface_variant": Role("grey-variant", 30, 80),
+        "outline": Role("grey-variant", 50, 60),
+        "outline_variant": Role("grey-variant", 80, 30),
+        "inverse_surface": Role("grey", 20, 90),
+        "inverse_on_surface": Role("grey", 95, 20),
+        "inverse_primary": Role("primary", 80, 40),
+        "scrim": Role("grey", 0, 0),
+        "shadow": Role("grey", 0, 0),
+        "background": Role("grey", 96, 6),
+        "on_background": Role("grey", 6, 96),
+    }
+)
+
+# Minimum contrast of the on_* roles unless a variant sets its own
+DEFAULT_CONTRAST = WCAG_LEVELS["AA"]
+
+THEME_VARIANTS = {
+    "light": {"base": "light"},
+    "dark": {"base": "dark"},
+    "light_high_contrast": {"base": "light", "contrast": WCAG_LEVELS["AAA"]},
+    "dark_high_contrast": {"base": "dark", "contrast": WCAG_LEVELS["AAA"]},
+    "dark_dimmed": {"base": "dark", "surface_offset": 6},
+    "light_tinted": {
+        "base": "light",
+        "ramps": {"grey": "primary", "grey-variant": "primary"},
+    },
+}
+
+
+def _ramps(color_map):
+    # Ramp name -> (primitive keys, tones, luminances), keys as "<ramp>-<shade>"
+    ramps = {}
+    for key, hex_value in color_map.items():
+        ramp, _, shade = key.rpartition("-")
+        if ramp and shade.isdigit():
+            keys, tones, rgb = ramps.setdefault(ramp, ([], [], []))
+            keys.append(key)
+            tones.append(int(shade) / 10)
+            rgb.append(hex_to_rgb(hex_value))
+    return {
+        ramp: (keys, np.asarray(tones), relative_luminance(np.asarray(rgb, float)))
+        for ramp, (keys, tones, rgb) in ramps.items()
+    }
+
+
+def _role_targets(rules, variant):
+    # (role, ramp, target tone, minimum contrast or 0) for one variant
+    base = variant.get("base", "light")
+    if base not in ("light", "dark"):
+        raise ValueError(f"unknown theme base {base!r}, expected 'light' or 'dark'")
+    contrast = variant.get("contrast", DEFAULT_CONTRAST)
+    offset = variant.get("surface_offset", 0)
+    ramps = variant.get("ramps", {})
+    foregrounds = dict(semantic_pairs(list(rules)))
+    targets = []
+    for role, rule in rules.items():
+        tone = getattr(rule, base)
+        if role not in foregrounds and get_category(role) in ("surface", "background"):
+            tone = min(100, max(0, tone + offset))
+        minimum = contrast if role in foregrounds else 0
+        targets.append((role, ramps.get(rule.ramp, rule.ramp), tone, minimum))
+    return targets, foregrounds
+
+
+def derive_brand_themes(color_maps, variants=THEME_VARIANTS, rules=ROLE_RULES):
+    """
+    Derives theme templates for many brands in one batched pass.
+
+    Args:
+        color_maps (dict): Brand name -> primitive colors map.
+        variants (dict): Theme name -> variant options: "base" ("light" or
+            "dark"), "contrast" (minimum ratio of the on_* roles, 0 to keep
+            their tones), "surface_offset" (tones added to the surface and
+            background roles) and "ramps" (ramp -> replacement ramp).
+        rules (dict): Role -> Role; ROLE_RULES by default.
+
+    Returns:
+        dict: Brand name -> theme name -> role -> primitive key.
+
+    Raises:
+        ValueError: When a brand's palette lacks a ramp the roles use.
+    """
+    brands = list(color_maps)
+    brand_ramps = {brand: _ramps(color_maps[brand]) for brand in brands}
+    variant_targets = {
+        theme: _role_targets(rules, variant) for theme, variant in variants.items()
+    }
+
+    # One padded row per (brand, ramp) the targets use
+    row_of = {}
+    row_keys, row_tones, row_luminance = [], [], []
+    jobs = []  # (row, target tone, minimum contrast, background job or -1)
+    for brand in brands:
+        ramps = brand_ramps[brand]
+        missing = sorted(
+            {
+                ramp
+                for targets, _ in variant_targets.values()
+                for _, ramp, _, _ in targets
+                if ramp not in ramps
+            }
+        )
+        if missing:
+            raise ValueError(f"{brand}: palette has no {', '.join(missing)} ramp")
+        for targets, foregrounds in variant_targets.values():
+            first = len(jobs)
+            position = {role: first + i for i, (role, _, _, _) in enumerate(targets)}
+            for role, ramp, tone, minimum in targets:
+                if (brand, ramp) not in row_of:
+                    row_of[brand, ramp] = len(row_keys)
+                    keys, tones, luminance = ramps[ramp]
+                    row_keys.append(keys)
+                    row_tones.append(tones)
+                    row_luminance.append(luminance)
+                background = position.get(foregrounds.get(role), -1)
+                jobs.append((row_of[brand, ramp], tone, minimum, background))
+
+    if not jobs:
+        return {brand: {theme: {} for theme in variants} for brand in brands}
+    width = max(len(keys) for keys in row_keys)
+    tones = np.full((len(row_keys), width), np.inf)
+    luminance = np.zeros((len(row_keys), width))
+    for row, (row_tone, row_lum) in enumerate(zip(row_tones, row_luminance)):
+        tones[row, : len(row_tone)] = row_tone
+        luminance[row, : len(row_lum)] = row_lum
+
+    rows, targets, minimums, backgrounds = (np.asarray(column) for column in zip(*jobs))
+    job_tones = tones[rows]
+    distance = np.abs(job_tones - targets[:, np.newaxis])
+    choice = np.argmin(distance, axis=1)
+
+    # Move the on_* roles that miss their contrast, against the backgrounds
+    # chosen above
+    checked = np.flatnonzero((backgrounds >= 0) & (minimums > 0))
+    if len(checked):
+        background_luminance = luminance[
+            rows[backgrounds[checked]], choice[backgrounds[checked]]
+        ]
+        ratios = contrast_ratio(
+            luminance[rows[checked]], background_luminance[:, np.newaxis]
+        )
+        valid = np.isfinite(job_tones[checked])
+        ratios = np.where(valid, ratios, 0)
+        passing = ratios >= minimums[checked, np.newaxis]
+        closest = np.argmin(np.where(passing, distance[checked], np.inf), axis=1)
+        strongest = np.argmax(ratios, axis=1)
+        choice[checked] = np.where(passing.any(axis=1), closest, strongest)
+
+    results = {}
+    job = 0
+    for brand in brands:
+        results[brand] = {}
+        for theme, (targets, _) in variant_targets.items():
+            template = results[brand][theme] = {}
+            for role, _, _, _ in targets:
+                template[role] = row_keys[rows[job]][choice[job]]
+                job += 1
+    return results
+
+
+def derive_themes(color_map, variants=THEME_VARIANTS, rules=ROLE_RULES):
+    """
+    Derives the theme templates of one palette.
+
+    Returns:
+        dict: Theme name -> role -> primitive key, ready for
+        TokenIndex.from_maps or as a *_theme_semantic.json file.
+    """
+    return derive_brand_themes({"": color_map}, variants, rules)[""]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Derive semantic theme templates.")
+    parser.add_argument("output_dir", help="directory receiving the templates")
+    parser.add_argument(
+        "brand_dirs",
+        nargs="*",
+        help="batch output folders with a primitive_colors_map.json (default: repo)",
+    )
+    parser.add_argument("--variants", nargs="+", choices=list(THEME_VARIANTS))
+    args = parser.parse_args(argv)
+
+    variants = THEME_VARIANTS
+    if args.variants:
+        variants = {theme: THEME_VARIANTS[theme] for theme in args.variants}
+    if args.brand_dirs:
+        color_maps = {
+            os.path.basename(os.path.normpath(path)): load_json(
+                os.path.join(path, "primitive_colors_map.json")
+            )
+            for path in args.brand_dirs
+        }
+    else:
+        color_maps = {"": load_json(DEFAULT_COLOR_MAP_PATH)}
+
+    written = []
+    for brand, themes in derive_brand_themes(color_maps, variants).items():
+        brand_dir = os.path.join(args.output_dir, brand)
+        os.makedirs(brand_dir, exist_ok=True)
+        for theme, template in themes.items():
+            path = os.path.join(brand_dir, f"{theme}_theme_semantic.json")
+            written.append(save_json(path, template))
+    print(f"Derived {len(written)} theme templates into {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+"""
+Token diffs and incremental patches.
+
+Changing one base color changes a handful of primitives and the semantic
+tokens that reference them, but regenerating a brand rewrites every
+artifact. This module compares the previous and new version of the
+artifacts and describes only what changed:
+
+    changelog.md                    tokens added, removed and changed
+    <artifact>.json.patch.json      RFC 6902 operations on the changed keys
+    <artifact>.svg.patch.json       markup of the changed swatch nodes
+    <artifact>.patch.json           whole new artifact, or its removal
+
+SVG boards are compared node by node. A swatch node is a <g id> without
+nested groups, or a nested <svg id> such as a template instance with
+everything inside it. Nodes are keyed by their id and its occurrence, so
+repeated ids stay apart, and the rest of the document is compared as a
+skeleton with the swatches cut out. When only swatches changed, the patch
+carries just their new markup; when the skeleton changed too (a shade was
+added, the layout moved), it carries the whole document. New artifacts,
+other file types and JSON maps whose key order changed are carried whole,
+so applying the patches to the previous build reproduces the new one.
+
+Usage:
+    python -m figma_generator.diff diff old_build/acme build/acme patches/acme
+    python -m figma_generator.diff apply old_build/acme patches/acme
+    python -m figma_generator.batch specs/ build/ --cache-dir .cache --patches patches/
+"""
+
+import argparse
+import base64
+import json
+import os
+import re
+from collections import Counter, namedtuple
+
+from .files import load_json, save_json, save_to_file
+from .profiling import stage
+
+# Keys of a map that appeared, disappeared or got a new value
+MapDiff = namedtuple("MapDiff", ["added", "removed", "changed"])
+
+# Opening and closing tags of the elements swatch nodes are made of
+_GROUP_TAG = re.compile(r"<(/?)(g|svg)\b([^>]*)>")
+_ID_ATTRIBUTE = re.compile(r'\sid="([^"]*)"')
+# Artifacts compared as text; any other file is carried as base64
+TEXT_SUFFIXES = (".json", ".svg", ".css")
+
+CHANGELOG_FILENAME = "changelog.md"
+PATCH_SUFFIX = ".patch.json"
+
+
+def diff_maps(old, new):
+    """
+    Compares two flat token maps.
+
+    Args:
+        old (dict): Previous key -> value map.
+        new (dict): New key -> value map.
+
+    Returns:
+        MapDiff: "added" and "removed" map keys to their value, "changed"
+        maps keys to (old value, new value); all in the order of the maps.
+    """
+    added = {key: value for key, value in new.items() if key not in old}
+    removed = {key: value for key, value in old.items() if key not in new}
+    changed = {
+        key: (old[key], value)
+        for key, value in new.items()
+        if key in old and old[key] != value
+    }
+    return MapDiff(added, removed, changed)
+
+
+def _pointer(key):
+    # JSON pointer of a top-level key (RFC 6901 escaping)
+    return "/" + str(key).replace("~", "~0").replace("/", "~1")
+
+
+def json_patch(diff):
+    """
+    Converts a map diff to RFC 6902 JSON Patch operations.
+
+    Returns:
+        list: "remove", "replace" and "add" operations.
+    """
+    return (
+        [{"op": "remove", "path": _pointer(key)} for key in diff.removed]
+        + [
+            {"op": "replace", "path": _pointer(key), "value": value}
+            for key, (_, value) in diff.changed.items()
+        ]
+        + [
+            {"op": "add", "path": _pointer(key), "value": value}
+            for key, value in diff.added.items()
+        ]
+    )
+
+
+def apply_json_patch(data, operations):
+    """
+    Applies the operations of json_patch to a flat map.
+
+    Returns:
+        dict: A patched copy; added keys go to the end.
+    """
+    patched = dict(data)
+    for operation in operations:
+        key = operation["path"][1:].replace("~1", "/").replace("~0", "~")
+        if operation["op"] == "remove":
+            del patched[key]
+        elif operation["op"] in ("add", "replace"):
+            patched[key] = operation["value"]
+        else:
+            raise ValueError(f"unsupported patch operation {operation['op']!r}")
+    return patched
+
+
+def _node_spans(markup):
+    # ((id, occurrence), start, end) of every swatch node, in document order
+    spans = []
+    open_tags = []  # [tag, id, start, has nested <g>]
+    for match in _GROUP_TAG.finditer(markup):
+        closing, tag, attributes = match.groups()
+        if not closing:
+            if attributes.endswith("/"):
+                continue
+            if tag == "g":
+                for element in open_tags:
+                    element[3] = True
+            node_id = _ID_ATTRIBUTE.search(attributes)
+            open_tags.append([tag, node_id and node_id.group(1), match.start(), False])
+            continue
+        if not open_tags:
+            continue
+        tag, node_id, start, nested = open_tags.pop()
+        if node_id is None or (nested if tag == "g" else not open_tags):
+            continue
+        # The outermost node wins over the nodes inside it
+        while spans and spans[-1][1] >= start:
+            spans.pop()
+        spans.append((node_id, start, match.end()))
+
+    occurrences = Counter()
+    for node_id, start, end in spans:
+        yield (node_id, occurrences[node_id]), start, end
+        occurrences[node_id] += 1
+
+
+def _replace_nodes(markup, replace):
+    # markup with every node replaced by replace(key, node markup)
+    parts = []
+    position = 0
+    for key, start, end in _node_spans(markup):
+        parts += [markup[position:start], replace(key, markup[start:end])]
+        position = end
+    parts.append(markup[position:])
+    return "".join(parts)
+
+
+def svg_nodes(markup):
+    """
+    Splits an SVG board into its swatch nodes and the markup around them.
+
+    Returns:
+        tuple: (skeleton, nodes) where nodes maps (id, occurrence) keys to
+        the node markup and skeleton is the document with every node
+        replaced by a placeholder naming its id.
+    """
+    nodes = {}
+
+    def cut(key, node):
+        nodes[key] = node
+        return f"\0{key[0]}\0"
+
+    return _replace_nodes(markup, cut), nodes
+
+
+def svg_patch(old_markup, new_markup):
+    """
+    Computes the node-level patch between two versions of a board.
+
+    Returns:
+        dict: {"nodes": [[id, occurrence, markup], ...]} with the changed
+        swatch nodes, or {"full": markup} when the document around them
+        changed; None when the boards are identical.
+    """
+    if old_markup == new_markup:
+        return None
+    old_skeleton, old_nodes = svg_nodes(old_markup)
+    new_skeleton, new_nodes = svg_nodes(new_markup)
+    if old_skeleton != new_skeleton:
+        return {"full": new_markup}
+    return {
+        "nodes": [
+            [node_id, occurrence, markup]
+            for (node_id, occurrence), markup in new_nodes.items()
+            if old_nodes[node_id, occurrence] != markup
+        ]
+    }
+
+
+def apply_svg_patch(markup, patch):
+    """
+    Applies a patch from svg_patch to the previous version of a board.
+
+    Returns:
+        str: The new board.
+    """
+    if "full" in patch:
+        return patch["full"]
+    nodes = {
+        (node_id, occurrence): node for node_id, occurrence, node in patch["nodes"]
+    }
+    return _replace_nodes(markup, lambda key, node: nodes.get(key, node))
+
+
+def full_patch(filename, content):
+    """
+    Returns:
+        dict: Patch carrying the whole new artifact, as text or, for bytes,
+        as base64.
+    """
+    if isinstance(content, bytes):
+        encoded = base64.b64encode(content).decode("ascii")
+        return {"artifact": filename, "format": "full", "base64": encoded}
+    return {"artifact": filename, "format": "full", "text": content}
+
+
+def read_artifact(path):
+    """
+    Returns:
+        The contents of an artifact, str for TEXT_SUFFIXES and bytes
+        otherwise, or None when it does not exist.
+    """
+    if not os.path.isfile(path):
+        return None
+    if path.endswith(TEXT_SUFFIXES):
+        with open(path, "r") as file:
+            return file.read()
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def artifact_patch(filename, old_text, new_text):
+    """
+    Computes the patch of one artifact from its previous and new contents.
+
+    Args:
+        filename (str): Artifact name; ".json" token maps get JSON Patch
+            operations, ".svg" boards node patches and anything else the
+            whole new contents.
+        old_text: Previous contents as read by read_artifact, None for a
+            new artifact.
+        new_text: New contents, None for a removed artifact.
+
+    Returns:
+        tuple: (patch, map diff) where the patch is a dict with "artifact"
+        and "format" keys, or None when nothing changed, and the map diff
+        is None unless both versions are JSON maps.
+    """
+    if old_text == new_text:
+        return None, None
+    if new_text is None:
+        return {"artifact": filename, "format": "remove"}, None
+    if old_text is None or not filename.endswith((".json", ".svg")):
+        return full_patch(filename, new_text), None
+    with stage("diff", file=filename):
+        if filename.endswith(".json"):
+            diff = diff_maps(json.loads(old_text), json.loads(new_text))
+            operations = json_patch(diff)
+            # Added keys go to the end, so a map whose order changed is
+            # carried whole
+            patched = apply_json_patch(json.loads(old_text), operations)
+            if json.dumps(patched, indent=4) != new_text:
+                return full_patch(filename, new_text), diff
+            patch = {
+                "artifact": filename,
+                "format": "json-patch",
+                "operations": operations,
+            }
+            return patch, diff
+        nodes = svg_patch(old_text, new_text)
+        if "full" in nodes:
+            return full_patch(filename, new_text), None
+        return {"artifact": filename, "format": "svg-nodes", **nodes}, None
+
+
+def format_changelog(diffs, replaced=(), title=None, removed=()):
+    """
+    Formats map diffs as a Markdown changelog.
+
+    Args:
+        diffs (dict): Artifact name -> MapDiff.
+        replaced (list): Artifacts rewritten as a whole.
+        title (str): Heading, e.g. the brand name.
+        removed (list): Artifacts that no longer exist.
+
+    Returns:
+        str: The changelog; "No changes." when there are none.
+    """
+    sections = []
+    for filename, diff in diffs.items():
+        entries = [
+            f"- changed `{key}`: {old} -> {new}"
+            for key, (old, new) in diff.changed.items()
+        ]
+        entries += [f"- added `{key}`: {value}" for key, value in diff.added.items()]
+        entries += [f"- removed `{key}`" for key in diff.removed]
+        if entries:
+            sections.append([f"## {filename}", "", *entries])
+    if replaced:
+        sections.append(["## Replaced", "", *(f"- {name}" for name in replaced)])
+    if removed:
+        sections.append(["## Removed", "", *(f"- {name}" for name in removed)])
+
+    lines = [f"# {title}", ""] if title else []
+    for section in sections:
+        lines += [*section, ""]
+    if not sections:
+        lines.append("No changes.")
+    return "\n".join(lines).rstrip("\n") + "\n"
+
+
+class PatchRecorder:
+    """
+    Collects the patches of a brand while its artifacts are rebuilt.
+
+    Call before(path) ahead of writing an artifact and after(path) once it
+    is written, then save() to write the patches and the changelog.
+
+    Args:
+        patch_dir (str): Directory receiving the brand's patches.
+        title (str): Changelog heading.
+    """
+
+    def __init__(self, patch_dir, title=None):
+        self.patch_dir = patch_dir
+        self.title = title
+        self.patches = {}
+        self.diffs = {}
+        self.replaced = []
+        self.removed = []
+        self._previous = {}
+
+    def before(self, path):
+        # Keep the previous contents of the artifact, None if it is new
+        self._previous[path] = read_artifact(path)
+
+    def after(self, path):
+        old_text = self._previous.pop(path, None)
+        self.record(os.path.basename(path), old_text, read_artifact(path))
+
+    def record(self, filename, old_text, new_text):
+        # Patch of one artifact; new ones and other file types go whole
+        patch, diff = artifact_patch(filename, old_text, new_text)
+        if patch is not None:
+            self.patches[filename] = patch
+            if patch["format"] == "full":
+                self.replaced.append(filename)
+            elif patch["format"] == "remove":
+                self.removed.append(filename)
+        if diff is not None:
+            self.diffs[filename] = diff
+
+    def save(self):
+        """
+        Returns:
+            list: Paths of the written files.
+        """
+        os.makedirs(self.patch_dir, exist_ok=True)
+        written = [
+            save_json(os.path.join(self.patch_dir, filename + PATCH_SUFFIX), patch)
+            for filename, patch in self.patches.items()
+        ]
+        changelog = format_changelog(
+            self.diffs, self.replaced, self.title, self.removed
+        )
+        written.append(
+            save_to_file(os.path.join(self.patch_dir, CHANGELOG_FILENAME), changelog)
+        )
+        return written
+
+
+def diff_builds(old_dir, new_dir, patch_dir, title=None):
+    """
+    Writes the patches between two output folders of the same brand.
+
+    Args:
+        old_dir (str): Previous build.
+        new_dir (str): New build.
+        patch_dir (str): Directory receiving the patches and the changelog.
+        title (str): Changelog heading.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    recorder = PatchRecorder(patch_dir, title)
+    for filename in sorted(set(os.listdir(old_dir)) | set(os.listdir(new_dir))):
+        recorder.record(
+            filename,
+            read_artifact(os.path.join(old_dir, filename)),
+            read_artifact(os.path.join(new_dir, filename)),
+        )
+    return recorder.save()
+
+
+def apply_patches(build_dir, patch_dir):
+    """
+    Applies the patches of patch_dir to a previous build in place.
+
+    Returns:
+        list: Paths of the patched files.
+    """
+    written = []
+    for filename in sorted(os.listdir(patch_dir)):
+        if not filename.endswith(PATCH_SUFFIX):
+            continue
+        patch = load_json(os.path.join(patch_dir, filename))
+        path = os.path.join(build_dir, patch["artifact"])
+        if patch["format"] == "remove":
+            if os.path.exists(path):
+                os.remove(path)
+        elif patch["format"] == "full" and "base64" in patch:
+            with open(path, "wb") as file:
+                file.write(base64.b64decode(patch["base64"]))
+            written.append(path)
+        elif patch["format"] == "full":
+            written.append(save_to_file(path, patch["text"]))
+        elif patch["format"] == "json-patch":
+            written.append(
+                save_json(path, apply_json_patch(load_json(path), patch["operations"]))
+            )
+        else:
+            with open(path, "r") as file:
+                markup = file.read()
+            written.append(save_to_file(path, apply_svg_patch(markup, patch)))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Diff two builds of a brand into minimal patches, or apply them."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff = commands.add_parser("diff", help="write the patches between two builds")
+    diff.add_argument("old_dir", help="previous brand output folder")
+    diff.add_argument("new_dir", help="new brand output folder")
+    diff.add_argument("patch_dir", help="directory receiving the patches")
+    apply = commands.add_parser("apply", help="patch a previous build in place")
+    apply.add_argument("build_dir")
+    apply.add_argument("patch_dir")
+    args = parser.parse_args(argv)
+
+    if args.command == "apply":
+        written = apply_patches(args.build_dir, args.patch_dir)
+        print(f"Patched {len(written)} files in {args.build_dir}")
+        return
+    title = os.path.basename(os.path.normpath(args.new_dir))
+    written = diff_builds(args.old_dir, args.new_dir, args.patch_dir, title)
+    print(f"Wrote {len(written)} files to {args.patch_dir}")
+
+
+if __name__ == "__main__":
+    main()
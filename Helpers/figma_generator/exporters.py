@@ -0,0 +1,553 @@
+"""
+Token exporters for CSS, SCSS, Tailwind, Android, iOS, W3C design tokens and
+Figma Variables.
+
+Every exporter is a function that takes a ResolvedModel and returns a dict of
+relative file path -> file content. The model resolves the palette, themes
+and typography once; export_tokens() runs the exporters on a thread pool and
+then writes all their files in one pass.
+
+New formats are added with the register_exporter decorator:
+
+    @register_exporter("json-flat")
+    def export_flat(model):
+        return {"flat.json": json.dumps(model.primitives)}
+
+Usage:
+    python -m figma_generator.exporters build/tokens
+    python -m figma_generator.exporters build/tokens --formats css scss
+    python -m figma_generator.exporters build/acme --index build/acme/token_index.bin
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .files import DEFAULT_COLOR_MAP_PATH, DEFAULT_THEME_PATHS, load_json
+from .tokens import TokenIndex
+from .typography import DEFAULT_TYPOGRAPHY, build_variations
+
+# Format name -> exporter function, in registration order
+EXPORTERS = {}
+
+
+def register_exporter(name):
+    """
+    Registers an exporter function under a format name.
+
+    Args:
+        name (str): Format name used by export_tokens and the CLI.
+    """
+
+    def register(exporter):
+        EXPORTERS[name] = exporter
+        return exporter
+
+    return register
+
+
+class ResolvedModel:
+    """
+    Palette, themes and typography of one design system, resolved once and
+    shared read-only by every exporter.
+
+    Args:
+        index (TokenIndex): Resolved semantic tokens.
+        font_family (str): Typography font family.
+        variations (dict): Typography groups as returned by build_variations.
+        name (str): Design system name, used in titles and collection names.
+
+    Attributes:
+        primitives (dict): Primitive key -> hex.
+        ramps (dict): Ramp name -> list of (shade, primitive key, hex), e.g.
+            "grey-variant" -> [("0", "grey-variant-0", "#000000"), ...].
+        themes (dict): Theme -> list of (semantic name, primitive key or
+            None, hex).
+        text_styles (list): (slug, group, variant, size, line height, weight)
+            with slugs such as "headings-h1".
+    """
+
+    def __init__(self, index, font_family, variations, name="tokens"):
+        self.name = name
+        self.index = index
+        self.font_family = font_family
+        self.primitives = dict(zip(index.primitives, index.hex))
+        self.ramps = {}
+        for key, hex_value in self.primitives.items():
+            ramp, _, shade = key.rpartition("-")
+            self.ramps.setdefault(ramp, []).append((shade, key, hex_value))
+        self.themes = {theme: list(index.entries(theme)) for theme in index.themes}
+        self.text_styles = [
+            (
+                f"{group} {variant}".lower().replace(" ", "-"),
+                group,
+                variant,
+                size,
+                line_height,
+                weight,
+            )
+            for group, group_variations in variations.items()
+            for variant, (size, line_height, weight) in group_variations.items()
+        ]
+
+    @classmethod
+    def from_maps(
+        cls, color_map, themes, typography=DEFAULT_TYPOGRAPHY, name="tokens"
+    ):
+        typography = dict(typography)
+        font_family = typography.pop("font_family")
+        index = TokenIndex.from_maps(color_map, themes)
+        return cls(index, font_family, build_variations(**typography), name)
+
+
+def _dashed(name):
+    return name.replace("_", "-")
+
+
+def _rgb_components(hex_value):
+    value = hex_value.lstrip("#")
+    return [int(value[i : i + 2], 16) for i in (0, 2, 4)]
+
+
+# CSS custom properties
+@register_exporter("css")
+def export_css(model):
+    lines = [":root {"]
+    lines += [
+        f"  --{key}: {hex_value};" for key, hex_value in model.primitives.items()
+    ]
+    lines.append(f"  --font-family: \"{model.font_family}\", sans-serif;")
+    for slug, _, _, size, line_height, weight in model.text_styles:
+        lines += [
+            f"  --{slug}-font-size: {size}px;",
+            f"  --{slug}-line-height: {line_height};",
+            f"  --{slug}-font-weight: {weight};",
+        ]
+    lines.append("}")
+
+    for position, (theme, entries) in enumerate(model.themes.items()):
+        selector = f'[data-theme="{theme}"]'
+        # The first theme is also the default
+        lines.append("")
+        lines.append(f":root,\n{selector} {{" if position == 0 else f"{selector} {{")
+        for name, primitive, hex_value in entries:
+            value = hex_value if primitive is None else f"var(--{primitive})"
+            lines.append(f"  --{_dashed(name)}: {value};")
+        lines.append("}")
+    return {"tokens.css": "\n".join(lines) + "\n"}
+
+
+# SCSS variables and theme maps
+@register_exporter("scss")
+def export_scss(model):
+    lines = [f"${key}: {hex_value};" for key, hex_value in model.primitives.items()]
+    lines.append(f"$font-family: \"{model.font_family}\", sans-serif;")
+    for theme, entries in model.themes.items():
+        lines.append("")
+        lines.append(f"${theme}-theme: (")
+        for name, primitive, hex_value in entries:
+            value = hex_value if primitive is None else f"${primitive}"
+            lines.append(f'  "{_dashed(name)}": {value},')
+        lines.append(");")
+    lines.append("")
+    lines.append("$typography: (")
+    for slug, _, _, size, line_height, weight in model.text_styles:
+        lines.append(
+            f'  "{slug}": (font-size: {size}px, line-height: {line_height}, '
+            f"font-weight: {weight}),"
+        )
+    lines.append(");")
+    return {"_tokens.scss": "\n".join(lines) + "\n"}
+
+
+# Tailwind theme extension; semantic colors point at the CSS custom properties.
+# A semantic color named like a ramp ("primary") becomes the ramp's DEFAULT,
+# so bg-primary and bg-primary-400 both exist
+@register_exporter("tailwind")
+def export_tailwind(model):
+    colors = {
+        ramp: {shade: hex_value for shade, _, hex_value in shades}
+        for ramp, shades in model.ramps.items()
+    }
+    first_theme = next(iter(model.themes.values()), [])
+    for name, _, _ in first_theme:
+        value = f"var(--{_dashed(name)})"
+        if _dashed(name) in model.ramps:
+            colors[_dashed(name)]["DEFAULT"] = value
+        else:
+            colors[_dashed(name)] = value
+    config = {
+        "theme": {
+            "extend": {
+                "colors": colors,
+                "fontFamily": {"brand": [model.font_family, "sans-serif"]},
+                "fontSize": {
+                    slug: [
+                        f"{size}px", {"lineHeight": line_height, "fontWeight": weight}
+                    ]
+                    for slug, _, _, size, line_height, weight in model.text_styles
+                },
+            }
+        }
+    }
+    source = f"module.exports = {json.dumps(config, indent=2)};\n"
+    return {"tailwind.tokens.js": source}
+
+
+# Android color resources. Android has resource qualifiers for the light and
+# dark themes only, so derived variants such as light_high_contrast are left
+# out rather than written to folders the build would reject
+_ANDROID_FOLDERS = {"light": "values", "dark": "values-night"}
+
+
+def _android_name(name):
+    return name.replace("-", "_").lower()
+
+
+@register_exporter("android")
+def export_android(model):
+    # The primitives go to the default resources, next to the light theme
+    folders = {
+        "values": [
+            f'    <color name="{_android_name(key)}">{hex_value.upper()}</color>'
+            for key, hex_value in model.primitives.items()
+        ]
+    }
+    for theme, entries in model.themes.items():
+        if theme not in _ANDROID_FOLDERS:
+            continue
+        lines = folders.setdefault(_ANDROID_FOLDERS[theme], [])
+        for name, primitive, hex_value in entries:
+            value = (
+                hex_value.upper()
+                if primitive is None
+                else f"@color/{_android_name(primitive)}"
+            )
+            lines.append(f'    <color name="md_theme_{name}">{value}</color>')
+    return {
+        f"android/{folder}/colors.xml": "\n".join(
+            ['<?xml version="1.0" encoding="utf-8"?>', "<resources>", *lines]
+            + ["</resources>"]
+        )
+        + "\n"
+        for folder, lines in folders.items()
+    }
+
+
+# iOS asset catalog: one color set per token with an entry per appearance.
+# Themes without a matching appearance (dark_dimmed, light_tinted) are left out
+_XCODE_INFO = {"author": "xcode", "version": 1}
+_DARK = {"appearance": "luminosity", "value": "dark"}
+_HIGH_CONTRAST = {"appearance": "contrast", "value": "high"}
+_IOS_APPEARANCES = {
+    "light": [],
+    "dark": [_DARK],
+    "light_high_contrast": [_HIGH_CONTRAST],
+    "dark_high_contrast": [_DARK, _HIGH_CONTRAST],
+}
+
+
+def _ios_color(hex_value):
+    red, green, blue = _rgb_components(hex_value)
+    return {
+        "color-space": "srgb",
+        "components": {
+            "red": f"0x{red:02X}",
+            "green": f"0x{green:02X}",
+            "blue": f"0x{blue:02X}",
+            "alpha": "1.000",
+        },
+    }
+
+
+def _colorset(appearances):
+    # appearances: (theme or None for the primitives, hex) pairs
+    colors = []
+    for theme, hex_value in appearances:
+        color = {"color": _ios_color(hex_value), "idiom": "universal"}
+        if theme is not None and _IOS_APPEARANCES[theme]:
+            color = {"appearances": _IOS_APPEARANCES[theme], **color}
+        colors.append(color)
+    return json.dumps({"colors": colors, "info": _XCODE_INFO}, indent=2) + "\n"
+
+
+@register_exporter("ios")
+def export_ios(model):
+    root = "ios/Colors.xcassets"
+    folder = json.dumps({"info": _XCODE_INFO}, indent=2) + "\n"
+    namespace = (
+        json.dumps(
+            {"info": _XCODE_INFO, "properties": {"provides-namespace": True}}, indent=2
+        )
+        + "\n"
+    )
+    files = {
+        f"{root}/Contents.json": folder,
+        f"{root}/Palette/Contents.json": namespace,
+    }
+    for key, hex_value in model.primitives.items():
+        files[f"{root}/Palette/{key}.colorset/Contents.json"] = _colorset(
+            [(None, hex_value)]
+        )
+
+    appearances = {}
+    for theme, entries in model.themes.items():
+        if theme not in _IOS_APPEARANCES:
+            continue
+        for name, _, hex_value in entries:
+            appearances.setdefault(name, []).append((theme, hex_value))
+    for name, values in appearances.items():
+        files[f"{root}/{name}.colorset/Contents.json"] = _colorset(values)
+    return files
+
+
+# W3C design tokens (Design Tokens Community Group format)
+@register_exporter("w3c")
+def export_w3c(model):
+    tokens = {
+        "color": {
+            ramp: {
+                shade: {"$type": "color", "$value": hex_value}
+                for shade, _, hex_value in shades
+            }
+            for ramp, shades in model.ramps.items()
+        }
+    }
+    for theme, entries in model.themes.items():
+        group = tokens.setdefault(theme, {})
+        for name, primitive, hex_value in entries:
+            value = hex_value
+            if primitive is not None:
+                ramp, _, shade = primitive.rpartition("-")
+                value = f"{{color.{ramp}.{shade}}}"
+            group[name] = {"$type": "color", "$value": value}
+
+    typography = tokens["typography"] = {}
+    for slug, group, variant, size, line_height, weight in model.text_styles:
+        typography.setdefault(group, {})[variant] = {
+            "$type": "typography",
+            "$value": {
+                "fontFamily": model.font_family,
+                "fontSize": f"{size}px",
+                "fontWeight": int(weight),
+                "lineHeight": float(line_height),
+            },
+        }
+    return {"tokens.json": json.dumps(tokens, indent=2) + "\n"}
+
+
+# Figma Variables REST payload (POST /v1/files/:file_key/variables)
+def _figma_color(hex_value):
+    red, green, blue = _rgb_components(hex_value)
+    return {"r": red / 255, "g": green / 255, "b": blue / 255, "a": 1}
+
+
+def figma_variables_payload(model):
+    """
+    Builds the Figma Variables REST payload of a model.
+
+    Primitives, semantic tokens (one mode per theme, aliasing the
+    primitives) and typography (font family, and font size, line height in
+    px and font weight of every text style) each get a collection. All ids
+    are temporary ids such as "primitive:grey-0".
+
+    Returns:
+        dict: Body of POST /v1/files/:file_key/variables.
+    """
+    theme_names = list(model.themes)
+    payload = {
+        "variableCollections": [
+            {
+                "action": "CREATE",
+                "id": "primitives",
+                "name": f"{model.name} primitives",
+                "initialModeId": "primitives-mode",
+            },
+            {
+                "action": "CREATE",
+                "id": "semantic",
+                "name": f"{model.name} semantic",
+                "initialModeId": f"mode-{theme_names[0]}" if theme_names else "mode",
+            },
+            {
+                "action": "CREATE",
+                "id": "typography",
+                "name": f"{model.name} typography",
+                "initialModeId": "typography-mode",
+            },
+        ],
+        "variableModes": [
+            {
+                "action": "UPDATE",
+                "id": "primitives-mode",
+                "name": "Value",
+                "variableCollectionId": "primitives",
+            },
+            {
+                "action": "UPDATE",
+                "id": "typography-mode",
+                "name": "Value",
+                "variableCollectionId": "typography",
+            },
+        ],
+        "variables": [],
+        "variableModeValues": [],
+    }
+    for position, theme in enumerate(theme_names):
+        payload["variableModes"].append(
+            {
+                "action": "UPDATE" if position == 0 else "CREATE",
+                "id": f"mode-{theme}",
+                "name": theme.capitalize(),
+                "variableCollectionId": "semantic",
+            }
+        )
+
+    for key, hex_value in model.primitives.items():
+        ramp, _, shade = key.rpartition("-")
+        payload["variables"].append(
+            {
+                "action": "CREATE",
+                "id": f"primitive:{key}",
+                "name": f"{ramp}/{shade}",
+                "variableCollectionId": "primitives",
+                "resolvedType": "COLOR",
+            }
+        )
+        payload["variableModeValues"].append(
+            {
+                "variableId": f"primitive:{key}",
+                "modeId": "primitives-mode",
+                "value": _figma_color(hex_value),
+            }
+        )
+
+    declared = set()
+    for theme, entries in model.themes.items():
+        for name, primitive, hex_value in entries:
+            if name not in declared:
+                declared.add(name)
+                payload["variables"].append(
+                    {
+                        "action": "CREATE",
+                        "id": f"semantic:{name}",
+                        "name": name,
+                        "variableCollectionId": "semantic",
+                        "resolvedType": "COLOR",
+                    }
+                )
+            value = _figma_color(hex_value)
+            if primitive is not None:
+                value = {"type": "VARIABLE_ALIAS", "id": f"primitive:{primitive}"}
+            payload["variableModeValues"].append(
+                {
+                    "variableId": f"semantic:{name}",
+                    "modeId": f"mode-{theme}",
+                    "value": value,
+                }
+            )
+
+    def typography_variable(variable_id, name, resolved_type, value):
+        payload["variables"].append(
+            {
+                "action": "CREATE",
+                "id": variable_id,
+                "name": name,
+                "variableCollectionId": "typography",
+                "resolvedType": resolved_type,
+            }
+        )
+        payload["variableModeValues"].append(
+            {"variableId": variable_id, "modeId": "typography-mode", "value": value}
+        )
+
+    typography_variable(
+        "typography:font-family", "font-family", "STRING", model.font_family
+    )
+    for slug, group, variant, size, line_height, weight in model.text_styles:
+        size = float(size)
+        for field, value in (
+            ("font-size", size),
+            ("line-height", round(size * float(line_height), 2)),
+            ("font-weight", float(weight)),
+        ):
+            typography_variable(
+                f"typography:{slug}/{field}",
+                f"{group}/{variant}/{field}",
+                "FLOAT",
+                value,
+            )
+    return payload
+
+
+@register_exporter("figma")
+def export_figma(model):
+    payload = figma_variables_payload(model)
+    return {"figma_variables.json": json.dumps(payload, indent=2) + "\n"}
+
+
+def _write_file(path, content):
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with open(path, mode) as file:
+        file.write(content)
+    return path
+
+
+def export_tokens(model, output_dir, formats=None, max_workers=None):
+    """
+    Renders the model in several formats concurrently and writes the files.
+
+    Args:
+        model (ResolvedModel): Resolved tokens to export.
+        output_dir (str): Directory receiving the files.
+        formats (list): Format names from EXPORTERS; all when None.
+        max_workers (int): Thread pool size; defaults to the executor's.
+
+    Returns:
+        list: Paths of the written files.
+    """
+    formats = list(EXPORTERS) if formats is None else list(formats)
+    unknown = [name for name in formats if name not in EXPORTERS]
+    if unknown:
+        raise ValueError(
+            f"unknown export formats {unknown}, expected {list(EXPORTERS)}"
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        rendered = list(executor.map(lambda name: EXPORTERS[name](model), formats))
+
+        files = {}
+        for outputs in rendered:
+            for relative_path, content in outputs.items():
+                files[os.path.join(output_dir, relative_path)] = content
+        # Create every folder once, then write all files together
+        for folder in sorted({os.path.dirname(path) for path in files}):
+            os.makedirs(folder, exist_ok=True)
+        return list(executor.map(_write_file, files, files.values()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export design tokens.")
+    parser.add_argument("output_dir", help="directory receiving the exported files")
+    parser.add_argument("--formats", nargs="+", choices=list(EXPORTERS))
+    parser.add_argument("--index", help="token_index.bin to export (default: repo)")
+    parser.add_argument("--name", default="figma-generator")
+    args = parser.parse_args(argv)
+
+    typography = dict(DEFAULT_TYPOGRAPHY)
+    font_family = typography.pop("font_family")
+    if args.index:
+        index = TokenIndex.load(args.index)
+    else:
+        color_map = load_json(DEFAULT_COLOR_MAP_PATH)
+        themes = {theme: load_json(path) for theme, path in DEFAULT_THEME_PATHS.items()}
+        index = TokenIndex.from_maps(color_map, themes)
+    model = ResolvedModel(index, font_family, build_variations(**typography), args.name)
+
+    written = export_tokens(model, args.output_dir, args.formats)
+    print(f"Exported {len(written)} files to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import json
+import os
+
+from .profiling import stage
+
+# The checked-in palette and material templates the CLIs default to
+HELPERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_COLOR_MAP_PATH = os.path.join(
+    HELPERS_DIR, "primitive_colors", "primitive_colors_map.json"
+)
+TEMPLATE_DIR = os.path.join(HELPERS_DIR, "meterial_semantic", "meterial_tamplete")
+DEFAULT_THEME_PATHS = {
+    theme: os.path.join(TEMPLATE_DIR, f"{theme}_theme_semantic.json")
+    for theme in ("light", "dark")
+}
+
+
+# Function to load JSON data from a file
+def load_json(filename):
+    with stage("read", file=os.path.basename(filename)):
+        with open(filename, "r") as file:
+            return json.load(file)
+
+
+def save_json(filename, data):
+    # Artifacts are written with indent=4 to match the checked-in files
+    with stage("write", file=os.path.basename(filename)) as current:
+        with open(filename, "w") as file:
+            json.dump(data, file, indent=4)
+            current.add_stream(file)
+    return filename
+
+
+def save_to_file(file_path, content):
+    with stage("write", file=os.path.basename(file_path)) as current:
+        with open(file_path, "w") as file:
+            file.write(content)
+            current.add_stream(file)
+    return file_path
+
+
+def save_svg(file_path, write_svg, *args):
+    # Stream an SVG writer function such as write_palette_svg straight to disk
+    with stage("write", file=os.path.basename(file_path)) as current:
+        with open(file_path, "w") as file:
+            write_svg(file, *args)
+            current.add_stream(file)
+    return file_path
@@ -0,0 +1,446 @@
+"""
+Font metrics for laying out text.
+
+Reads the few tables text measurement needs (head, hhea, hmtx, cmap, OS/2
+and name) straight from local TrueType and OpenType files, including the
+fonts of .ttc collections. Font directories are indexed once by family,
+weight and style, and each (family, weight, style) is parsed at most once
+per process, so laying out many brands that share fonts reads every file a
+single time.
+
+Families that are not installed fall back to the Helvetica widths, which
+Arial shares. An empty tuple of directories always gives these built-in
+widths, which is how the typography board is laid out unless font
+directories are passed, so the default board is the same on every machine.
+Advance widths are summed without kerning.
+"""
+
+import mmap
+import os
+import struct
+from functools import lru_cache
+
+# Extra font directories, separated by os.pathsep, searched first
+FONT_PATH_VARIABLE = "FIGMA_GENERATOR_FONT_PATH"
+FONT_DIRS = [
+    "~/.fonts",
+    "~/.local/share/fonts",
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "~/Library/Fonts",
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+]
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".otc")
+
+# Helvetica / Arial advance widths of U+0020 to U+007E, 1000 units per em
+_HELVETICA_WIDTHS = (
+    [278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278]
+    + [556] * 10
+    + [278, 278, 584, 584, 584, 556, 1015, 667, 667, 722, 722, 667, 611, 778, 722]
+    + [278, 500, 667, 556, 833, 722, 778, 667, 778, 722, 667, 611, 722, 667, 944]
+    + [667, 667, 611, 278, 278, 278, 469, 556, 333, 556, 556, 500, 556, 556, 278]
+    + [556, 556, 222, 222, 500, 222, 833, 556, 556, 556, 556, 333, 500, 278, 556]
+    + [500, 722, 500, 500, 500, 334, 260, 334, 584]
+)
+_HELVETICA_BOLD_WIDTHS = (
+    [278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278]
+    + [556] * 10
+    + [333, 333, 584, 584, 584, 611, 975, 722, 722, 722, 722, 667, 611, 778, 722]
+    + [278, 556, 722, 611, 833, 722, 778, 667, 778, 722, 667, 611, 722, 667, 944]
+    + [667, 667, 611, 333, 278, 333, 584, 556, 333, 556, 611, 556, 611, 556, 333]
+    + [611, 611, 278, 278, 556, 278, 889, 611, 611, 611, 611, 389, 556, 333, 611]
+    + [556, 778, 556, 556, 500, 389, 280, 389, 584]
+)
+
+
+class FontMetrics:
+    """
+    Horizontal metrics of one font face.
+
+    Args:
+        family (str): Family name.
+        weight (int): CSS weight, 100-900.
+        italic (bool): Whether the face is italic.
+        units_per_em (int): Design units per em.
+        ascender (int): Typographic ascender, positive.
+        descender (int): Typographic descender, negative.
+        line_gap (int): Extra space between lines.
+        advances (dict): Code point -> advance width in design units.
+        default_advance (int): Advance of characters missing from the font.
+        path (str): Font file, or None for the built-in fallback.
+    """
+
+    __slots__ = (
+        "family",
+        "weight",
+        "italic",
+        "units_per_em",
+        "ascender",
+        "descender",
+        "line_gap",
+        "advances",
+        "default_advance",
+        "path",
+    )
+
+    def __init__(
+        self,
+        family,
+        weight,
+        italic,
+        units_per_em,
+        ascender,
+        descender,
+        line_gap,
+        advances,
+        default_advance,
+        path=None,
+    ):
+        self.family = family
+        self.weight = weight
+        self.italic = italic
+        self.units_per_em = units_per_em
+        self.ascender = ascender
+        self.descender = descender
+        self.line_gap = line_gap
+        self.advances = advances
+        self.default_advance = default_advance
+        self.path = path
+
+    def measure(self, text, size):
+        """
+        Returns:
+            float: Width of text set at size pixels.
+        """
+        advances, default = self.advances, self.default_advance
+        units = sum(advances.get(ord(char), default) for char in text)
+        return units * size / self.units_per_em
+
+    def ascent(self, size):
+        # Distance from the baseline to the top of the line box
+        return self.ascender * size / self.units_per_em
+
+    def descent(self, size):
+        # Distance from the baseline to the bottom of the line box, positive
+        return -self.descender * size / self.units_per_em
+
+    def line_height(self, size):
+        # The font's natural distance between baselines
+        units = self.ascender - self.descender + self.line_gap
+        return units * size / self.units_per_em
+
+
+def fallback_metrics(weight=400, italic=False):
+    """
+    Built-in Helvetica metrics, bold from weight 600. The vertical metrics
+    are Arial's.
+    """
+    widths = _HELVETICA_BOLD_WIDTHS if int(weight) >= 600 else _HELVETICA_WIDTHS
+    advances = {32 + index: width for index, width in enumerate(widths)}
+    return FontMetrics(
+        "Helvetica", int(weight), italic, 1000, 905, -212, 33, advances, 556
+    )
+
+
+class _FontFile:
+    # Table directory of one face of a font file
+
+    def __init__(self, data, font_number=0):
+        self.data = data
+        offset = 0
+        if data[:4] == b"ttcf":
+            count = struct.unpack_from(">I", data, 8)[0]
+            if font_number >= count:
+                raise ValueError(f"collection has {count} fonts")
+            offset = struct.unpack_from(">I", data, 12 + 4 * font_number)[0]
+        elif font_number:
+            raise ValueError("not a font collection")
+        table_count = struct.unpack_from(">H", data, offset + 4)[0]
+        self.tables = {}
+        for index in range(table_count):
+            tag, _, table_offset, length = struct.unpack_from(
+                ">4sIII", data, offset + 12 + 16 * index
+            )
+            self.tables[tag.decode("latin-1")] = (table_offset, length)
+
+    def table(self, tag):
+        if tag not in self.tables:
+            raise ValueError(f"font has no {tag} table")
+        return self.tables[tag][0]
+
+    def family(self):
+        # Typographic family (name id 16), else the legacy family (id 1)
+        offset = self.table("name")
+        count, strings = struct.unpack_from(">2xHH", self.data, offset)
+        names = {}
+        for index in range(count):
+            platform, encoding, _, name_id, length, string_offset = (
+                struct.unpack_from(">6H", self.data, offset + 6 + 12 * index)
+            )
+            if name_id not in (1, 16) or name_id in names:
+                continue
+            start = offset + strings + string_offset
+            raw = self.data[start : start + length]
+            if platform == 3 or platform == 0:
+                names[name_id] = raw.decode("utf-16-be", "replace")
+            elif platform == 1 and encoding == 0:
+                names[name_id] = raw.decode("mac-roman", "replace")
+        return names.get(16) or names.get(1) or ""
+
+    def style(self):
+        # (CSS weight, italic) from OS/2, falling back to head.macStyle
+        mac_style = struct.unpack_from(">H", self.data, self.table("head") + 44)[0]
+        if "OS/2" not in self.tables:
+            return (700 if mac_style & 1 else 400), bool(mac_style & 2)
+        offset = self.table("OS/2")
+        weight = struct.unpack_from(">H", self.data, offset + 4)[0]
+        selection = struct.unpack_from(">H", self.data, offset + 62)[0]
+        return weight or 400, bool(selection & 1 or mac_style & 2)
+
+    def metrics(self, path):
+        data = self.data
+        units_per_em = struct.unpack_from(">H", data, self.table("head") + 18)[0]
+        hhea = self.table("hhea")
+        ascender, descender, line_gap = struct.unpack_from(">hhh", data, hhea + 4)
+        metric_count = struct.unpack_from(">H", data, hhea + 34)[0]
+        hmtx = self.table("hmtx")
+        # hmtx holds (advance, left side bearing) pairs
+        widths = struct.unpack_from(f">{2 * metric_count}H", data, hmtx)[::2]
+        # Glyphs past the last metric repeat its advance
+        last = widths[-1] if widths else 0
+        advances = {
+            code_point: widths[glyph] if glyph < metric_count else last
+            for code_point, glyph in self.character_map().items()
+        }
+        weight, italic = self.style()
+        return FontMetrics(
+            self.family(),
+            weight,
+            italic,
+            units_per_em,
+            ascender,
+            descender,
+            line_gap,
+            advances,
+            widths[0] if widths else 0,
+            path,
+        )
+
+    def character_map(self):
+        # Code point -> glyph id from the best Unicode cmap subtable
+        data = self.data
+        offset = self.table("cmap")
+        count = struct.unpack_from(">H", data, offset + 2)[0]
+        subtables = {}
+        for index in range(count):
+            platform, encoding, sub_offset = struct.unpack_from(
+                ">HHI", data, offset + 4 + 8 * index
+            )
+            sub_format = struct.unpack_from(">H", data, offset + sub_offset)[0]
+            subtables[(platform, encoding, sub_format)] = offset + sub_offset
+        for key in ((3, 10, 12), (0, 4, 12), (0, 6, 12), (3, 1, 4), (0, 3, 4)):
+            if key in subtables:
+                read = _cmap_format_12 if key[2] == 12 else _cmap_format_4
+                return read(data, subtables[key])
+        for (platform, _, sub_format), sub_offset in subtables.items():
+            if platform == 0 and sub_format in (4, 12):
+                read = _cmap_format_12 if sub_format == 12 else _cmap_format_4
+                return read(data, sub_offset)
+        return {}
+
+
+def _cmap_format_4(data, offset):
+    segments = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    ends_at = offset + 14
+    starts_at = ends_at + 2 * segments + 2
+    deltas_at = starts_at + 2 * segments
+    ranges_at = deltas_at + 2 * segments
+    ends = struct.unpack_from(f">{segments}H", data, ends_at)
+    starts = struct.unpack_from(f">{segments}H", data, starts_at)
+    deltas = struct.unpack_from(f">{segments}h", data, deltas_at)
+    ranges = struct.unpack_from(f">{segments}H", data, ranges_at)
+    mapping = {}
+    for segment in range(segments):
+        start, end, delta, range_offset = (
+            starts[segment],
+            ends[segment],
+            deltas[segment],
+            ranges[segment],
+        )
+        if start == 0xFFFF:
+            continue
+        for code_point in range(start, end + 1):
+            if range_offset == 0:
+                glyph = (code_point + delta) & 0xFFFF
+            else:
+                address = (
+                    ranges_at + 2 * segment + range_offset + 2 * (code_point - start)
+                )
+                glyph = struct.unpack_from(">H", data, address)[0]
+                if glyph:
+                    glyph = (glyph + delta) & 0xFFFF
+            if glyph:
+                mapping[code_point] = glyph
+    return mapping
+
+
+def _cmap_format_12(data, offset):
+    groups = struct.unpack_from(">I", data, offset + 12)[0]
+    mapping = {}
+    for group in range(groups):
+        start, end, glyph = struct.unpack_from(">III", data, offset + 16 + 12 * group)
+        for code_point in range(start, end + 1):
+            mapping[code_point] = glyph + code_point - start
+    return mapping
+
+
+def read_font_metrics(path, font_number=0):
+    """
+    Parses the metrics of one face of a font file.
+
+    Args:
+        path (str): .ttf, .otf, .ttc or .otc file.
+        font_number (int): Face of a collection.
+
+    Returns:
+        FontMetrics: The face's metrics.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    return _FontFile(data, font_number).metrics(path)
+
+
+def font_dirs():
+    """
+    Returns:
+        tuple: Font directories that exist, FIGMA_GENERATOR_FONT_PATH first.
+    """
+    extra = os.environ.get(FONT_PATH_VARIABLE, "").split(os.pathsep)
+    candidates = [path for path in extra if path] + FONT_DIRS
+    return tuple(
+        path
+        for path in (os.path.expanduser(candidate) for candidate in candidates)
+        if os.path.isdir(path)
+    )
+
+
+def _faces(path):
+    # (family, weight, italic, font number) of every face in a font file. The
+    # file is memory-mapped, so only the pages of the tables read are loaded
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        count = struct.unpack_from(">I", data, 8)[0] if data[:4] == b"ttcf" else 1
+        faces = []
+        for font_number in range(count):
+            face = _FontFile(data, font_number)
+            faces.append((face.family(), *face.style(), font_number))
+        return faces
+
+
+def _font_paths(dirs):
+    # Font files under some directories, in priority order
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if filename.lower().endswith(FONT_EXTENSIONS):
+                    yield os.path.join(root, filename)
+
+
+def font_files(dirs):
+    """
+    Identifies the font files under some directories, for cache keys.
+
+    Args:
+        dirs (tuple): Directories searched recursively, see font_index.
+
+    Returns:
+        list: [path, size, mtime_ns] of every font file, in priority order.
+    """
+    files = []
+    for path in _font_paths(dirs):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append([path, stat.st_size, stat.st_mtime_ns])
+    return files
+
+
+@lru_cache(maxsize=8)
+def font_index(dirs):
+    """
+    Indexes the fonts under some directories, reading only the table
+    directory and the name, head and OS/2 tables of each file.
+
+    Args:
+        dirs (tuple): Directories searched recursively, in priority order.
+
+    Returns:
+        dict: Lowercase family -> list of (weight, italic, path, font number).
+    """
+    index = {}
+    for path in _font_paths(dirs):
+        try:
+            faces = _faces(path)
+        except (OSError, ValueError, struct.error):
+            continue
+        for family, weight, italic, font_number in faces:
+            index.setdefault(family.lower(), []).append(
+                (weight, italic, path, font_number)
+            )
+    return index
+
+
+def _closest_face(faces, weight, italic):
+    # CSS-style matching: the right style first, then the nearest weight,
+    # preferring heavier faces above 500 and lighter ones below
+    def distance(face):
+        face_weight, face_italic = face[0], face[1]
+        heavier = face_weight > weight
+        prefer_heavier = weight > 500
+        return (
+            face_italic != italic,
+            abs(face_weight - weight),
+            heavier != prefer_heavier,
+        )
+
+    return min(faces, key=distance)
+
+
+@lru_cache(maxsize=256)
+def _load_font_metrics(family, weight, italic, dirs):
+    faces = font_index(dirs).get(family)
+    if not faces:
+        return fallback_metrics(weight, italic)
+    _, _, path, font_number = _closest_face(faces, weight, italic)
+    try:
+        return read_font_metrics(path, font_number)
+    except (OSError, ValueError, struct.error):
+        return fallback_metrics(weight, italic)
+
+
+def load_font_metrics(family, weight=400, italic=False, dirs=None):
+    """
+    Finds the installed face closest to a family, weight and style.
+
+    Faces are parsed once per process and reused for every later call.
+
+    Args:
+        family (str): Family name, matched case-insensitively.
+        weight: CSS weight, as an int or a string such as "700".
+        italic (bool): Look for an italic face.
+        dirs (tuple): Font directories; defaults to font_dirs(). An empty
+            tuple selects fallback_metrics.
+
+    Returns:
+        FontMetrics: The face's metrics, or fallback_metrics when the family
+        is not installed.
+    """
+    if dirs is None:
+        dirs = font_dirs()
+    return _load_font_metrics(
+        family.lower(), int(weight), bool(italic), tuple(dirs)
+    )
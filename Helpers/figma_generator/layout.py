@@ -0,0 +1,103 @@
+"""
+Board layout.
+
+The boards compute the position of every group up front, in one pass over
+the sizes of their blocks, instead of advancing hardcoded offsets while
+they write. Blocks are packed into shelves of bounded width (first fit,
+tallest blocks first), and the tight bounding box of what was placed sizes
+the root <svg>, so large boards neither overflow their canvas nor leave
+empty space Figma has to handle.
+"""
+
+from collections import namedtuple
+
+Box = namedtuple("Box", ["x", "y", "width", "height"])
+
+
+def grid_positions(count, columns, step_x, step_y, y=0):
+    """
+    Places count equal cells in rows of columns.
+
+    Returns:
+        list: (x, y) of every cell, row by row.
+    """
+    return [
+        ((index % columns) * step_x, y + (index // columns) * step_y)
+        for index in range(count)
+    ]
+
+
+def pack_shelves(sizes, max_width=None, gap_x=0, gap_y=0):
+    """
+    Packs blocks into horizontal shelves no wider than max_width.
+
+    Blocks are assigned to shelves tallest first, each to the first shelf
+    with room left, which keeps the wasted height of every shelf small.
+    Within a shelf, blocks keep their input order, so blocks of equal height
+    read in order and an unbounded width gives a single row in input order.
+
+    Args:
+        sizes (list): (width, height) of every block.
+        max_width (float): Canvas width; None for a single shelf. A block
+            wider than max_width gets a shelf of its own.
+        gap_x (float): Space between blocks on a shelf.
+        gap_y (float): Space between shelves.
+
+    Returns:
+        list: Box of every block, in input order.
+    """
+    order = sorted(range(len(sizes)), key=lambda index: -sizes[index][1])
+    narrowest = min((width for width, _ in sizes), default=0)
+    shelves = []  # [used width, height, members]
+    # Shelves that still fit the narrowest block
+    open_shelves = []
+    for index in order:
+        width, height = sizes[index]
+        for shelf in open_shelves:
+            if max_width is None or shelf[0] + gap_x + width <= max_width:
+                shelf[0] += gap_x + width
+                shelf[2].append(index)
+                break
+        else:
+            shelf = [width, height, [index]]
+            shelves.append(shelf)
+            open_shelves.append(shelf)
+        if max_width is not None and shelf[0] + gap_x + narrowest > max_width:
+            open_shelves.remove(shelf)
+
+    boxes = [None] * len(sizes)
+    y = 0
+    for _, shelf_height, members in shelves:
+        x = 0
+        for index in sorted(members):
+            width, height = sizes[index]
+            boxes[index] = Box(x, y, width, height)
+            x += width + gap_x
+        y += shelf_height + gap_y
+    return boxes
+
+
+def stack(sizes, gap=0):
+    """
+    Stacks blocks vertically, in order.
+
+    Returns:
+        list: Box of every block.
+    """
+    boxes = []
+    y = 0
+    for width, height in sizes:
+        boxes.append(Box(0, y, width, height))
+        y += height + gap
+    return boxes
+
+
+def bounding_box(boxes):
+    """
+    Returns:
+        tuple: (width, height) of the smallest canvas at the origin that
+        holds every box.
+    """
+    width = max((box.x + box.width for box in boxes), default=0)
+    height = max((box.y + box.height for box in boxes), default=0)
+    return width, height
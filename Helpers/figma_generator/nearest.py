@@ -0,0 +1,333 @@
+"""
+Nearest palette token lookup for arbitrary hex colors.
+
+The palette is indexed in OKLab, where Euclidean distance follows perceived
+color difference, with a balanced KD-tree (widest axis, median splits). A
+batch of queries walks the tree together: each query first descends to its
+closest leaf for an upper bound, then every subtree whose bounding box is
+farther than that bound is pruned for the whole batch in one array operation
+per level. Results are exact.
+
+Usage:
+    python -m figma_generator.nearest legacy.css -o legacy.tokens.css
+    python -m figma_generator.nearest legacy.css --replace hex --max-distance 0.05
+"""
+
+import argparse
+import re
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from .colors import hex_to_rgb, normalize_hex
+from .files import DEFAULT_COLOR_MAP_PATH, load_json
+from .perceptual import linear_to_oklab, srgb_to_linear
+
+LEAF_SIZE = 32
+# Queries per batch, bounds the size of the traversal frontier
+QUERY_BLOCK = 4096
+# Coordinate for padding slots in partially filled leaves
+_FAR = 1e6
+
+Match = namedtuple("Match", ["color", "key", "hex", "distance"])
+
+
+def _oklab(rgb):
+    return linear_to_oklab(srgb_to_linear(rgb))
+
+
+class PaletteIndex:
+    """
+    KD-tree over the colors of a primitive colors map.
+
+    The tree is balanced and stored implicitly: node i has children 2i and
+    2i + 1, the root is node 1 and the leaves fill the last level.
+
+    Args:
+        color_map (dict): Mapping of primitive key to hex color, such as
+            primitive_colors_map.json. Maps of several brands can be merged
+            with prefixed keys.
+        leaf_size (int): Most colors per leaf.
+    """
+
+    def __init__(self, color_map, leaf_size=LEAF_SIZE):
+        self.keys = list(color_map)
+        self.hex = [color_map[key] for key in self.keys]
+        rgb = np.asarray([hex_to_rgb(value) for value in self.hex], dtype=np.uint8)
+        self.points = _oklab(rgb.reshape(len(self.keys), 3))
+
+        # Split every segment along its widest axis at the median, level by level
+        count = len(self.keys)
+        self.depth = max(0, int(np.ceil(np.log2(max(count, 1) / leaf_size))))
+        leaves = [np.arange(count)]
+        for _ in range(self.depth):
+            halves = []
+            for members in leaves:
+                points = self.points[members]
+                axis = int(np.argmax(np.ptp(points, axis=0)))
+                middle = len(members) // 2
+                order = np.argpartition(points[:, axis], middle)
+                halves += [members[order[:middle]], members[order[middle:]]]
+            leaves = halves
+        widest = max(len(leaf) for leaf in leaves)
+
+        # Leaves padded to the same size so a batch can gather them at once
+        self._leaf_members = np.full((len(leaves), widest), -1, dtype=np.intp)
+        self._leaf_points = np.full((len(leaves), widest, 3), _FAR)
+        self._box_low = np.full((2 * len(leaves), 3), _FAR)
+        self._box_high = np.full((2 * len(leaves), 3), -_FAR)
+        first_leaf = len(leaves)
+        for i, leaf in enumerate(leaves):
+            if not len(leaf):
+                continue
+            self._leaf_members[i, : len(leaf)] = leaf
+            self._leaf_points[i, : len(leaf)] = self.points[leaf]
+            self._box_low[first_leaf + i] = self.points[leaf].min(axis=0)
+            self._box_high[first_leaf + i] = self.points[leaf].max(axis=0)
+        for node in range(first_leaf - 1, 0, -1):
+            children = [2 * node, 2 * node + 1]
+            self._box_low[node] = self._box_low[children].min(axis=0)
+            self._box_high[node] = self._box_high[children].max(axis=0)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _box_distances(self, queries, nodes):
+        # Squared distance from each query to the bounding box of its node
+        outside = np.maximum(
+            self._box_low[nodes] - queries, queries - self._box_high[nodes]
+        )
+        return (np.maximum(outside, 0) ** 2).sum(axis=-1)
+
+    def _scan_leaves(self, queries, leaves):
+        # Closest member of each leaf and its squared distance
+        offsets = self._leaf_points[leaves] - queries[:, np.newaxis]
+        distances = (offsets**2).sum(axis=-1)
+        closest = np.argmin(distances, axis=1)
+        rows = np.arange(len(leaves))
+        return self._leaf_members[leaves, closest], distances[rows, closest]
+
+    def query_rgb(self, rgb):
+        """
+        Finds the nearest palette color of every query color.
+
+        Args:
+            rgb (numpy.ndarray): uint8 array of shape (N, 3).
+
+        Returns:
+            tuple: int array of palette positions and float array of OKLab
+            distances, both of length N.
+        """
+        queries = _oklab(np.asarray(rgb, dtype=np.uint8).reshape(-1, 3))
+        positions = np.full(len(queries), -1, dtype=np.intp)
+        distances = np.full(len(queries), np.inf)
+        if not len(self.keys):
+            return positions, distances
+
+        for start in range(0, len(queries), QUERY_BLOCK):
+            block = slice(start, start + QUERY_BLOCK)
+            positions[block], distances[block] = self._query_block(queries[block])
+        return positions, np.sqrt(distances)
+
+    def _query_block(self, queries):
+        first_leaf = 1 << self.depth
+
+        # Descend to the leaf whose box is closest at every split; its best
+        # member bounds the search
+        nodes = np.ones(len(queries), dtype=np.intp)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_distance = self._box_distances(queries, left)
+            right_distance = self._box_distances(queries, left + 1)
+            nodes = np.where(left_distance <= right_distance, left, left + 1)
+        best_members, best = self._scan_leaves(queries, nodes - first_leaf)
+
+        # Walk the tree again for all queries at once, keeping only the
+        # (query, node) pairs whose box could hold something closer
+        owners = np.flatnonzero(best > 0)
+        nodes = np.ones(len(owners), dtype=np.intp)
+        for _ in range(self.depth):
+            owners = np.repeat(owners, 2)
+            nodes = (2 * np.repeat(nodes, 2)) + np.tile([0, 1], len(nodes))
+            near = self._box_distances(queries[owners], nodes) < best[owners]
+            owners, nodes = owners[near], nodes[near]
+        if not len(owners):
+            return best_members, best
+
+        members, candidates = self._scan_leaves(queries[owners], nodes - first_leaf)
+        # Keep the closest candidate per query
+        order = np.lexsort((candidates, owners))
+        owners, members, candidates = owners[order], members[order], candidates[order]
+        first = np.r_[True, owners[1:] != owners[:-1]]
+        owners, members, candidates = owners[first], members[first], candidates[first]
+        better = candidates < best[owners]
+        best[owners[better]] = candidates[better]
+        best_members[owners[better]] = members[better]
+        return best_members, best
+
+    def nearest(self, colors):
+        """
+        Maps hex colors onto their nearest palette tokens.
+
+        Args:
+            colors (list): Hex color strings, "#rgb" or "#rrggbb".
+
+        Returns:
+            list: Match(color, key, hex, distance) per query, in order.
+            distance is the Euclidean OKLab distance (0 for an exact match,
+            about 0.02 for a just noticeable difference).
+        """
+        if not self.keys:
+            raise ValueError("cannot match colors against an empty palette")
+        rgb = np.asarray(
+            [hex_to_rgb(normalize_hex(color)) for color in colors], dtype=np.uint8
+        )
+        positions, distances = self.query_rgb(rgb.reshape(len(colors), 3))
+        return [
+            Match(color, self.keys[position], self.hex[position], distance)
+            for color, position, distance in zip(
+                colors, positions.tolist(), distances.tolist()
+            )
+        ]
+
+
+# Hex colors in declaration values; selectors are skipped while rewriting
+_HEX_COLOR = re.compile(r"#(?:[0-9a-fA-F]{6}|[0-9a-fA-F]{3})(?![0-9a-fA-F])")
+_CSS_DELIMITER = re.compile(r"([{}:;])")
+# At-rules whose blocks hold rules rather than declarations
+_GROUPING_AT_RULE = re.compile(
+    r"\s*@(?:media|supports|document|layer|container|scope|starting-style"
+    r"|(?:-[a-z]+-)?keyframes)\b",
+    re.IGNORECASE,
+)
+
+
+class _CssRewriter:
+    # Tracks whether the stream is inside a declaration value across lines
+
+    def __init__(self, index, replace, max_distance):
+        self.index = index
+        self.replace = replace
+        self.max_distance = max_distance
+        self.replacements = {}
+        # Whether each open block holds declarations (True) or rules (False)
+        self.blocks = []
+        # Text of the current statement, since the last "{", "}" or ";"
+        self.statement = ""
+        self.in_value = False
+        self.rewritten = 0
+
+    def resolve(self, lines):
+        # Look up every unseen color of a block of lines in one batch
+        unseen = {
+            color.lower()
+            for line in lines
+            for color in _HEX_COLOR.findall(line)
+            if color.lower() not in self.replacements
+        }
+        if not unseen:
+            return
+        for match in self.index.nearest(sorted(unseen)):
+            if self.max_distance is not None and match.distance > self.max_distance:
+                self.replacements[match.color] = None
+            elif self.replace == "hex":
+                self.replacements[match.color] = match.hex
+            else:
+                self.replacements[match.color] = f"var(--{match.key})"
+
+    def _substitute(self, match):
+        replacement = self.replacements.get(match.group(0).lower())
+        if replacement is None:
+            return match.group(0)
+        self.rewritten += 1
+        return replacement
+
+    def rewrite(self, line):
+        parts = _CSS_DELIMITER.split(line)
+        for i in range(0, len(parts), 2):
+            delimiter = parts[i + 1] if i + 1 < len(parts) else ""
+            if self.in_value and delimiter != "{":
+                parts[i] = _HEX_COLOR.sub(self._substitute, parts[i])
+            self.statement += parts[i] + delimiter
+            if delimiter == "{":
+                # Selectors and the preludes of @media and friends open blocks
+                grouping = _GROUPING_AT_RULE.match(self.statement)
+                self.blocks.append(grouping is None)
+                self.statement = ""
+                self.in_value = False
+            elif delimiter in ("}", ";"):
+                if delimiter == "}" and self.blocks:
+                    self.blocks.pop()
+                self.statement = ""
+                self.in_value = False
+            elif delimiter == ":" and self.blocks and self.blocks[-1]:
+                # A colon in a declaration block ends the property name; in a
+                # block of rules it belongs to a selector such as a:hover
+                self.in_value = True
+        return "".join(parts)
+
+
+def rewrite_css(source, out, index, replace="var", max_distance=None, block_lines=4096):
+    """
+    Replaces hex colors in a stylesheet with their nearest palette tokens.
+
+    The stylesheet is streamed in blocks of lines. The new colors of each
+    block are looked up in one batch and remembered for the rest of the file.
+
+    Args:
+        source: Text stream to read, iterated line by line.
+        out: Text stream with a write(str) method.
+        index (PaletteIndex): Palette to map onto.
+        replace (str): "var" writes var(--<key>), "hex" writes the palette hex.
+        max_distance (float): Leave colors farther than this OKLab distance
+            from the palette unchanged.
+        block_lines (int): Lines per lookup batch.
+
+    Returns:
+        int: Number of colors replaced.
+    """
+    rewriter = _CssRewriter(index, replace, max_distance)
+    block = []
+    for line in source:
+        block.append(line)
+        if len(block) >= block_lines:
+            rewriter.resolve(block)
+            out.write("".join(rewriter.rewrite(line) for line in block))
+            block = []
+    rewriter.resolve(block)
+    out.write("".join(rewriter.rewrite(line) for line in block))
+    return rewriter.rewritten
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rewrite the hex colors of a stylesheet as palette tokens."
+    )
+    parser.add_argument("css", help="stylesheet to rewrite, - for stdin")
+    parser.add_argument("-o", "--output", help="destination (default: stdout)")
+    parser.add_argument("--color-map", default=DEFAULT_COLOR_MAP_PATH)
+    parser.add_argument("--replace", choices=["var", "hex"], default="var")
+    parser.add_argument(
+        "--max-distance",
+        type=float,
+        default=None,
+        help="keep colors farther than this OKLab distance from the palette",
+    )
+    args = parser.parse_args(argv)
+
+    index = PaletteIndex(load_json(args.color_map))
+    source = sys.stdin if args.css == "-" else open(args.css, "r")
+    out = sys.stdout if args.output is None else open(args.output, "w")
+    try:
+        rewritten = rewrite_css(source, out, index, args.replace, args.max_distance)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f"Replaced {rewritten} colors", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
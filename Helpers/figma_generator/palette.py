@@ -0,0 +1,524 @@
+from functools import partial
+
+import numpy as np
+
+from .colors import hex_to_rgb, normalize_hex
+from .layout import bounding_box, grid_positions, pack_shelves, stack
+from .perceptual import COLOR_SPACES, perceptual_shade_grid
+from .profiling import profiled, stage
+from .svg import Group, Label, Swatch, render_to_string, write_tree
+from .templates import TemplateNode, load_template, template_step
+
+# Default base colors and shade values
+DEFAULT_COLORS = {
+    "grey": "6B7280",
+    "grey-variant": "6d8691",
+    "error": "f87c04",
+    "primary": "ffc800",
+    "secondary": "B523FA",
+    "tertiary": "EC6890",
+}
+DEFAULT_SHADE_VALUES = (
+    [0, 2, 4, 6, 8, 10]
+    + list(range(11, 21))
+    + [22, 24, 26, 28, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80]
+    + list(range(81, 101))
+)
+
+
+# Batch color conversion functions. These mirror rgb_to_hsl / hsl_to_rgb in
+# colors.py operation for operation, so the resulting hex strings are
+# identical to the ones produced one shade at a time.
+def hex_to_rgb_array(hex_colors, strict=False):
+    """
+    Parses a sequence of hex color strings into an RGB array.
+
+    Args:
+        hex_colors (list): Hex color strings, with or without a leading "#".
+            Strings are read two digits at a time like the original script,
+            so a short value such as "f87c4" parses as (0xf8, 0x7c, 0x4).
+        strict (bool): Only accept three or six digit colors and raise
+            ValueError for anything else.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (N, 3).
+    """
+    if strict:
+        hex_colors = [normalize_hex(color) for color in hex_colors]
+    rgb = [hex_to_rgb(color) for color in hex_colors]
+    return np.asarray(rgb, dtype=np.uint8).reshape(len(rgb), 3)
+
+
+def rgb_to_hsl_array(rgb):
+    """
+    Converts an array of RGB colors to HSL.
+
+    Args:
+        rgb (numpy.ndarray): Array of shape (..., 3) with values in [0, 255].
+
+    Returns:
+        numpy.ndarray: float64 array of shape (..., 3) holding (h, s, l) in [0, 1].
+    """
+    rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    max_color = np.maximum(np.maximum(r, g), b)
+    min_color = np.minimum(np.minimum(r, g), b)
+    l = (max_color + min_color) / 2
+
+    d = max_color - min_color
+    chromatic = d != 0
+    # Avoid dividing by zero for achromatic colors; their results are masked out
+    safe_d = np.where(chromatic, d, 1.0)
+    s = np.where(
+        l > 0.5,
+        d / np.where(chromatic, 2 - max_color - min_color, 1.0),
+        d / np.where(chromatic, max_color + min_color, 1.0),
+    )
+
+    h_red = (g - b) / safe_d + np.where(g < b, 6, 0)
+    h_green = (b - r) / safe_d + 2
+    h_blue = (r - g) / safe_d + 4
+    h = np.where(max_color == r, h_red, np.where(max_color == g, h_green, h_blue))
+    h = h / 6
+
+    h = np.where(chromatic, h, 0.0)
+    s = np.where(chromatic, s, 0.0)
+    return np.stack((h, s, l), axis=-1)
+
+
+def _hue_to_rgb_array(p, q, t):
+    """
+    Vectorized counterpart of the nested hue_to_rgb helper.
+    """
+    t = np.where(t < 0, t + 1, t)
+    t = np.where(t > 1, t - 1, t)
+    return np.where(
+        t < 1 / 6,
+        p + (q - p) * 6 * t,
+        np.where(t < 1 / 2, q, np.where(t < 2 / 3, p + (q - p) * (2 / 3 - t) * 6, p)),
+    )
+
+
+def hsl_to_rgb_array(hsl):
+    """
+    Converts an array of HSL colors to RGB.
+
+    Args:
+        hsl (numpy.ndarray): Array of shape (..., 3) holding (h, s, l) in [0, 1].
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (..., 3).
+    """
+    hsl = np.asarray(hsl, dtype=np.float64)
+    h, s, l = hsl[..., 0], hsl[..., 1], hsl[..., 2]
+
+    q = np.where(l < 0.5, l * (1 + s), l + s - l * s)
+    p = 2 * l - q
+    r = _hue_to_rgb_array(p, q, h + 1 / 3)
+    g = _hue_to_rgb_array(p, q, h)
+    b = _hue_to_rgb_array(p, q, h - 1 / 3)
+
+    achromatic = s == 0
+    rgb = np.stack(
+        (
+            np.where(achromatic, l, r),
+            np.where(achromatic, l, g),
+            np.where(achromatic, l, b),
+        ),
+        axis=-1,
+    )
+    # Truncate like int(x * 255) does in the scalar version
+    return np.trunc(rgb * 255).astype(np.uint8)
+
+
+def rgb_array_to_hex(rgb):
+    """
+    Converts an array of RGB colors to hex strings.
+
+    Args:
+        rgb (numpy.ndarray): uint8 array of shape (..., 3).
+
+    Returns:
+        list: Flat list of "#rrggbb" strings in row-major order.
+    """
+    rgb = np.asarray(rgb, dtype=np.uint32).reshape(-1, 3)
+    packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    return ["#%06x" % value for value in packed.tolist()]
+
+
+@profiled("color_math")
+def generate_shade_grid(base_colors, shade_values, color_space="hsl"):
+    """
+    Generates every shade of every base color in one array operation.
+
+    Hue and saturation are kept from each base color and the lightness is
+    replaced by shade / 100. With a perceptual color space ("oklch" or
+    "lab") hue and chroma are kept instead and the perceptual lightness
+    follows the stops; see perceptual.py. Perceptual spaces parse the base
+    colors strictly, so malformed hex strings raise ValueError.
+
+    Args:
+        base_colors (list): Base hex color strings.
+        shade_values (list): Lightness stops in the range 0-100.
+        color_space (str): "hsl" (default), "oklch" or "lab".
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (len(base_colors), len(shade_values), 3).
+    """
+    if color_space not in COLOR_SPACES:
+        raise ValueError(
+            f"unknown color space {color_space!r}, expected one of {COLOR_SPACES}"
+        )
+    if color_space != "hsl":
+        base_rgb = hex_to_rgb_array(base_colors, strict=True)
+        return perceptual_shade_grid(base_rgb, shade_values, color_space)
+
+    base_hsl = rgb_to_hsl_array(hex_to_rgb_array(base_colors))
+    lightness = np.asarray(shade_values, dtype=np.float64) / 100
+
+    grid = np.empty((len(base_hsl), len(lightness), 3), dtype=np.float64)
+    grid[..., 0] = base_hsl[:, 0, np.newaxis]
+    grid[..., 1] = base_hsl[:, 1, np.newaxis]
+    grid[..., 2] = lightness[np.newaxis, :]
+    return hsl_to_rgb_array(grid)
+
+
+def generate_palette(
+    colors=DEFAULT_COLORS, shade_values=DEFAULT_SHADE_VALUES, color_space="hsl"
+):
+    """
+    Generates the primitive colors map for a set of base colors.
+
+    Args:
+        colors (dict): Mapping of color name to base hex color.
+        shade_values (list): Lightness stops in the range 0-100.
+        color_space (str): "hsl", "oklch" or "lab", see generate_shade_grid.
+
+    Returns:
+        dict: Mapping of "<name>-<shade*10>" to hex, in the same order and
+        format as primitive_colors_map.json.
+    """
+    grid = generate_shade_grid(list(colors.values()), shade_values, color_space)
+    hex_values = iter(rgb_array_to_hex(grid))
+    return {
+        f"{color_name}-{shade*10}": next(hex_values)
+        for color_name in colors
+        for shade in shade_values
+    }
+
+
+# Swatch board layout
+ELEMENTS_PER_ROW = 10
+# Distance between the built-in swatches, (x, y), and their width
+SHADE_STEPS = (120, 100)
+SWATCH_WIDTH = 100
+# Space between color groups
+GROUP_GAP = 50
+# Slots filled for every swatch of a palette template
+PALETTE_SLOTS = ("id", "x", "y", "swatch_id", "fill", "shade", "hex", "name")
+
+
+def _shade_steps(template):
+    # Swatch spacing of the built-in markup or of a template
+    if template is None:
+        return SHADE_STEPS
+    return template_step(template.width, 20), template_step(template.height, 20)
+
+
+def _shade_group_size(shade_count, columns, template):
+    # Width of the widest row of swatches; height of the group name plus one
+    # step per row of swatches
+    step_x, step_y = _shade_steps(template)
+    swatch_width = SWATCH_WIDTH
+    if template is not None:
+        swatch_width = template_step(template.width, 0)
+    rows = max(-(-shade_count // columns), 1)
+    width = (min(shade_count, columns) - 1) * step_x + swatch_width
+    return max(width, 0), 20 + rows * step_y
+
+
+def _shade_node(color_name, shade, new_hex, x_offset, y_offset):
+    # Node for the shade: swatch plus its shade and hex labels
+    shade_key = f"{color_name}-{shade*10}"
+    return Group(
+        shade_key,
+        children=[
+            Swatch(f"{color_name}/{shade*10}", new_hex, x_offset, y_offset, 100, 50, 8),
+            Label(
+                f"Shade: {shade*10}",
+                x_offset + 50,
+                y_offset + 65,
+                8,
+                attributes=' text-anchor="middle"',
+            ),
+            Label(
+                f"Hex: {new_hex}",
+                x_offset + 50,
+                y_offset + 80,
+                8,
+                attributes=' text-anchor="middle"',
+            ),
+        ],
+        indent="\n        ",
+        tail="\n        ",
+    )
+
+
+def _template_shade_node(template, color_name, shade, new_hex, x_offset, y_offset):
+    return TemplateNode(
+        template,
+        {
+            "id": f"{color_name}-{shade*10}",
+            "x": x_offset,
+            "y": y_offset,
+            "swatch_id": f"{color_name}/{shade*10}",
+            "fill": new_hex,
+            "shade": shade * 10,
+            "hex": new_hex,
+            "name": color_name,
+        },
+    )
+
+
+def generate_individual_shade_svg(
+    base_color,
+    color_name,
+    shade_values,
+    shade_hexes=None,
+    color_space="hsl",
+    template=None,
+    columns=ELEMENTS_PER_ROW,
+):
+    """
+    Builds the node group for one color ramp.
+
+    Args:
+        base_color (str): Base hex color.
+        color_name (str): Name of the color, used for ids and the caption.
+        shade_values (list): Lightness stops in the range 0-100.
+        shade_hexes (list): Optional precomputed hex row for this color.
+        color_space (str): Color space used when shade_hexes is not given.
+        template (SvgTemplate): Optional component used for each swatch
+            instead of the built-in markup, see build_palette_tree.
+        columns (int): Swatches per row.
+
+    Returns:
+        tuple: The shades dict, the color Group (its transform is left for
+        the caller to set) and the height of the group.
+    """
+    # Shades are computed in one batch by generate_shade_grid; callers rendering
+    # many colors can pass the precomputed hex row for this color instead.
+    if shade_hexes is None:
+        shade_hexes = rgb_array_to_hex(
+            generate_shade_grid([base_color], shade_values, color_space)
+        )
+
+    shades_dict = {}
+    # Add the color group name at the top
+    color_group = Group(
+        f"{color_name}-group",
+        label=Label(
+            color_name.capitalize(), 0, 15, 14, attributes=' text-anchor="start"'
+        ),
+        indent="\n",
+    )
+
+    build_node = _shade_node
+    if template is not None:
+        build_node = partial(_template_shade_node, template)
+    positions = grid_positions(len(shade_values), columns, *_shade_steps(template), 20)
+    for shade, new_hex, (x_offset, y_offset) in zip(
+        shade_values, shade_hexes, positions
+    ):
+        shades_dict[f"{color_name}-{shade*10}"] = new_hex
+        color_group.append(build_node(color_name, shade, new_hex, x_offset, y_offset))
+
+    # Return the height of the group, including space for the name
+    _, group_height = _shade_group_size(len(shade_values), columns, template)
+    return shades_dict, color_group, group_height
+
+
+@profiled("palette.assemble")
+def build_palette_tree(
+    colors=DEFAULT_COLORS,
+    shade_values=DEFAULT_SHADE_VALUES,
+    fragment_cache=None,
+    color_space="hsl",
+    template=None,
+    columns=ELEMENTS_PER_ROW,
+    max_width=None,
+):
+    """
+    Builds the node tree for the primitive colors board.
+
+    Color groups are produced lazily while the tree is written; wrap the
+    root's children in list() to keep the whole tree around.
+
+    Args:
+        colors (dict): Mapping of color name to base hex color.
+        shade_values (list): Lightness stops in the range 0-100.
+        fragment_cache (FragmentCache): Optional cache of rendered color
+            groups. Only groups whose inputs changed are recomputed.
+        color_space (str): "hsl", "oklch" or "lab", see generate_shade_grid.
+        template: Optional SvgTemplate or template path, such as
+            DEFAULT_TEMPLATES["palette"], instantiated for every swatch. It
+            can bind the slots in PALETTE_SLOTS; the swatch spacing follows
+            the template's size.
+        columns (int): Swatches per row of a color group.
+        max_width (int): Canvas width the color groups are packed into,
+            side by side where they fit. By default they are stacked.
+
+    Returns:
+        Group: The root <svg> node, sized to the bounding box of the groups.
+    """
+    if template is not None:
+        template = load_template(template)
+        template.check_slots(PALETTE_SLOTS)
+    color_items = list(colors.items())
+
+    # Place every color group before anything is rendered
+    sizes = [_shade_group_size(len(shade_values), columns, template)] * len(colors)
+    if max_width is None:
+        boxes = stack(sizes, GROUP_GAP)
+    else:
+        boxes = pack_shelves(sizes, max_width, GROUP_GAP, GROUP_GAP)
+    board_width, board_height = bounding_box(boxes)
+    transforms = [f"translate({box.x}, {box.y})" for box in boxes]
+
+    keys = None
+    stale = range(len(color_items))
+    if fragment_cache is not None:
+        keys = [
+            fragment_cache.key(
+                "palette",
+                color_name,
+                base_color_hex,
+                shade_values,
+                color_space,
+                transform,
+                columns,
+                *([] if template is None else [template.plan]),
+            )
+            for (color_name, base_color_hex), transform in zip(color_items, transforms)
+        ]
+        stale = [index for index, key in enumerate(keys) if key not in fragment_cache]
+
+    # Convert the (stale base colors x shade values) grid in one array operation
+    shade_grid = generate_shade_grid(
+        [color_items[index][1] for index in stale], shade_values, color_space
+    )
+    grid_rows = {color_index: row for row, color_index in enumerate(stale)}
+
+    def color_groups():
+        for color_index, (color_name, base_color_hex) in enumerate(color_items):
+            row = grid_rows.get(color_index)
+            if row is None:
+                yield fragment_cache.node(keys[color_index])
+                continue
+
+            with stage("palette.group", color=color_name):
+                _, color_group, _ = generate_individual_shade_svg(
+                    base_color_hex,
+                    color_name,
+                    shade_values,
+                    rgb_array_to_hex(shade_grid[row]),
+                    template=template,
+                    columns=columns,
+                )
+                color_group.transform = transforms[color_index]
+                if fragment_cache is not None:
+                    color_group = fragment_cache.store(keys[color_index], color_group)
+            yield color_group
+
+    return Group(
+        "color-shades",
+        children=color_groups(),
+        tag="svg",
+        attributes=f' xmlns="http://www.w3.org/2000/svg" width="{board_width}" height="{board_height}" style="overflow: visible;"',
+        indent="\n",
+        tail="\n",
+    )
+
+
+def write_palette_svg(
+    out,
+    colors=DEFAULT_COLORS,
+    shade_values=DEFAULT_SHADE_VALUES,
+    fragment_cache=None,
+    color_space="hsl",
+    minify=False,
+    template=None,
+    columns=ELEMENTS_PER_ROW,
+    max_width=None,
+):
+    """
+    Streams the primitive colors board to a text stream.
+
+    Each color group is written as soon as its swatches are produced, so
+    only one color ramp is held in memory at a time.
+
+    Args:
+        out: Text stream with a write(str) method.
+        colors (dict): Mapping of color name to base hex color.
+        shade_values (list): Lightness stops in the range 0-100.
+        fragment_cache (FragmentCache): Optional cache of rendered color groups.
+        color_space (str): "hsl", "oklch" or "lab", see generate_shade_grid.
+        minify (bool): Write the minified board, see SvgWriter. Fragments are
+            cached in the regular form, so this cannot be combined with a
+            fragment cache.
+        template: Optional swatch component, see build_palette_tree.
+        columns (int): Swatches per row of a color group.
+        max_width (int): Canvas width to pack the color groups into, see
+            build_palette_tree.
+    """
+    if minify and fragment_cache is not None:
+        raise ValueError("minified boards cannot use a fragment cache")
+    write_tree(
+        out,
+        build_palette_tree(
+            colors,
+            shade_values,
+            fragment_cache,
+            color_space,
+            template,
+            columns,
+            max_width,
+        ),
+        minify,
+    )
+
+
+def render_palette_svg(
+    colors=DEFAULT_COLORS,
+    shade_values=DEFAULT_SHADE_VALUES,
+    color_space="hsl",
+    minify=False,
+    template=None,
+    columns=ELEMENTS_PER_ROW,
+    max_width=None,
+):
+    """
+    Renders the primitive colors board.
+
+    Args:
+        colors (dict): Mapping of color name to base hex color.
+        shade_values (list): Lightness stops in the range 0-100.
+        color_space (str): "hsl", "oklch" or "lab", see generate_shade_grid.
+        minify (bool): Render the minified board, see SvgWriter.
+        template: Optional swatch component, see build_palette_tree.
+        columns (int): Swatches per row of a color group.
+        max_width (int): Canvas width to pack the color groups into.
+
+    Returns:
+        str: The primitive_colors.svg document.
+    """
+    return render_to_string(
+        write_palette_svg,
+        colors,
+        shade_values,
+        color_space=color_space,
+        minify=minify,
+        template=template,
+        columns=columns,
+        max_width=max_width,
+    )
@@ -0,0 +1,196 @@
+"""
+Perceptual color spaces for shade generation.
+
+OKLCH and CIE LCh(ab) versions of the shade engine. Each base color keeps its
+hue and chroma while the perceptual lightness follows the shade stops, so
+equal steps in the stops look like equal steps on screen. Ramps that leave
+the sRGB gamut are mapped back by reducing chroma at constant lightness and
+hue, found with a bisection that runs over the whole grid at once.
+"""
+
+import numpy as np
+
+COLOR_SPACES = ("hsl", "oklch", "lab")
+
+# Bisection steps for gamut mapping; 20 steps resolve chroma to about 1e-6
+GAMUT_STEPS = 20
+GAMUT_EPSILON = 1e-9
+
+# CIE XYZ <-> linear sRGB, D65 white point
+_RGB_TO_XYZ = np.array(
+    [
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ]
+)
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+_D65_WHITE = _RGB_TO_XYZ.sum(axis=1)
+_LAB_DELTA = 6 / 29
+
+# Linear sRGB <-> OKLab (Ottosson)
+_RGB_TO_LMS = np.array(
+    [
+        [0.4122214708, 0.5363325363, 0.0514459929],
+        [0.2119034982, 0.6806995451, 0.1073969566],
+        [0.0883024619, 0.2817188376, 0.6299787005],
+    ]
+)
+_LMS_TO_OKLAB = np.array(
+    [
+        [0.2104542553, 0.7936177850, -0.0040720468],
+        [1.9779984951, -2.4285922050, 0.4505937099],
+        [0.0259040371, 0.7827717662, -0.8086757660],
+    ]
+)
+_OKLAB_TO_LMS = np.array(
+    [
+        [1.0, 0.3963377774, 0.2158037573],
+        [1.0, -0.1055613458, -0.0638541728],
+        [1.0, -0.0894841775, -1.2914855480],
+    ]
+)
+_LMS_TO_RGB = np.array(
+    [
+        [4.0767416621, -3.3077115913, 0.2309699292],
+        [-1.2684380046, 2.6097574011, -0.3413193965],
+        [-0.0041960863, -0.7034186147, 1.7076147010],
+    ]
+)
+
+
+def srgb_to_linear(rgb):
+    """
+    Converts sRGB values in [0, 255] to linear light in [0, 1].
+    """
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(linear):
+    """
+    Converts linear light to sRGB values in [0, 255], rounded and clipped.
+
+    Returns:
+        numpy.ndarray: uint8 array of the same shape.
+    """
+    c = np.clip(linear, 0.0, 1.0)
+    c = np.where(c <= 0.0031308, c * 12.92, 1.055 * c ** (1 / 2.4) - 0.055)
+    return np.rint(c * 255).astype(np.uint8)
+
+
+def linear_to_oklab(linear):
+    lms = np.cbrt(linear @ _RGB_TO_LMS.T)
+    return lms @ _LMS_TO_OKLAB.T
+
+
+def oklab_to_linear(lab):
+    lms = (lab @ _OKLAB_TO_LMS.T) ** 3
+    return lms @ _LMS_TO_RGB.T
+
+
+def _lab_f(t):
+    return np.where(t > _LAB_DELTA**3, np.cbrt(t), t / (3 * _LAB_DELTA**2) + 4 / 29)
+
+
+def _lab_f_inverse(t):
+    return np.where(t > _LAB_DELTA, t**3, 3 * _LAB_DELTA**2 * (t - 4 / 29))
+
+
+def linear_to_lab(linear):
+    xyz = (linear @ _RGB_TO_XYZ.T) / _D65_WHITE
+    fx, fy, fz = (_lab_f(xyz[..., i]) for i in range(3))
+    return np.stack((116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)), axis=-1)
+
+
+def lab_to_linear(lab):
+    fy = (lab[..., 0] + 16) / 116
+    fx = fy + lab[..., 1] / 500
+    fz = fy - lab[..., 2] / 200
+    xyz = np.stack([_lab_f_inverse(f) for f in (fx, fy, fz)], axis=-1) * _D65_WHITE
+    return xyz @ _XYZ_TO_RGB.T
+
+
+def to_lch(lab):
+    """
+    Converts (L, a, b) to (L, chroma, hue in radians).
+    """
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    hue = np.arctan2(lab[..., 2], lab[..., 1])
+    return np.stack((lab[..., 0], chroma, hue), axis=-1)
+
+
+def from_lch(lch):
+    lightness, chroma, hue = lch[..., 0], lch[..., 1], lch[..., 2]
+    return np.stack(
+        (lightness, chroma * np.cos(hue), chroma * np.sin(hue)), axis=-1
+    )
+
+
+_SPACES = {
+    # name: (linear -> lab, lab -> linear, lightness scale of the shade stops)
+    "oklch": (linear_to_oklab, oklab_to_linear, 1 / 100),
+    "lab": (linear_to_lab, lab_to_linear, 1.0),
+}
+
+
+def _in_gamut(linear):
+    return np.all((linear >= -GAMUT_EPSILON) & (linear <= 1 + GAMUT_EPSILON), axis=-1)
+
+
+def gamut_map(lch, to_linear):
+    """
+    Brings LCh colors into sRGB by lowering chroma at constant L and hue.
+
+    All colors are bisected together, so the cost is GAMUT_STEPS array
+    conversions regardless of how many colors are out of gamut.
+
+    Args:
+        lch (numpy.ndarray): Array of shape (..., 3).
+        to_linear (callable): Lab -> linear sRGB conversion of the space.
+
+    Returns:
+        numpy.ndarray: Linear sRGB array of shape (..., 3).
+    """
+    linear = to_linear(from_lch(lch))
+    outside = ~_in_gamut(linear)
+    if not outside.any():
+        return linear
+
+    candidates = lch[outside]
+    low = np.zeros(len(candidates))
+    high = candidates[:, 1].copy()
+    for _ in range(GAMUT_STEPS):
+        middle = (low + high) / 2
+        trial = candidates.copy()
+        trial[:, 1] = middle
+        fits = _in_gamut(to_linear(from_lch(trial)))
+        low = np.where(fits, middle, low)
+        high = np.where(fits, high, middle)
+
+    candidates[:, 1] = low
+    linear[outside] = to_linear(from_lch(candidates))
+    return linear
+
+
+def perceptual_shade_grid(base_rgb, shade_values, space):
+    """
+    Generates shade ramps in a perceptual color space.
+
+    Args:
+        base_rgb (numpy.ndarray): uint8 array of shape (N, 3).
+        shade_values (list): Lightness stops in the range 0-100.
+        space (str): "oklch" or "lab".
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (N, len(shade_values), 3).
+    """
+    to_lab, to_linear, scale = _SPACES[space]
+    base_lch = to_lch(to_lab(srgb_to_linear(base_rgb)))
+    lightness = np.asarray(shade_values, dtype=np.float64) * scale
+
+    grid = np.empty((len(base_lch), len(lightness), 3), dtype=np.float64)
+    grid[..., 0] = lightness[np.newaxis, :]
+    grid[..., 1] = base_lch[:, 1, np.newaxis]
+    grid[..., 2] = base_lch[:, 2, np.newaxis]
+    return linear_to_srgb(gamut_map(grid, to_linear))
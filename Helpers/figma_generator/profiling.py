@@ -0,0 +1,306 @@
+"""
+Per-stage profiling of the generators.
+
+The generators mark their stages (color math, fragment rendering,
+categorization, container assembly, serialization, file writes) with
+stage(). While a Profiler is enabled, every stage records its wall time,
+the bytes it wrote and, optionally, the memory it allocated. Profiling is
+off by default: stage() then returns a shared no-op context manager, so the
+markers can stay in production code.
+
+Enable it with enable(), with --profile trace.json on the batch entry point,
+or for any program by setting FIGMA_GENERATOR_PROFILE to the trace path:
+
+    FIGMA_GENERATOR_PROFILE=trace.json python material_semantic_generator.py
+
+The trace is a Chrome trace (open it in chrome://tracing or Perfetto) with a
+per-stage "summary" added, which tracing tools ignore. Setting
+FIGMA_GENERATOR_PROFILE_ALLOCATIONS=1 also tracks allocations through
+tracemalloc, which slows everything down several times.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import tracemalloc
+from functools import wraps
+
+PROFILE_VARIABLE = "FIGMA_GENERATOR_PROFILE"
+ALLOCATIONS_VARIABLE = "FIGMA_GENERATOR_PROFILE_ALLOCATIONS"
+
+# The enabled profiler, None when profiling is off
+_profiler = None
+
+
+class _NullStage:
+    """
+    Stage returned while profiling is off; every method does nothing.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def add_bytes(self, count):
+        pass
+
+    def add_stream(self, stream):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "args", "start", "bytes", "memory", "peak")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.bytes = 0
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler._exit(self, time.perf_counter_ns())
+        return False
+
+    def add_bytes(self, count):
+        """
+        Counts bytes of output produced by the stage.
+        """
+        self.bytes += count
+
+    def add_stream(self, stream):
+        """
+        Counts everything written to a stream so far, if it can tell.
+        """
+        try:
+            self.bytes += stream.tell()
+        except (AttributeError, OSError, ValueError):
+            pass
+
+
+class Profiler:
+    """
+    Records stages as Chrome trace events.
+
+    Args:
+        allocations (bool): Track the memory allocated by every stage with
+            tracemalloc.
+
+    Attributes:
+        events (list): Complete ("ph": "X") trace events, in the order the
+            stages ended.
+    """
+
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        self.events = []
+        # Stages currently open, for folding the tracemalloc peak into them
+        self._open = []
+
+    def _fold_peak(self):
+        # tracemalloc keeps a single peak; hand it to every open stage
+        # before it is reset for the next one
+        peak = tracemalloc.get_traced_memory()[1]
+        for stage in self._open:
+            stage.peak = max(stage.peak, peak)
+        tracemalloc.reset_peak()
+
+    def _enter(self, stage):
+        if self.allocations:
+            self._fold_peak()
+            stage.memory = tracemalloc.get_traced_memory()[0]
+            stage.peak = stage.memory
+            self._open.append(stage)
+
+    def _exit(self, stage, end):
+        args = dict(stage.args)
+        if stage.bytes:
+            args["bytes"] = stage.bytes
+        if self.allocations:
+            self._fold_peak()
+            self._open.remove(stage)
+            args["allocated"] = tracemalloc.get_traced_memory()[0] - stage.memory
+            args["peak"] = stage.peak - stage.memory
+        self.events.append(
+            {
+                "name": stage.name,
+                "ph": "X",
+                "ts": stage.start / 1000,
+                "dur": (end - stage.start) / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    def summary(self):
+        """
+        Aggregates the recorded stages.
+
+        Returns:
+            dict: Stage name -> "calls", "total_ms", "max_ms", "bytes" and,
+            with allocation tracking, "allocated" and "peak" (largest peak
+            of one call), ordered by total time.
+        """
+        stages = {}
+        for event in self.events:
+            totals = stages.get(event["name"])
+            if totals is None:
+                totals = stages[event["name"]] = {
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "bytes": 0,
+                }
+                if self.allocations:
+                    totals.update(allocated=0, peak=0)
+            milliseconds = event["dur"] / 1000
+            totals["calls"] += 1
+            totals["total_ms"] += milliseconds
+            totals["max_ms"] = max(totals["max_ms"], milliseconds)
+            args = event["args"]
+            totals["bytes"] += args.get("bytes", 0)
+            if "allocated" in args:
+                totals["allocated"] += args["allocated"]
+                totals["peak"] = max(totals["peak"], args["peak"])
+        return dict(sorted(stages.items(), key=lambda item: -item[1]["total_ms"]))
+
+    def trace(self):
+        """
+        Returns:
+            dict: Chrome trace in the JSON object format, with the summary
+            under "summary".
+        """
+        return {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "summary": self.summary(),
+        }
+
+    def save(self, path):
+        with open(path, "w") as file:
+            json.dump(self.trace(), file)
+        return path
+
+    def format_summary(self):
+        """
+        Returns:
+            str: The summary as a plain text table.
+        """
+        lines = [
+            f"{'stage':<24} {'calls':>7} {'total ms':>10} {'max ms':>9} "
+            f"{'bytes':>11}"
+        ]
+        for name, totals in self.summary().items():
+            lines.append(
+                f"{name:<24} {totals['calls']:>7} {totals['total_ms']:>10.2f} "
+                f"{totals['max_ms']:>9.2f} {totals['bytes']:>11}"
+            )
+            if "allocated" in totals:
+                lines[-1] += (
+                    f"  allocated {totals['allocated']}, peak {totals['peak']}"
+                )
+        return "\n".join(lines)
+
+
+def enable(profiler=None, allocations=False):
+    """
+    Turns profiling on for this process.
+
+    Args:
+        profiler (Profiler): Profiler to record into; a new one by default.
+        allocations (bool): Track allocations when creating a new profiler.
+
+    Returns:
+        Profiler: The enabled profiler.
+    """
+    global _profiler
+    if profiler is None:
+        profiler = Profiler(allocations)
+    if profiler.allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _profiler = profiler
+    return profiler
+
+
+def disable():
+    """
+    Turns profiling off.
+
+    Returns:
+        Profiler: The profiler that was enabled, or None.
+    """
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None and profiler.allocations and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return profiler
+
+
+def active_profiler():
+    return _profiler
+
+
+def stage(name, **args):
+    """
+    Marks a stage of work.
+
+        with stage("semantic.categorize", theme="light") as current:
+            ...
+            current.add_bytes(len(markup))
+
+    Args:
+        name (str): Stage name; stages with the same name are aggregated in
+            the summary.
+        **args: Extra JSON-serializable details stored on the trace event.
+
+    Returns:
+        A context manager; a shared no-op one while profiling is off.
+    """
+    profiler = _profiler
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name, args)
+
+
+def profiled(name):
+    """
+    Decorator marking every call of a function as a stage.
+    """
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return function(*args, **kwargs)
+            with _Stage(profiler, name, {}):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _enable_from_environment():
+    path = os.environ.get(PROFILE_VARIABLE)
+    if not path:
+        return
+    profiler = enable(allocations=os.environ.get(ALLOCATIONS_VARIABLE) == "1")
+    atexit.register(profiler.save, path)
+
+
+_enable_from_environment()
@@ -0,0 +1,786 @@
+"""
+Figma push stage.
+
+Uploads the Figma Variables payload of a brand (figma_variables_payload:
+primitives, semantic themes and typography) through the Figma REST API, so
+the boards no longer have to be dragged into Figma by hand. The REST API
+cannot create styles, so text styles are published as typography variables
+that styles can bind to.
+
+The payload is split into levels of batches:
+
+    1. the collections and modes, in one request
+    2. variables that alias nothing (primitives, typography) with their values
+    3. variables aliasing those (semantic tokens) with their values
+
+The batches of a level are sent concurrently. Figma answers every request
+with the real ids of the temporary ids it created, and later levels are
+rewritten to use them. Responses with status 429 or 5xx are retried after
+their Retry-After delay or an exponential backoff with jitter, and a rate
+limit hit by one request holds back every thread of the client.
+
+Progress is saved to a state file after every batch: the real ids and the
+hashes of the batches Figma accepted. A rerun skips those batches and sends
+variables that already exist as UPDATE instead of CREATE, so an interrupted
+push resumes where it stopped and an edited palette only resends the
+batches that changed.
+
+MockFigmaServer implements the variables endpoints in memory, including rate
+limits, so the pipeline can run offline.
+
+Usage:
+    python -m figma_generator.push FILE_KEY --index build/acme/token_index.bin
+    python -m figma_generator.push --brands build/ --file-keys file_keys.json
+    python -m figma_generator.push FILE_KEY --mock
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .cache import input_key
+from .exporters import ResolvedModel, figma_variables_payload
+from .files import DEFAULT_COLOR_MAP_PATH, DEFAULT_THEME_PATHS, load_json
+from .profiling import stage
+from .tokens import TokenIndex
+from .typography import DEFAULT_TYPOGRAPHY, TYPOGRAPHY_FILENAME, build_variations
+
+FIGMA_API = "https://api.figma.com"
+TOKEN_VARIABLE = "FIGMA_TOKEN"
+STATE_FILENAME = "figma_push_state.json"
+# Variables per request, with their mode values
+BATCH_SIZE = 500
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Fields an UPDATE of an existing object may carry besides its id
+_UPDATE_FIELDS = {
+    "variableCollections": ("name",),
+    "variableModes": ("name", "variableCollectionId"),
+    "variables": ("name",),
+}
+
+
+class FigmaError(RuntimeError):
+    """
+    Raised for API errors that retrying cannot fix.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(f"Figma API error {status}: {message}")
+        self.status = status
+
+
+def _retry_delay(retry_after, attempt, backoff, max_backoff):
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    # Half fixed, half random, so retrying threads don't hit the API in step
+    delay = min(max_backoff, backoff * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class FigmaClient:
+    """
+    Figma REST client with retries, safe to share between threads.
+
+    Args:
+        token (str): Personal access token, sent as X-Figma-Token.
+        base_url (str): API root, e.g. the url of a MockFigmaServer.
+        max_retries (int): Retries of a request answered with 429 or 5xx or
+            failing to connect.
+        backoff (float): First backoff delay in seconds when the response has
+            no Retry-After header; doubles with every retry.
+        max_backoff (float): Longest backoff delay.
+        timeout (float): Socket timeout of a request.
+
+    Attributes:
+        retries (int): Requests retried so far.
+    """
+
+    def __init__(
+        self,
+        token,
+        base_url=FIGMA_API,
+        max_retries=6,
+        backoff=1.0,
+        max_backoff=60.0,
+        timeout=60.0,
+    ):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retries = 0
+        self._lock = threading.Lock()
+        # time.monotonic() before which no request is sent
+        self._resume_at = 0.0
+
+    def _hold(self, delay):
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            self.retries += 1
+
+    def _wait(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def request(self, method, path, body=None):
+        """
+        Sends a request, retrying rate limits, server and connection errors.
+
+        Returns:
+            dict: The decoded JSON response.
+
+        Raises:
+            FigmaError: For other error statuses, or when the retries run out.
+        """
+        data = None
+        if body is not None:
+            data = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        headers = {"X-Figma-Token": self.token, "Content-Type": "application/json"}
+        for attempt in range(self.max_retries + 1):
+            self._wait()
+            request = urllib.request.Request(
+                self.base_url + path, data=data, headers=headers, method=method
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return json.loads(response.read() or b"{}")
+            except urllib.error.HTTPError as error:
+                status = error.code
+                retry_after = error.headers.get("Retry-After")
+                message = error.read().decode("utf-8", "replace")
+                error.close()
+                if status not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise FigmaError(status, message) from None
+            except (urllib.error.URLError, ConnectionError, TimeoutError) as error:
+                if attempt == self.max_retries:
+                    raise FigmaError(None, str(error)) from None
+                retry_after = None
+            self._hold(
+                _retry_delay(retry_after, attempt, self.backoff, self.max_backoff)
+            )
+
+    def post_variables(self, file_key, payload):
+        return self.request("POST", f"/v1/files/{file_key}/variables", payload)
+
+    def local_variables(self, file_key):
+        return self.request("GET", f"/v1/files/{file_key}/variables/local")
+
+
+class PushState:
+    """
+    Progress of the pushes to one Figma file, saved after every batch.
+
+    Args:
+        path (str): State file; None keeps the state in memory only.
+        file_key (str): File the state belongs to. A state file recorded for
+            another file is ignored.
+
+    Attributes:
+        ids (dict): Temporary id -> real Figma id.
+        done (set): Hashes of the batches Figma accepted.
+    """
+
+    def __init__(self, path=None, file_key=None):
+        self.path = path
+        self.file_key = file_key
+        self.ids = {}
+        self.done = set()
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            saved = load_json(path)
+            if saved.get("file_key") == file_key:
+                self.ids = saved["ids"]
+                self.done = set(saved["done"])
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.ids)
+
+    def record(self, batch_key, created_ids):
+        with self._lock:
+            self.ids.update(created_ids)
+            self.done.add(batch_key)
+            self._save()
+
+    def _save(self):
+        if self.path is None:
+            return
+        # Write a temporary file and swap it in, so a crash never leaves a
+        # half-written state behind
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(
+                {"file_key": self.file_key, "ids": self.ids, "done": sorted(self.done)},
+                file,
+            )
+        os.replace(temporary, self.path)
+
+
+def _aliases(values):
+    return [
+        entry["value"]["id"]
+        for entry in values
+        if isinstance(entry["value"], dict)
+        and entry["value"].get("type") == "VARIABLE_ALIAS"
+    ]
+
+
+def plan_batches(payload, batch_size=BATCH_SIZE):
+    """
+    Splits a variables payload into levels of batches.
+
+    Every variable travels with its mode values, and a variable lands in a
+    later level than the variables it aliases.
+
+    Args:
+        payload (dict): Output of figma_variables_payload.
+        batch_size (int): Most variables per batch.
+
+    Returns:
+        list: Levels, each a list of payload dicts; the first level is the
+        collections and modes.
+    """
+    values = {}
+    for entry in payload["variableModeValues"]:
+        values.setdefault(entry["variableId"], []).append(entry)
+    variables = {variable["id"]: variable for variable in payload["variables"]}
+
+    depths = {}
+
+    def depth(variable_id):
+        if variable_id not in depths:
+            targets = [
+                target
+                for target in _aliases(values.get(variable_id, []))
+                if target in variables
+            ]
+            depths[variable_id] = 1 + max(map(depth, targets), default=-1)
+        return depths[variable_id]
+
+    by_depth = {}
+    for variable_id in variables:
+        by_depth.setdefault(depth(variable_id), []).append(variable_id)
+
+    levels = [
+        [
+            {
+                "variableCollections": payload["variableCollections"],
+                "variableModes": payload["variableModes"],
+            }
+        ]
+    ]
+    for level in sorted(by_depth):
+        ids = by_depth[level]
+        levels.append(
+            [
+                {
+                    "variables": [variables[id] for id in ids[i : i + batch_size]],
+                    "variableModeValues": [
+                        entry
+                        for id in ids[i : i + batch_size]
+                        for entry in values.get(id, [])
+                    ],
+                }
+                for i in range(0, len(ids), batch_size)
+            ]
+        )
+    return levels
+
+
+def resolve_batch(batch, ids):
+    """
+    Rewrites a batch for the objects that already exist in Figma.
+
+    Temporary ids with a real id are replaced by it, and CREATE actions for
+    them become UPDATE actions.
+
+    Args:
+        batch (dict): A batch from plan_batches.
+        ids (dict): Temporary id -> real id.
+
+    Returns:
+        dict: The batch to send.
+    """
+    resolved = {}
+    for kind, entries in batch.items():
+        resolved[kind] = []
+        for entry in entries:
+            if kind == "variableModeValues":
+                value = entry["value"]
+                if _aliases([entry]):
+                    value = {**value, "id": ids.get(value["id"], value["id"])}
+                entry = {
+                    **entry,
+                    "variableId": ids.get(entry["variableId"], entry["variableId"]),
+                    "modeId": ids.get(entry["modeId"], entry["modeId"]),
+                    "value": value,
+                }
+            elif entry["id"] in ids:
+                fields = _UPDATE_FIELDS[kind]
+                entry = {
+                    "action": "UPDATE",
+                    "id": ids[entry["id"]],
+                    **{field: ids.get(entry[field], entry[field]) for field in fields},
+                }
+            elif "variableCollectionId" in entry:
+                collection = entry["variableCollectionId"]
+                entry = {
+                    **entry,
+                    "variableCollectionId": ids.get(collection, collection),
+                }
+            resolved[kind].append(entry)
+    return resolved
+
+
+def push_payload(
+    client, file_key, payload, state=None, batch_size=BATCH_SIZE, max_workers=4
+):
+    """
+    Pushes a variables payload to a Figma file.
+
+    Args:
+        client (FigmaClient): Client to send the batches with.
+        file_key (str): Key of the Figma file.
+        payload (dict): Output of figma_variables_payload.
+        state (PushState): Progress to resume from and record into; a new
+            in-memory state by default.
+        batch_size (int): Most variables per request.
+        max_workers (int): Requests in flight at once.
+
+    Returns:
+        dict: "batches", "sent", "skipped" and "seconds".
+    """
+    if state is None:
+        state = PushState(file_key=file_key)
+    levels = plan_batches(payload, batch_size)
+
+    def send(task):
+        level, key, batch = task
+        variables = len(batch.get("variables", ()))
+        with stage("figma.batch", level=level, variables=variables):
+            response = client.post_variables(
+                file_key, resolve_batch(batch, state.snapshot())
+            )
+        state.record(key, response.get("meta", {}).get("tempIdToRealId", {}))
+
+    start = time.perf_counter()
+    sent = skipped = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # A level only starts once the ids of the previous one are known
+        for level, batches in enumerate(levels):
+            tasks = []
+            for batch in batches:
+                key = input_key("figma-push", file_key, batch)
+                if key in state.done:
+                    skipped += 1
+                else:
+                    tasks.append((level, key, batch))
+            list(executor.map(send, tasks))
+            sent += len(tasks)
+
+    return {
+        "batches": sent + skipped,
+        "sent": sent,
+        "skipped": skipped,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def push_brands(client, build_dir, file_keys, typography=DEFAULT_TYPOGRAPHY, **options):
+    """
+    Pushes the brands of a batch build, each to its own Figma file.
+
+    Reads build_dir/<name>/token_index.bin and the brand's typography from
+    TYPOGRAPHY_FILENAME, and keeps the push state next to them in
+    STATE_FILENAME.
+
+    Args:
+        client (FigmaClient): Client shared by every brand.
+        build_dir (str): Output directory of figma_generator.batch.
+        file_keys (dict): Brand name -> Figma file key.
+        typography (dict): Typography preferences, see DEFAULT_TYPOGRAPHY,
+            for brands built without a TYPOGRAPHY_FILENAME.
+        **options: batch_size and max_workers, see push_payload.
+
+    Returns:
+        dict: Brand name -> push_payload summary.
+    """
+    typography = dict(typography)
+    default_font_family = typography.pop("font_family")
+    default_variations = build_variations(**typography)
+    summaries = {}
+    for name, file_key in file_keys.items():
+        brand_dir = os.path.join(build_dir, name)
+        index = TokenIndex.load(os.path.join(brand_dir, "token_index.bin"))
+        font_family, variations = default_font_family, default_variations
+        typography_path = os.path.join(brand_dir, TYPOGRAPHY_FILENAME)
+        if os.path.exists(typography_path):
+            # The brand's own font family, weights and type scale
+            saved = load_json(typography_path)
+            font_family, variations = saved["font_family"], saved["variations"]
+        model = ResolvedModel(index, font_family, variations, name)
+        state = PushState(os.path.join(brand_dir, STATE_FILENAME), file_key)
+        summaries[name] = push_payload(
+            client, file_key, figma_variables_payload(model), state, **options
+        )
+    return summaries
+
+
+class _MockError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _MockFile:
+    """
+    Variables of one file of the mock, with Figma's validation rules.
+    """
+
+    def __init__(self):
+        self.collections = {}
+        self.modes = {}  # mode id -> collection id
+        self.variables = {}
+        self._next_id = 1
+
+    def _new_id(self, prefix):
+        self._next_id += 1
+        return f"{prefix}:1:{self._next_id}"
+
+    def apply(self, body):
+        created = {}
+
+        def real(id):
+            return created.get(id, id)
+
+        def existing(table, id, kind):
+            id = real(id)
+            if id not in table:
+                raise _MockError(400, f"unknown {kind} {id}")
+            return id
+
+        for entry in body.get("variableCollections", ()):
+            if entry["action"] == "CREATE":
+                collection_id = created[entry["id"]] = self._new_id(
+                    "VariableCollectionId"
+                )
+                mode_id = self._new_id("ModeId")
+                if "initialModeId" in entry:
+                    created[entry["initialModeId"]] = mode_id
+                self.collections[collection_id] = {
+                    "id": collection_id,
+                    "name": entry["name"],
+                    "modes": {mode_id: "Mode 1"},
+                    "defaultModeId": mode_id,
+                }
+                self.modes[mode_id] = collection_id
+            elif entry["action"] == "UPDATE":
+                collection_id = existing(self.collections, entry["id"], "collection")
+                self.collections[collection_id]["name"] = entry["name"]
+            else:
+                raise _MockError(400, f"unsupported action {entry['action']}")
+
+        for entry in body.get("variableModes", ()):
+            collection_id = existing(
+                self.collections, entry["variableCollectionId"], "collection"
+            )
+            if entry["action"] == "CREATE":
+                mode_id = created[entry["id"]] = self._new_id("ModeId")
+                self.modes[mode_id] = collection_id
+            else:
+                mode_id = existing(self.modes, entry["id"], "mode")
+            self.collections[collection_id]["modes"][mode_id] = entry["name"]
+
+        for entry in body.get("variables", ()):
+            if entry["action"] == "CREATE":
+                collection_id = existing(
+                    self.collections, entry["variableCollectionId"], "collection"
+                )
+                variable_id = created[entry["id"]] = self._new_id("VariableID")
+                self.variables[variable_id] = {
+                    "id": variable_id,
+                    "variableCollectionId": collection_id,
+                    "resolvedType": entry["resolvedType"],
+                    "valuesByMode": {},
+                }
+            else:
+                variable_id = existing(self.variables, entry["id"], "variable")
+            variable = self.variables[variable_id]
+            variable["name"] = entry["name"]
+            # Names are unique within a collection, like in Figma
+            collection_id = variable["variableCollectionId"]
+            for other in self.variables.values():
+                if (
+                    other is not variable
+                    and other["variableCollectionId"] == collection_id
+                    and other.get("name") == variable["name"]
+                ):
+                    raise _MockError(400, f"duplicate variable name {entry['name']}")
+
+        for entry in body.get("variableModeValues", ()):
+            variable = self.variables[
+                existing(self.variables, entry["variableId"], "variable")
+            ]
+            mode_id = existing(self.modes, entry["modeId"], "mode")
+            if self.modes[mode_id] != variable["variableCollectionId"]:
+                raise _MockError(400, f"mode {mode_id} is not in the collection")
+            value = entry["value"]
+            if _aliases([entry]):
+                value = {**value, "id": existing(self.variables, value["id"], "alias")}
+            variable["valuesByMode"][mode_id] = value
+        return created
+
+    def local_variables(self):
+        collections = {
+            collection_id: {
+                **collection,
+                "modes": [
+                    {"modeId": mode_id, "name": name}
+                    for mode_id, name in collection["modes"].items()
+                ],
+            }
+            for collection_id, collection in self.collections.items()
+        }
+        return {"variables": self.variables, "variableCollections": collections}
+
+
+def _mock_response(status, headers=None, **fields):
+    return status, {"status": status, "error": status != 200, **fields}, headers or {}
+
+
+class MockFigmaServer:
+    """
+    In-memory stand-in for the Figma variables endpoints.
+
+    Serves POST /v1/files/:file_key/variables (atomic, like Figma: a request
+    with an unknown id or a duplicate variable name changes nothing) and GET
+    /v1/files/:file_key/variables/local. Requests without an X-Figma-Token
+    header get 403.
+
+        with MockFigmaServer(rate_limit=(20, 1.0)) as mock:
+            push_payload(FigmaClient("token", mock.url), "file", payload)
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free one.
+        rate_limit (tuple): Optional (requests, seconds). Requests beyond the
+            limit in any window of that length get 429 with a Retry-After
+            header, in fractional seconds so tests stay fast.
+        latency (float): Seconds every request takes.
+
+    Attributes:
+        files (dict): File key -> state of its variables.
+        requests (int): Requests received.
+        rate_limited (int): Requests answered with 429.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, rate_limit=None, latency=0.0):
+        self.files = {}
+        self.requests = 0
+        self.rate_limited = 0
+        self.rate_limit = rate_limit
+        self.latency = latency
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        # A short poll interval lets stop() return without waiting half a second
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _retry_after(self):
+        # Seconds until the request would fit the window, or None
+        if self.rate_limit is None:
+            return None
+        limit, window = self.rate_limit
+        now = time.monotonic()
+        while self._recent and self._recent[0] <= now - window:
+            self._recent.popleft()
+        if len(self._recent) >= limit:
+            return self._recent[0] + window - now
+        self._recent.append(now)
+        return None
+
+    def handle(self, method, path, token, body):
+        """
+        Returns:
+            tuple: (status, response dict, extra headers).
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            if not token:
+                return _mock_response(403, message="Invalid token")
+            retry_after = self._retry_after()
+            if retry_after is not None:
+                self.rate_limited += 1
+                return _mock_response(429, {"Retry-After": f"{retry_after:.3f}"})
+
+            match = re.fullmatch(r"/v1/files/([^/]+)/variables(/local)?", path)
+            if match is None or (method == "POST") == bool(match.group(2)):
+                return _mock_response(404)
+            file_key = match.group(1)
+            if method == "GET":
+                file = self.files.get(file_key, _MockFile())
+                return _mock_response(200, meta=file.local_variables())
+
+            file = copy.deepcopy(self.files.get(file_key, _MockFile()))
+            try:
+                created = file.apply(body)
+            except _MockError as error:
+                return _mock_response(error.status, message=str(error))
+            except (KeyError, TypeError, AttributeError) as error:
+                return _mock_response(400, message=f"malformed request: {error}")
+            self.files[file_key] = file
+            return _mock_response(200, meta={"tempIdToRealId": created})
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = None
+                if length:
+                    try:
+                        body = json.loads(self.rfile.read(length))
+                    except ValueError:
+                        body = None
+                status, response, headers = mock.handle(
+                    self.command,
+                    self.path.split("?")[0],
+                    self.headers.get("X-Figma-Token"),
+                    body,
+                )
+                data = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Push design tokens to Figma.")
+    parser.add_argument("file_key", nargs="?", help="Figma file to push to")
+    parser.add_argument("--index", help="token_index.bin to push (default: repo)")
+    parser.add_argument("--name", default="figma-generator")
+    parser.add_argument("--brands", help="batch build directory to push every brand of")
+    parser.add_argument("--file-keys", help="JSON file mapping brand name -> file key")
+    parser.add_argument("--token", help=f"access token (default: ${TOKEN_VARIABLE})")
+    parser.add_argument("--api", default=FIGMA_API)
+    parser.add_argument("--state", help="push state file for resuming")
+    parser.add_argument("--workers", type=int, default=4, help="requests in flight")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument(
+        "--mock", action="store_true", help="push to a local mock instead of Figma"
+    )
+    args = parser.parse_args(argv)
+    if (args.brands is None) != (args.file_keys is None):
+        parser.error("--brands and --file-keys go together")
+    if args.brands is None and args.file_key is None:
+        parser.error("a file key or --brands is required")
+
+    mock = None
+    token, api = args.token or os.environ.get(TOKEN_VARIABLE), args.api
+    if args.mock:
+        mock = MockFigmaServer().start()
+        token, api = "mock", mock.url
+    elif not token:
+        parser.error(f"pass --token or set {TOKEN_VARIABLE}")
+    client = FigmaClient(token, api)
+    options = {"batch_size": args.batch_size, "max_workers": args.workers}
+
+    try:
+        if args.brands is not None:
+            summaries = push_brands(
+                client, args.brands, load_json(args.file_keys), **options
+            )
+        else:
+            typography = dict(DEFAULT_TYPOGRAPHY)
+            font_family = typography.pop("font_family")
+            if args.index:
+                index = TokenIndex.load(args.index)
+            else:
+                color_map = load_json(DEFAULT_COLOR_MAP_PATH)
+                themes = {
+                    theme: load_json(path)
+                    for theme, path in DEFAULT_THEME_PATHS.items()
+                }
+                index = TokenIndex.from_maps(color_map, themes)
+            model = ResolvedModel(
+                index, font_family, build_variations(**typography), args.name
+            )
+            state = PushState(args.state, args.file_key)
+            payload = figma_variables_payload(model)
+            summaries = {
+                args.name: push_payload(
+                    client, args.file_key, payload, state, **options
+                )
+            }
+    finally:
+        if mock is not None:
+            mock.stop()
+
+    for name, summary in summaries.items():
+        print(
+            f"{name}: sent {summary['sent']} of {summary['batches']} batches "
+            f"({summary['skipped']} already pushed) in {summary['seconds']:.2f}s"
+        )
+    if client.retries:
+        print(f"Retried {client.retries} requests")
+
+
+if __name__ == "__main__":
+    main()
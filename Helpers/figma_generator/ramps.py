@@ -0,0 +1,216 @@
+"""
+Lazy, memoized shade ramps.
+
+generate_palette computes every stop of every base color up front. A
+LazyPalette computes a shade the first time it is asked for, at any
+lightness between 0 and 100 rather than only the DEFAULT_SHADE_VALUES
+stops, and keeps it in a bounded LRU cache:
+
+    palette = LazyPalette({"primary": "ffc800"}, maxsize=4096)
+    palette["primary-455"]          # lightness 45.5, computed on first access
+    palette.shade("primary", 62.5)
+    palette.prefetch(DEFAULT_SHADE_VALUES)  # one array pass for a known stop set
+    palette.materialize()           # same dict as primitive_colors_map.json
+
+Shades are computed with generate_shade_grid, so a shade is the same color
+whether it comes from the lazy palette or from the full grid.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+from .palette import DEFAULT_SHADE_VALUES, generate_shade_grid, rgb_array_to_hex
+from .perceptual import COLOR_SPACES
+from .profiling import stage
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+DEFAULT_MAXSIZE = 4096
+
+
+def shade_key(color_name, shade):
+    """
+    Returns:
+        str: Primitive key of a shade, "<name>-<shade*10>" like
+        primitive_colors_map.json ("primary-400", "primary-455").
+    """
+    stop = round(shade * 10, 6)
+    if stop == int(stop):
+        stop = int(stop)
+    return f"{color_name}-{stop}"
+
+
+def parse_shade_key(key):
+    """
+    Splits a primitive key into its color name and lightness.
+
+    Returns:
+        tuple: (color name, shade in the range 0-100).
+
+    Raises:
+        ValueError: When the key does not end in a numeric stop.
+    """
+    color_name, _, stop = key.rpartition("-")
+    try:
+        shade = float(stop) / 10
+    except ValueError:
+        shade = None
+    if not color_name or shade is None:
+        raise ValueError(f"{key!r} is not a '<name>-<shade*10>' primitive key")
+    return color_name, shade
+
+
+class LazyPalette:
+    """
+    Primitive palette whose shades are computed on first access.
+
+    Thread-safe, so one instance can serve concurrent lookups.
+
+    Args:
+        colors (dict): Mapping of color name to base hex color.
+        color_space (str): "hsl", "oklch" or "lab", see generate_shade_grid.
+        maxsize (int): Shades kept in the LRU cache; None for no bound.
+    """
+
+    def __init__(self, colors, color_space="hsl", maxsize=DEFAULT_MAXSIZE):
+        if color_space not in COLOR_SPACES:
+            raise ValueError(
+                f"unknown color space {color_space!r}, expected one of {COLOR_SPACES}"
+            )
+        self.colors = dict(colors)
+        self.color_space = color_space
+        self.maxsize = maxsize
+        self._cache = OrderedDict()  # (color name, shade) -> hex
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check(self, color_names, shade_values):
+        for color_name in color_names:
+            if color_name not in self.colors:
+                raise KeyError(color_name)
+        for shade in shade_values:
+            if not 0 <= shade <= 100:
+                raise ValueError(f"shade {shade} is outside the range 0-100")
+
+    def _compute(self, missing):
+        # Shades of the missing (name, shade) pairs in one array pass over
+        # their names and stops, then cached
+        names = list(dict.fromkeys(name for name, _ in missing))
+        shades = list(dict.fromkeys(shade for _, shade in missing))
+        with stage("color_math", colors=len(names), shades=len(shades)):
+            grid = generate_shade_grid(
+                [self.colors[name] for name in names], shades, self.color_space
+            )
+        hex_values = iter(rgb_array_to_hex(grid))
+        computed = {
+            (name, shade): next(hex_values) for name in names for shade in shades
+        }
+        with self._lock:
+            self._cache.update(computed)
+            if self.maxsize is not None:
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        return computed
+
+    def _lookup(self, pairs):
+        # Hex of every (name, shade) pair, computing the missing ones together
+        found = {}
+        with self._lock:
+            for pair in pairs:
+                hex_value = self._cache.get(pair)
+                if hex_value is None:
+                    continue
+                self._cache.move_to_end(pair)
+                found[pair] = hex_value
+            missing = [pair for pair in pairs if pair not in found]
+            self.hits += len(pairs) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            found.update(self._compute(missing))
+        return found
+
+    def shade(self, color_name, shade):
+        """
+        Returns:
+            str: Hex color of color_name at lightness shade (0-100).
+
+        Raises:
+            KeyError: For an unknown color name.
+            ValueError: For a shade outside 0-100.
+        """
+        self._check((color_name,), (shade,))
+        pair = (color_name, shade)
+        return self._lookup([pair])[pair]
+
+    def __getitem__(self, key):
+        try:
+            color_name, shade = parse_shade_key(key)
+            return self.shade(color_name, shade)
+        except ValueError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        # Whether the key names a shade of this palette, computed or not
+        try:
+            color_name, shade = parse_shade_key(key)
+        except ValueError:
+            return False
+        return color_name in self.colors and 0 <= shade <= 100
+
+    def prefetch(self, shade_values=DEFAULT_SHADE_VALUES, color_names=None):
+        """
+        Computes a known set of stops ahead of use, in one array pass.
+
+        Args:
+            shade_values (list): Lightness stops in the range 0-100.
+            color_names (list): Colors to prefetch; all of them by default.
+
+        Returns:
+            int: Number of shades that were not cached yet.
+        """
+        color_names = list(self.colors if color_names is None else color_names)
+        self._check(color_names, shade_values)
+        with self._lock:
+            missing = [
+                (name, shade)
+                for name in color_names
+                for shade in shade_values
+                if (name, shade) not in self._cache
+            ]
+        if missing:
+            self._compute(missing)
+        return len(missing)
+
+    def materialize(self, shade_values=DEFAULT_SHADE_VALUES):
+        """
+        Builds the full primitive colors map.
+
+        Returns:
+            dict: Mapping of "<name>-<shade*10>" to hex, in the same order
+            and format as generate_palette and primitive_colors_map.json.
+        """
+        self._check((), shade_values)
+        pairs = [(name, shade) for name in self.colors for shade in shade_values]
+        found = self._lookup(pairs)
+        return {shade_key(name, shade): found[name, shade] for name, shade in pairs}
+
+    def cache_info(self):
+        """
+        Returns:
+            CacheInfo: hits, misses, maxsize and currsize, like
+            functools.lru_cache.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache))
+
+    def cache_clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,396 @@
+from .layout import Box, bounding_box, pack_shelves
+from .profiling import profiled, stage
+from .svg import Group, Label, Swatch, render_to_string, write_tree
+from .templates import TemplateNode, load_template, template_step
+from .tokens import UnresolvedTokenError
+
+# Define the recognized categories
+RECOGNIZED_CATEGORIES = [
+    "primary",
+    "secondary",
+    "tertiary",
+    "error",
+    "surface",
+    "background",
+]
+# Size of the built-in frames and the (column, row) gaps between them
+FRAME_SIZE = (500, 50)
+FRAME_GAPS = (0, 10)
+# Space between the light and dark themes
+THEME_GAP = 130
+
+
+def convert_to_sentence_case(name):
+    # Split the name by underscores, capitalize each part, then join back with spaces
+    return " ".join(word.capitalize() for word in name.split("_"))
+
+
+def _swatch_frame(name, color_code, fill_color):
+    label_attributes = ' dominant-baseline="middle"'
+    return Group(
+        name,
+        children=[
+            Swatch(name, fill_color),
+            Label(
+                f"{convert_to_sentence_case(name)} ({color_code})",
+                60,
+                25,
+                14,
+                attributes=label_attributes,
+            ),
+            Label(fill_color, 60, 40, 10, attributes=label_attributes),
+        ],
+        tag="svg",
+        attributes=' width="500" height="50" xmlns="http://www.w3.org/2000/svg"',
+        indent="\n        ",
+        tail="\n    ",
+    )
+
+
+# Slots filled for every token of a semantic template
+SEMANTIC_SLOTS = (
+    "id",
+    "x",
+    "y",
+    "swatch_id",
+    "fill",
+    "label",
+    "hex",
+    "name",
+    "primitive",
+)
+
+
+def _template_frame(template, name, color_code, fill_color):
+    return TemplateNode(
+        template,
+        {
+            "id": name,
+            "x": 0,
+            "y": 0,
+            "swatch_id": name,
+            "fill": fill_color,
+            "label": f"{convert_to_sentence_case(name)} ({color_code})",
+            "hex": fill_color,
+            "name": name,
+            "primitive": color_code,
+        },
+    )
+
+
+def _frame_builder(template):
+    # (name, (primitive, hex)) -> swatch frame, built-in or from a template
+    if template is None:
+        return lambda name, item: _swatch_frame(name, *item)
+    return lambda name, item: _template_frame(template, name, *item)
+
+
+def _load_semantic_template(template):
+    if template is None:
+        return None
+    template = load_template(template)
+    template.check_slots(SEMANTIC_SLOTS)
+    return template
+
+
+def create_svg_element(color_code, name, color_map):
+    """
+    Builds the swatch frame for one semantic token.
+
+    Args:
+        color_code (str): Primitive key the token points at.
+        name (str): Semantic token name, used as the frame and swatch id.
+        color_map (dict): Mapping of primitive key to hex color.
+
+    Returns:
+        Group: A nested <svg> frame holding the swatch and its labels.
+
+    Raises:
+        UnresolvedTokenError: If color_code is not in the color map.
+    """
+    fill_color = color_map.get(color_code)
+    if fill_color is None:
+        raise UnresolvedTokenError([(None, name, color_code)])
+    return _swatch_frame(name, color_code, fill_color)
+
+
+def create_svg_dynamic_for_figma(color_map, theme):
+    theme_svgs = {}
+    for key, value in theme.items():
+        # For each theme item, generate its SVG representation
+        theme_svgs[key] = create_svg_element(value, key, color_map)
+    return theme_svgs
+
+
+def get_category(name):
+    """
+    Determines the category of a semantic name.
+
+    Args:
+        name (str): Semantic token name, e.g. "on_primary_container".
+
+    Returns:
+        str: The first recognized category contained in the name, or "others".
+    """
+    for category in RECOGNIZED_CATEGORIES:
+        if category.lower() in name.lower():  # Case-insensitive match
+            return category
+    return "others"  # Default category if no match found
+
+
+@profiled("semantic.categorize")
+def group_svgs_by_theme_and_category(light_svgs, dark_svgs):
+    # Initialize theme structure with categories, including an "Others" category
+    themes = {
+        "light": {category: [] for category in RECOGNIZED_CATEGORIES + ["others"]},
+        "dark": {category: [] for category in RECOGNIZED_CATEGORIES + ["others"]},
+    }
+
+    # Helper function to categorize and group SVG elements under their theme and category
+    def categorize_and_group(theme_svgs, theme):
+        for name, svg_content in theme_svgs.items():
+            category = get_category(name)  # Determine the category for each name
+            themes[theme][category].append((name, svg_content))
+
+    # Categorize and group SVGs for both light and dark themes
+    categorize_and_group(light_svgs, "light")
+    categorize_and_group(dark_svgs, "dark")
+
+    return themes
+
+
+def _set_swatch_id(frame, new_id):
+    # The frame and the swatch rect inside it share the token id
+    if isinstance(frame, TemplateNode):
+        frame.values["id"] = frame.values["swatch_id"] = new_id
+        return
+    frame.id = new_id
+    frame.children[0].id = new_id
+
+
+def _category_group(theme, category, items, box, build_frame, row_step):
+    category_group = Group(f"{theme}/{category}", f"translate({box.x},{box.y})")
+    local_y_offset = 0
+    with stage("semantic.group", theme=theme, category=category):
+        for name, item in items:
+            # Generate a new ID based on theme, category, and name
+            new_id = f"{theme}/{category}/{name}"
+            frame = build_frame(name, item)
+            _set_swatch_id(frame, new_id)
+            category_group.append(
+                Group(
+                    new_id,
+                    f"translate(0, {local_y_offset})",
+                    children=[frame],
+                    indent="\n    ",
+                    tail="\n    ",
+                )
+            )
+            local_y_offset += row_step
+    return category_group
+
+
+def _frame_layout(template):
+    # (width, height) of a frame and the (column, row) gaps between frames
+    if template is None:
+        return FRAME_SIZE, FRAME_GAPS
+    size = (template_step(template.width, 0), template_step(template.height, 0))
+    return size, (20, 10)
+
+
+@profiled("semantic.layout")
+def layout_semantics(categorized_items, template=None, max_width=None):
+    """
+    Places the category columns of every theme.
+
+    Each theme's columns are packed into shelves no wider than max_width
+    (a single row by default), and the themes are stacked THEME_GAP apart.
+
+    Args:
+        categorized_items (dict): Output of group_svgs_by_theme_and_category.
+        template (SvgTemplate): Template the frames are built from, if any.
+        max_width (int): Canvas width for the columns of a theme.
+
+    Returns:
+        tuple: Theme -> (y offset, category -> Box) and the board's
+        (width, height).
+    """
+    (frame_width, frame_height), (gap_x, gap_y) = _frame_layout(template)
+    row_step = frame_height + gap_y
+    layout = {}
+    boxes = []
+    y_offset = 0
+    for theme, categories in categorized_items.items():
+        sizes = [
+            (frame_width, len(items) * row_step - gap_y) if items else (0, 0)
+            for items in categories.values()
+        ]
+        columns = pack_shelves(sizes, max_width, gap_x, row_step)
+        layout[theme] = (y_offset, dict(zip(categories, columns)))
+        width, height = bounding_box(columns)
+        boxes.append(Box(0, y_offset, width, height))
+        y_offset += height + THEME_GAP
+    return layout, bounding_box(boxes)
+
+
+@profiled("semantic.assemble")
+def build_semantics_tree(
+    categorized_items,
+    build_frame,
+    fragment_cache=None,
+    template=None,
+    max_width=None,
+):
+    """
+    Lays out the theme/category columns of the semantic board.
+
+    Args:
+        categorized_items (dict): Output of group_svgs_by_theme_and_category.
+        build_frame (callable): Turns a (name, item) pair into a swatch frame.
+        fragment_cache (FragmentCache): Optional cache of rendered category
+            columns. Items must be JSON-serializable when it is given, since
+            they form the cache key.
+        template (SvgTemplate): Template build_frame instantiates, if any.
+            The rows and columns are spaced by its size and it is part of
+            the fragment keys.
+        max_width (int): Canvas width the columns of a theme are packed
+            into, see layout_semantics.
+
+    Returns:
+        Group: The root <svg> node, sized to the bounding box of the
+        columns. Theme groups are built lazily while the tree is written.
+    """
+    layout, (board_width, board_height) = layout_semantics(
+        categorized_items, template, max_width
+    )
+    (_, frame_height), (_, gap_y) = _frame_layout(template)
+    row_step = frame_height + gap_y
+    key_parts = [] if template is None else [template.plan]
+
+    def theme_groups():
+        for theme, categories in categorized_items.items():
+            y_offset, columns = layout[theme]
+            theme_group = Group(theme, f"translate(0,{y_offset})")
+
+            for category, items in categories.items():
+                box = columns[category]
+                if fragment_cache is None:
+                    theme_group.append(
+                        _category_group(
+                            theme, category, items, box, build_frame, row_step
+                        )
+                    )
+                    continue
+                key = fragment_cache.key(
+                    "semantic", theme, category, items, box.x, box.y, *key_parts
+                )
+                if key in fragment_cache:
+                    theme_group.append(fragment_cache.node(key))
+                else:
+                    category_group = _category_group(
+                        theme, category, items, box, build_frame, row_step
+                    )
+                    theme_group.append(fragment_cache.store(key, category_group))
+
+            yield theme_group
+
+    return Group(
+        "semantics_container",
+        children=theme_groups(),
+        tag="svg",
+        attributes=f' xmlns="http://www.w3.org/2000/svg" width="{board_width}" height="{board_height}"',
+    )
+
+
+# Function to create and group SVG elements into a semantic container
+def group_svgs_into_semantics_container(categorized_svgs):
+    tree = build_semantics_tree(categorized_svgs, lambda name, frame: frame)
+    return render_to_string(write_tree, tree)
+
+
+def _theme_items(index, theme):
+    # Pair each primitive key with its fill so a color change invalidates
+    # the cached column that shows it
+    return {
+        name: (primitive, hex_value)
+        for name, primitive, hex_value in index.entries(theme)
+    }
+
+
+def write_semantic_svg(
+    out, index, fragment_cache=None, minify=False, template=None, max_width=None
+):
+    """
+    Streams the light and dark semantic themes to a text stream.
+
+    Only token names are grouped up front; each swatch frame is built right
+    before its theme is written.
+
+    Args:
+        out: Text stream with a write(str) method.
+        index (TokenIndex): Resolved tokens with "light" and "dark" themes.
+        fragment_cache (FragmentCache): Optional cache of rendered category
+            columns. Only columns whose tokens or colors changed are rebuilt.
+        minify (bool): Write the minified board, see SvgWriter. Cannot be
+            combined with a fragment cache.
+        template: Optional SvgTemplate or template path, such as
+            DEFAULT_TEMPLATES["semantic"], instantiated for every token. It
+            can bind the slots in SEMANTIC_SLOTS.
+        max_width (int): Canvas width the category columns of a theme are
+            packed into; by default they form a single row.
+    """
+    if minify and fragment_cache is not None:
+        raise ValueError("minified boards cannot use a fragment cache")
+    categorized_tokens = group_svgs_by_theme_and_category(
+        _theme_items(index, "light"), _theme_items(index, "dark")
+    )
+    template = _load_semantic_template(template)
+    tree = build_semantics_tree(
+        categorized_tokens,
+        _frame_builder(template),
+        fragment_cache,
+        template,
+        max_width,
+    )
+    write_tree(out, tree, minify)
+
+
+def render_semantic_svg(index, minify=False, template=None, max_width=None):
+    """
+    Renders the light and dark semantic themes into one board.
+
+    Args:
+        index (TokenIndex): Resolved tokens with "light" and "dark" themes.
+        minify (bool): Render the minified board, see SvgWriter.
+        template: Optional token component, see write_semantic_svg.
+        max_width (int): Canvas width for the category columns.
+
+    Returns:
+        str: The semantic.svg document.
+    """
+    return render_to_string(
+        write_semantic_svg,
+        index,
+        minify=minify,
+        template=template,
+        max_width=max_width,
+    )
+
+
+def render_token_svg(index, theme, name, template=None):
+    """
+    Renders the swatch frame of a single semantic token.
+
+    Args:
+        index (TokenIndex): Resolved tokens.
+        theme (str): Theme name.
+        name (str): Semantic token name.
+        template: Optional token component, see write_semantic_svg.
+
+    Returns:
+        str: The standalone <svg> frame.
+    """
+    token = index.token(theme, name)
+    build_frame = _frame_builder(_load_semantic_template(template))
+    frame = build_frame(name, (token.primitive, token.hex))
+    return render_to_string(write_tree, frame)
@@ -0,0 +1,307 @@
+"""
+Long-running token server.
+
+Keeps the palette and the resolved token index in memory and serves them over
+HTTP/1.1 with keep-alive. The primitive colors map and the semantic templates
+are polled for changes and reloaded in place; rendered responses are cached
+until the next reload, so repeated lookups are a dictionary hit.
+
+Routes (GET or HEAD):
+
+    /health                     "ok" plus the reload generation
+    /primitives                 primitive key -> hex
+    /primitives/<key>           one primitive
+    /tokens                     theme -> semantic name -> hex
+    /tokens/<theme>             semantic name -> hex, like *_theme_colors.json
+    /tokens/<theme>/<name>      name, primitive, hex, rgb and hsl of one token
+    /svg/semantic               the semantic.svg board
+    /svg/<theme>/<name>         the swatch frame of one token
+    /css/<theme>                the theme as CSS custom properties
+    /css/typography             custom_typography.css
+
+Usage:
+    python -m figma_generator.server --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from urllib.parse import unquote
+
+from .files import DEFAULT_COLOR_MAP_PATH, DEFAULT_THEME_PATHS, load_json
+from .semantic import render_semantic_svg, render_token_svg
+from .tokens import TokenIndex
+from .typography import DEFAULT_TYPOGRAPHY, build_variations, generate_css
+
+_REASONS = {
+    200: "OK",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class TokenStore:
+    """
+    In-memory palette and token index backed by JSON files on disk.
+
+    Args:
+        color_map_path (str): primitive_colors_map.json to serve.
+        theme_paths (dict): Theme name -> semantic template path.
+        typography (dict): Typography preferences, see DEFAULT_TYPOGRAPHY.
+    """
+
+    def __init__(self, color_map_path, theme_paths, typography=DEFAULT_TYPOGRAPHY):
+        self.color_map_path = color_map_path
+        self.theme_paths = dict(theme_paths)
+        self.typography = typography
+        self.generation = 0
+        self._stamps = None
+        # Stamps of the files a reload last failed on, so a broken edit is
+        # reported once rather than on every poll
+        self._failed_stamps = None
+        self._responses = {}
+        self.reload()
+
+    def _current_stamps(self):
+        paths = [self.color_map_path, *self.theme_paths.values()]
+        stamps = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Replaced by an editor; a missing file is a stamp of its own
+                stamps.append(None)
+                continue
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        return stamps
+
+    def reload(self):
+        # Build everything first so a bad edit leaves the old data in place
+        stamps = self._current_stamps()
+        color_map = load_json(self.color_map_path)
+        themes = {theme: load_json(path) for theme, path in self.theme_paths.items()}
+        index = TokenIndex.from_maps(color_map, themes)
+
+        self.color_map = color_map
+        self.index = index
+        self._stamps = stamps
+        self._responses = {}
+        self.generation += 1
+
+    def reload_if_changed(self):
+        """
+        Reloads when any watched file changed since the last load.
+
+        A reload that fails is not retried until the files change again.
+
+        Returns:
+            bool: Whether a reload happened.
+        """
+        stamps = self._current_stamps()
+        if stamps == self._stamps or stamps == self._failed_stamps:
+            return False
+        try:
+            self.reload()
+        except Exception:
+            self._failed_stamps = stamps
+            raise
+        self._failed_stamps = None
+        return True
+
+    def response(self, path):
+        """
+        Renders the response for a request path. Successful responses are
+        cached until the next reload.
+
+        Returns:
+            tuple: (status, content type, body bytes).
+        """
+        cached = self._responses.get(path)
+        if cached is None:
+            cached = self._render(path)
+            if cached[0] == 200:
+                self._responses[path] = cached
+        return cached
+
+    def _render(self, path):
+        parts = [unquote(part) for part in path.strip("/").split("/") if part]
+        index = self.index
+        try:
+            if parts == ["health"]:
+                return _json({"status": "ok", "generation": self.generation})
+            if parts == ["primitives"]:
+                return _json(self.color_map)
+            if len(parts) == 2 and parts[0] == "primitives":
+                return _json({"key": parts[1], "hex": self.color_map[parts[1]]})
+            if parts == ["tokens"]:
+                themes = {theme: index.theme_colors(theme) for theme in index.themes}
+                return _json(themes)
+            if len(parts) == 2 and parts[0] == "tokens":
+                return _json(index.theme_colors(parts[1]))
+            if len(parts) == 3 and parts[0] == "tokens":
+                return _json(index.token(parts[1], parts[2])._asdict())
+            if parts == ["svg", "semantic"]:
+                return _body(render_semantic_svg(index), "image/svg+xml")
+            if len(parts) == 3 and parts[0] == "svg":
+                svg = render_token_svg(index, parts[1], parts[2])
+                return _body(svg, "image/svg+xml")
+            if parts == ["css", "typography"]:
+                typography = dict(self.typography)
+                font_family = typography.pop("font_family")
+                css = generate_css(font_family, build_variations(**typography))
+                return _body(css, "text/css")
+            if len(parts) == 2 and parts[0] == "css":
+                declarations = "".join(
+                    f"  --{name.replace('_', '-')}: {hex_value};\n"
+                    for name, hex_value in index.theme_colors(parts[1]).items()
+                )
+                return _body(f":root {{\n{declarations}}}\n", "text/css")
+        except KeyError:
+            pass
+        return _json({"error": f"not found: {path}"}, 404)
+
+
+def _body(text, content_type, status=200):
+    return status, content_type, text.encode("utf-8")
+
+
+def _json(data, status=200):
+    return _body(json.dumps(data, separators=(",", ":")), "application/json", status)
+
+
+def _http_response(status, content_type, body, keep_alive, include_body=True):
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: {content_type}; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    ).encode("latin-1")
+    return head + body if include_body else head
+
+
+async def _handle_connection(store, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                break
+
+            keep_alive = version == "HTTP/1.1"
+            content_length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                name = name.strip().lower()
+                if name == "connection":
+                    keep_alive = value.strip().lower() == "keep-alive"
+                elif name == "content-length":
+                    try:
+                        content_length = int(value.strip())
+                    except ValueError:
+                        keep_alive = False
+                elif name == "transfer-encoding":
+                    # A chunked body is not parsed, so the connection cannot
+                    # be reused after it
+                    keep_alive = False
+
+            # Skip the body of a request, so it is not read as the next one
+            while content_length > 0:
+                skipped = await reader.read(min(content_length, 65536))
+                if not skipped:
+                    return
+                content_length -= len(skipped)
+
+            if method not in ("GET", "HEAD"):
+                status, content_type, body = _json(
+                    {"error": "method not allowed"}, 405
+                )
+            else:
+                try:
+                    status, content_type, body = store.response(target.split("?")[0])
+                except Exception as error:
+                    status, content_type, body = _json({"error": str(error)}, 500)
+
+            writer.write(
+                _http_response(status, content_type, body, keep_alive, method != "HEAD")
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _watch(store, interval):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if store.reload_if_changed():
+                print(f"Reloaded tokens (generation {store.generation})")
+        except Exception as error:
+            # Keep serving the last good data while a file is half written
+            print(f"Reload failed, keeping previous tokens: {error}")
+
+
+async def start_server(store, host="127.0.0.1", port=8000, poll_interval=0.5):
+    """
+    Starts serving a TokenStore and watching its files.
+
+    Args:
+        store (TokenStore): Data to serve.
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free one.
+        poll_interval (float): Seconds between checks for changed files.
+
+    Returns:
+        tuple: The asyncio.Server and the watcher task. Close the server and
+        cancel the task to stop.
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(store, reader, writer), host, port
+    )
+    watcher = asyncio.create_task(_watch(store, poll_interval))
+    return server, watcher
+
+
+async def serve(store, host="127.0.0.1", port=8000, poll_interval=0.5):
+    server, watcher = await start_server(store, host, port, poll_interval)
+    address = server.sockets[0].getsockname()
+    print(f"Serving tokens on http://{address[0]}:{address[1]}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resolved design tokens.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--color-map", default=DEFAULT_COLOR_MAP_PATH)
+    parser.add_argument("--light-theme", default=DEFAULT_THEME_PATHS["light"])
+    parser.add_argument("--dark-theme", default=DEFAULT_THEME_PATHS["dark"])
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    store = TokenStore(
+        args.color_map, {"light": args.light_theme, "dark": args.dark_theme}
+    )
+    try:
+        asyncio.run(serve(store, args.host, args.port, args.poll_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
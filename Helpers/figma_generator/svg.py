@@ -0,0 +1,316 @@
+import io
+import re
+
+from .profiling import stage
+
+# Presentation attributes that minified output moves into CSS classes
+_STYLE_ATTRIBUTES = re.compile(
+    r' (text-anchor|dominant-baseline|font-weight)="([^"]*)"'
+)
+
+
+class SvgWriter:
+    """
+    Streams SVG markup to a text stream as it is produced.
+
+    Groups are written as soon as they are opened and closed, so memory use
+    stays flat no matter how many tokens a board holds.
+
+    With minify=True nodes drop the template whitespace, nested <svg>
+    frames become plain groups, text styles become CSS classes and swatch
+    shapes become <use> references. The shared <style> and <defs> are
+    written right before the root element closes, once every style in the
+    document is known.
+
+    Args:
+        stream: Any object with a write(str) method, e.g. an open text file,
+            io.StringIO or socket.makefile("w").
+        minify (bool): Write the deduplicated, whitespace-free form.
+    """
+
+    def __init__(self, stream, minify=False):
+        self._write = stream.write
+        self._closing_tags = []
+        self.characters_written = 0
+        self.minify = minify
+        self._text_classes = {}
+        self._shapes = {}
+
+    @property
+    def depth(self):
+        # Number of elements currently open
+        return len(self._closing_tags)
+
+    def text_class(self, declarations):
+        # Class name for a CSS declaration block, registered on first use
+        return self._text_classes.setdefault(
+            declarations, f"t{len(self._text_classes)}"
+        )
+
+    def shape(self, width, height, radius):
+        # Id of a shared rounded rectangle, registered on first use
+        return self._shapes.setdefault(
+            (width, height, radius), f"r{len(self._shapes)}"
+        )
+
+    def _definitions(self):
+        markup = ""
+        if self._text_classes:
+            rules = "".join(
+                f".{name}{{{declarations}}}"
+                for declarations, name in self._text_classes.items()
+            )
+            markup += f"<style>{rules}</style>"
+        if self._shapes:
+            shapes = "".join(
+                f'<rect id="{name}" width="{width}" height="{height}" '
+                f'rx="{radius}" ry="{radius}"/>'
+                for (width, height, radius), name in self._shapes.items()
+            )
+            markup += f"<defs>{shapes}</defs>"
+        return markup
+
+    def write(self, markup):
+        # Write raw markup at the current position
+        self._write(markup)
+        self.characters_written += len(markup)
+
+    def open_tag(self, start_tag, end_tag):
+        # Write a start tag and remember the end tag that closes it
+        self.write(start_tag)
+        self._closing_tags.append(end_tag)
+
+    def open_svg(self, attributes):
+        self.open_tag(f"<svg {attributes}>", "</svg>")
+
+    def open_group(self, group_id, transform=None):
+        if transform is None:
+            self.open_tag(f'<g id="{group_id}">', "</g>")
+        else:
+            self.open_tag(f'<g id="{group_id}" transform="{transform}">', "</g>")
+
+    def close_tag(self):
+        if self.minify and len(self._closing_tags) == 1:
+            self.write(self._definitions())
+        self.write(self._closing_tags.pop())
+
+    def close(self):
+        # Close every element that is still open, innermost first
+        while self._closing_tags:
+            self.close_tag()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+
+class Markup:
+    """
+    Pre-rendered markup, e.g. a fragment reused from a build cache.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    def write(self, writer):
+        writer.write(self.text)
+
+
+class Swatch:
+    """
+    A rounded color rectangle.
+    """
+
+    __slots__ = ("id", "fill", "x", "y", "width", "height", "radius")
+
+    def __init__(self, id, fill, x=0, y=0, width=50, height=50, radius=4):
+        self.id = id
+        self.fill = fill
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.radius = radius
+
+    def write(self, writer):
+        if writer.minify:
+            shape = writer.shape(self.width, self.height, self.radius)
+            writer.write(
+                f'<use id="{self.id}" href="#{shape}" x="{self.x}" y="{self.y}" fill="{self.fill}"/>'
+            )
+            return
+        writer.write(
+            f'<rect id="{self.id}" width="{self.width}" height="{self.height}" fill="{self.fill}" x="{self.x}" y="{self.y}" rx="{self.radius}" ry="{self.radius}"/>'
+        )
+
+
+class Label:
+    """
+    A line of text. Extra markup such as text-anchor goes in attributes,
+    including its leading space.
+    """
+
+    __slots__ = ("text", "x", "y", "font_size", "fill", "font_family", "attributes")
+
+    def __init__(
+        self,
+        text,
+        x,
+        y,
+        font_size,
+        fill="black",
+        font_family="Arial",
+        attributes="",
+    ):
+        self.text = text
+        self.x = x
+        self.y = y
+        self.font_size = font_size
+        self.fill = fill
+        self.font_family = font_family
+        self.attributes = attributes
+
+    def write(self, writer):
+        if writer.minify:
+            self._write_minified(writer)
+            return
+        writer.write(
+            f'<text x="{self.x}" y="{self.y}" fill="{self.fill}" font-size="{self.font_size}" font-family="{self.font_family}"{self.attributes}>{self.text}</text>'
+        )
+
+    def _write_minified(self, writer):
+        # Styling goes to a shared class; other attributes such as ids stay
+        declarations = (
+            f"fill:{self.fill};font-size:{self.font_size}px;"
+            f'font-family:"{self.font_family}"'
+        )
+        for name, value in _STYLE_ATTRIBUTES.findall(self.attributes):
+            declarations += f";{name}:{value}"
+        attributes = _STYLE_ATTRIBUTES.sub("", self.attributes)
+        writer.write(
+            f'<text x="{self.x}" y="{self.y}" class="{writer.text_class(declarations)}"{attributes}>{self.text}</text>'
+        )
+
+
+class Group:
+    """
+    A container element, <g> by default or a nested <svg> frame.
+
+    Args:
+        id (str): Element id.
+        transform (str): Optional transform attribute, e.g. "translate(0, 60)".
+        children (list): Child nodes. Any iterable is accepted; a generator is
+            consumed once while writing, which keeps large boards streaming.
+        label (Label): Optional caption written right after the start tag.
+        tag (str): Element name.
+        attributes (str): Extra markup for the start tag, including its
+            leading space.
+        indent (str): Whitespace written before each child.
+        tail (str): Whitespace written before the end tag.
+    """
+
+    __slots__ = (
+        "id",
+        "transform",
+        "children",
+        "label",
+        "tag",
+        "attributes",
+        "indent",
+        "tail",
+    )
+
+    def __init__(
+        self,
+        id,
+        transform=None,
+        children=None,
+        label=None,
+        tag="g",
+        attributes="",
+        indent="",
+        tail="",
+    ):
+        self.id = id
+        self.transform = transform
+        self.children = [] if children is None else children
+        self.label = label
+        self.tag = tag
+        self.attributes = attributes
+        self.indent = indent
+        self.tail = tail
+
+    def append(self, node):
+        self.children.append(node)
+        return node
+
+    def write(self, writer):
+        if writer.minify:
+            self._write_minified(writer)
+            return
+        transform = "" if self.transform is None else f' transform="{self.transform}"'
+        writer.open_tag(
+            f'<{self.tag} id="{self.id}"{transform}{self.attributes}>',
+            f"</{self.tag}>",
+        )
+        if self.label is not None:
+            self.label.write(writer)
+        for child in self.children:
+            if self.indent:
+                writer.write(self.indent)
+            child.write(writer)
+        if self.tail:
+            writer.write(self.tail)
+        writer.close_tag()
+
+    def _write_minified(self, writer):
+        # Nested <svg> frames are flattened into groups; only the root keeps
+        # its tag and attributes
+        tag, attributes = self.tag, self.attributes
+        if tag == "svg" and writer.depth:
+            tag, attributes = "g", ""
+        transform = ""
+        if self.transform is not None:
+            transform = f' transform="{self.transform.replace(", ", ",")}"'
+        writer.open_tag(f'<{tag} id="{self.id}"{transform}{attributes}>', f"</{tag}>")
+        if self.label is not None:
+            self.label.write(writer)
+        for child in self.children:
+            child.write(writer)
+        writer.close_tag()
+
+
+def write_tree(out, node, minify=False):
+    """
+    Serializes a node tree to a text stream in a single pass.
+
+    Args:
+        out: Text stream with a write(str) method.
+        node: Root node, usually a Group.
+        minify (bool): Write the minified form, see SvgWriter.
+    """
+    with stage("svg.write", minify=minify) as current:
+        with SvgWriter(out, minify) as writer:
+            node.write(writer)
+        current.add_stream(out)
+
+
+def render_to_string(write_svg, *args, **kwargs):
+    """
+    Runs a streaming writer function against an in-memory buffer.
+
+    Args:
+        write_svg (callable): Function taking the output stream as its first
+            argument, such as write_palette_svg.
+
+    Returns:
+        str: Everything the writer produced.
+    """
+    buffer = io.StringIO()
+    write_svg(buffer, *args, **kwargs)
+    return buffer.getvalue()
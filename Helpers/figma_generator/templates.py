@@ -0,0 +1,234 @@
+"""
+SVG component templates for the boards.
+
+The components in Helpers/template_svg can replace the built-in swatch and
+label markup, so boards can be restyled by editing SVG instead of Python. A
+template marks its dynamic parts with data-bind attributes naming the slot
+that fills an attribute or the element's text:
+
+    <rect id="grey/1000" fill="#D10C0C" data-bind="id:swatch_id fill:fill"/>
+    <text x="30" y="1.5" data-bind="text:hex">#000000</text>
+
+The sample values stay in place, so a template still previews as a plain
+SVG. When the root binds its id, the static ids of the elements inside it
+are prefixed with that id ("shades" becomes "{id}/shades"), so the parts of
+every instance keep unique ids on the board. Bound attributes the element
+does not have yet are added. Each template is parsed once and compiled into
+a single str.format plan: comments and indentation are dropped, literal
+markup is escaped and every slot becomes a replacement field. Rendering an
+instance is one format_map call.
+"""
+
+import math
+import os
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+COMPONENT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "template_svg"
+)
+# Shipped component of each board
+DEFAULT_TEMPLATES = {
+    "palette": os.path.join(COMPONENT_DIR, "primitive_color_component.svg"),
+    "semantic": os.path.join(COMPONENT_DIR, "semantic_color_component.svg"),
+    "typography": os.path.join(COMPONENT_DIR, "typography_component.svg"),
+}
+
+BIND_ATTRIBUTE = "data-bind"
+_SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+_PREFIXES = {
+    "http://www.w3.org/1999/xlink": "xlink",
+    "http://www.w3.org/XML/1998/namespace": "xml",
+}
+
+
+def template_step(size, gap):
+    """
+    Whole-pixel distance between neighbouring instances of a template.
+    """
+    return math.ceil(size) + gap
+
+
+def _literal(text, quote=False):
+    # Escape markup and the braces str.format would read as fields
+    text = escape(text, {'"': "&quot;"} if quote else {})
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _name(name):
+    # "{namespace}local" -> "prefix:local" for attributes, "local" for tags
+    if not name.startswith("{"):
+        return name
+    namespace, _, local = name[1:].partition("}")
+    prefix = _PREFIXES.get(namespace)
+    return local if prefix is None else f"{prefix}:{local}"
+
+
+def _bindings(element):
+    # "id:swatch_id fill:fill text:hex" -> {"id": "swatch_id", ...}
+    bindings = {}
+    for binding in element.attrib.get(BIND_ATTRIBUTE, "").split():
+        target, _, slot = binding.partition(":")
+        if not target or not slot.isidentifier():
+            raise ValueError(f"invalid {BIND_ATTRIBUTE} entry {binding!r}")
+        bindings[target] = slot
+    return bindings
+
+
+class SvgTemplate:
+    """
+    A compiled SVG component.
+
+    Args:
+        source (str): Template markup with data-bind attributes.
+
+    Attributes:
+        plan (str): The compiled str.format plan.
+        slots (tuple): Slot names in the order they first appear.
+        width (float): Width of the root element.
+        height (float): Height of the root element.
+
+    Raises:
+        ValueError: If the markup is not well-formed, a binding is invalid or
+            the root element has no width and height.
+    """
+
+    def __init__(self, source):
+        try:
+            root = ET.fromstring(source)
+        except ET.ParseError as error:
+            raise ValueError(f"template is not well-formed: {error}") from None
+        try:
+            self.width = float(root.attrib["width"])
+            self.height = float(root.attrib["height"])
+        except (KeyError, ValueError):
+            raise ValueError("template root needs a numeric width and height")
+
+        self.slots = ()
+        # Slot of the root id, which prefixes the static ids inside it
+        self._id_slot = _bindings(root).get("id")
+        parts = []
+        self._compile(root, parts, is_root=True)
+        self.plan = "".join(parts)
+
+    def _slot(self, slot):
+        if slot not in self.slots:
+            self.slots += (slot,)
+        return f"{{{slot}}}"
+
+    def _compile(self, element, parts, is_root=False):
+        bindings = _bindings(element)
+        tag = _name(element.tag)
+        parts.append(f"<{tag}")
+        for name, value in element.attrib.items():
+            if name == BIND_ATTRIBUTE:
+                continue
+            name = _name(name)
+            slot = bindings.pop(name, None)
+            if slot is not None:
+                value = self._slot(slot)
+            elif name == "id" and not is_root and self._id_slot is not None:
+                value = f"{self._slot(self._id_slot)}/{_literal(value, True)}"
+            else:
+                value = _literal(value, True)
+            parts.append(f' {name}="{value}"')
+        text_slot = bindings.pop("text", None)
+        for name, slot in bindings.items():
+            parts.append(f' {name}="{self._slot(slot)}"')
+        if is_root and element.tag.startswith(f"{{{_SVG_NAMESPACE}}}"):
+            parts.append(f' xmlns="{_SVG_NAMESPACE}"')
+            if any(name.startswith("xlink:") for name in _attribute_names(element)):
+                parts.append(' xmlns:xlink="http://www.w3.org/1999/xlink"')
+
+        text = element.text if element.text and element.text.strip() else ""
+        if text_slot is not None:
+            text = self._slot(text_slot)
+        else:
+            text = _literal(text)
+        children = list(element)
+        if not text and not children:
+            parts.append("/>")
+            return
+        parts.append(f">{text}")
+        for child in children:
+            self._compile(child, parts)
+            if child.tail and child.tail.strip():
+                parts.append(_literal(child.tail))
+        parts.append(f"</{tag}>")
+
+    def check_slots(self, available):
+        """
+        Checks that every slot of the template can be filled.
+
+        Args:
+            available (iterable): Slot names the caller provides.
+
+        Raises:
+            ValueError: Listing the slots the caller does not provide.
+        """
+        available = set(available)
+        missing = [slot for slot in self.slots if slot not in available]
+        if missing:
+            raise ValueError(
+                f"template uses unknown slots {missing}; "
+                f"available: {sorted(available)}"
+            )
+
+    def render(self, values):
+        """
+        Instantiates the template.
+
+        Args:
+            values (dict): Slot name -> value. Values are inserted as they
+                are, like the text of the built-in labels; extra keys are
+                ignored.
+
+        Returns:
+            str: The instance markup.
+        """
+        return self.plan.format_map(values)
+
+
+def _attribute_names(root):
+    for element in root.iter():
+        for name in element.attrib:
+            yield _name(name)
+
+
+@lru_cache(maxsize=32)
+def _compile_file(path, mtime_ns):
+    with open(path, "r") as file:
+        return SvgTemplate(file.read())
+
+
+def load_template(template):
+    """
+    Loads and compiles a template file, once per file version.
+
+    Args:
+        template: Path of a template, or an SvgTemplate which is returned
+            unchanged.
+
+    Returns:
+        SvgTemplate: The compiled template.
+    """
+    if isinstance(template, SvgTemplate):
+        return template
+    path = os.path.abspath(template)
+    return _compile_file(path, os.stat(path).st_mtime_ns)
+
+
+class TemplateNode:
+    """
+    One instance of a compiled template in a board's node tree.
+    """
+
+    __slots__ = ("template", "values")
+
+    def __init__(self, template, values):
+        self.template = template
+        self.values = values
+
+    def write(self, writer):
+        writer.write(self.template.render(self.values))
@@ -0,0 +1,284 @@
+"""
+Resolved token index shared by the renderers and exporters.
+
+The index is built once from the primitive colors map and the semantic
+templates: semantic name -> primitive key -> hex -> RGB/HSL, for every theme.
+It can be saved to a compact binary snapshot and loaded back, optionally
+memory-mapped, without parsing any JSON.
+
+Snapshot layout (little endian):
+
+    header          "<8sIII": magic, primitive count, theme count,
+                    unresolved reference count
+    token counts    one uint32 per theme
+    string table    compact.pack_strings: primitive keys, then for each theme
+                    its name followed by its token names, then (theme,
+                    semantic name, primitive key) of every unresolved reference
+    rgb             uint8 [primitive count, 3], 4-byte aligned
+    references      int32 per token, index into the primitives or -1
+"""
+
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from .colors import hex_to_rgb
+from .compact import pack_strings, unpack_strings
+from .palette import rgb_array_to_hex, rgb_to_hsl_array
+from .profiling import profiled
+
+SNAPSHOT_MAGIC = b"FGTIDX02"
+_HEADER = struct.Struct("<8sIII")
+
+# Fallback fill for unresolved references when the index is not strict
+UNRESOLVED_HEX = "#FFFFFF"
+
+Token = namedtuple("Token", ["name", "primitive", "hex", "rgb", "hsl"])
+
+
+class UnresolvedTokenError(KeyError):
+    """
+    Raised when semantic tokens point at primitives that do not exist.
+
+    Attributes:
+        unresolved (list): (theme, semantic name, primitive key) tuples.
+    """
+
+    def __init__(self, unresolved):
+        self.unresolved = unresolved
+        details = ", ".join(
+            f"{theme}/{name} -> {reference}" for theme, name, reference in unresolved
+        )
+        super().__init__(f"{len(unresolved)} unresolved token reference(s): {details}")
+
+    def __str__(self):
+        return self.args[0]
+
+    def __reduce__(self):
+        # Rebuild from the tuples so the error survives a process pool
+        return type(self), (self.unresolved,)
+
+
+def _pad(size, alignment=4):
+    return -size % alignment
+
+
+class TokenIndex:
+    """
+    Semantic tokens of every theme resolved against one palette.
+
+    Build it with from_maps() or load(); the constructor takes the already
+    packed arrays.
+
+    Args:
+        primitives (list): Primitive keys, e.g. "primary-400".
+        rgb (numpy.ndarray): uint8 array of shape (len(primitives), 3).
+        themes (dict): Theme name -> list of semantic names.
+        references (dict): Theme name -> int32 array of primitive indices,
+            -1 for unresolved references.
+    """
+
+    def __init__(self, primitives, rgb, themes, references):
+        self.primitives = primitives
+        self.rgb = rgb
+        self.themes = themes
+        self.references = references
+        self._primitive_index = {key: i for i, key in enumerate(primitives)}
+        self._token_index = {
+            theme: {name: i for i, name in enumerate(names)}
+            for theme, names in themes.items()
+        }
+        self._hex = None
+        self._hsl = None
+        self.unresolved = []
+
+    @classmethod
+    @profiled("tokens.resolve")
+    def from_maps(cls, color_map, themes, strict=True):
+        """
+        Resolves every theme against the primitive colors map.
+
+        Args:
+            color_map (dict): Mapping of primitive key to hex color.
+            themes (dict): Theme name -> semantic template.
+            strict (bool): Raise UnresolvedTokenError for references to
+                missing primitives. When False they resolve to UNRESOLVED_HEX
+                and are listed in the index's unresolved attribute.
+
+        Returns:
+            TokenIndex: The resolved index.
+        """
+        primitives = list(color_map)
+        primitive_index = {key: i for i, key in enumerate(primitives)}
+        rgb = np.asarray(
+            [hex_to_rgb(color_map[key]) for key in primitives], dtype=np.uint8
+        ).reshape(len(primitives), 3)
+
+        unresolved = []
+        references = {}
+        for theme, template in themes.items():
+            refs = np.empty(len(template), dtype=np.int32)
+            for i, (name, reference) in enumerate(template.items()):
+                refs[i] = primitive_index.get(reference, -1)
+                if refs[i] < 0:
+                    unresolved.append((theme, name, reference))
+            references[theme] = refs
+
+        if unresolved and strict:
+            raise UnresolvedTokenError(unresolved)
+
+        index = cls(
+            primitives,
+            rgb,
+            {theme: list(template) for theme, template in themes.items()},
+            references,
+        )
+        index.unresolved = unresolved
+        return index
+
+    # Lookups
+    @property
+    def hex(self):
+        # Hex strings of every primitive, computed once in a single pass
+        if self._hex is None:
+            self._hex = rgb_array_to_hex(self.rgb)
+        return self._hex
+
+    @property
+    def hsl(self):
+        if self._hsl is None:
+            self._hsl = rgb_to_hsl_array(self.rgb)
+        return self._hsl
+
+    def primitive_hex(self, primitive):
+        return self.hex[self._primitive_index[primitive]]
+
+    def primitive_of(self, theme, name):
+        reference = int(self.references[theme][self._token_index[theme][name]])
+        return None if reference < 0 else self.primitives[reference]
+
+    def entries(self, theme):
+        """
+        Yields (semantic name, primitive key, hex) for every token of a theme,
+        in template order. Unresolved tokens have a None primitive.
+        """
+        hex_values = self.hex
+        references = self.references[theme].tolist()
+        for name, reference in zip(self.themes[theme], references):
+            if reference < 0:
+                yield name, None, UNRESOLVED_HEX
+            else:
+                yield name, self.primitives[reference], hex_values[reference]
+
+    def theme_colors(self, theme):
+        """
+        Returns:
+            dict: Semantic name -> hex, the shape of *_theme_colors.json.
+        """
+        return {name: hex_value for name, _, hex_value in self.entries(theme)}
+
+    def token(self, theme, name):
+        """
+        Looks up one semantic token.
+
+        Returns:
+            Token: name, primitive key, hex, RGB tuple and HSL tuple.
+        """
+        reference = int(self.references[theme][self._token_index[theme][name]])
+        if reference < 0:
+            raise UnresolvedTokenError([(theme, name, None)])
+        return Token(
+            name,
+            self.primitives[reference],
+            self.hex[reference],
+            tuple(self.rgb[reference].tolist()),
+            tuple(self.hsl[reference].tolist()),
+        )
+
+    # Binary snapshot
+    def save(self, path):
+        """
+        Writes the index as a binary snapshot.
+
+        Args:
+            path (str): Destination file.
+        """
+        theme_names = list(self.themes)
+        strings = list(self.primitives)
+        for theme in theme_names:
+            strings.append(theme)
+            strings.extend(self.themes[theme])
+        for unresolved in self.unresolved:
+            strings.extend(unresolved)
+
+        with open(path, "wb") as file:
+            file.write(
+                _HEADER.pack(
+                    SNAPSHOT_MAGIC,
+                    len(self.primitives),
+                    len(theme_names),
+                    len(self.unresolved),
+                )
+            )
+            file.write(
+                np.asarray(
+                    [len(self.themes[theme]) for theme in theme_names], dtype="<u4"
+                ).tobytes()
+            )
+            file.write(pack_strings(strings))
+            file.write(np.ascontiguousarray(self.rgb, dtype=np.uint8).tobytes())
+            file.write(b"\0" * _pad(file.tell()))
+            for theme in theme_names:
+                file.write(self.references[theme].astype("<i4").tobytes())
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """
+        Loads a binary snapshot written by save().
+
+        Args:
+            path (str): Snapshot file.
+            mmap (bool): Memory-map the color and reference arrays instead
+                of reading them into memory.
+
+        Returns:
+            TokenIndex: The loaded index.
+        """
+        if mmap:
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            with open(path, "rb") as file:
+                data = np.frombuffer(file.read(), dtype=np.uint8)
+
+        header = _HEADER.unpack_from(data)
+        magic, primitive_count, theme_count, unresolved_count = header
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a token index snapshot")
+        offset = _HEADER.size
+        token_counts = data[offset : offset + 4 * theme_count].view("<u4").tolist()
+        offset += 4 * theme_count
+        strings, offset = unpack_strings(data, offset)
+
+        rgb = data[offset : offset + 3 * primitive_count].reshape(primitive_count, 3)
+        offset += 3 * primitive_count
+        offset += _pad(offset)
+
+        primitives = strings[:primitive_count]
+        position = primitive_count
+        themes = {}
+        references = {}
+        for count in token_counts:
+            theme = strings[position]
+            themes[theme] = strings[position + 1 : position + 1 + count]
+            position += 1 + count
+            references[theme] = data[offset : offset + 4 * count].view("<i4")
+            offset += 4 * count
+
+        index = cls(primitives, rgb, themes, references)
+        index.unresolved = [
+            tuple(strings[start : start + 3])
+            for start in range(position, position + 3 * unresolved_count, 3)
+        ]
+        return index
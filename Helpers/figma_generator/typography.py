@@ -0,0 +1,662 @@
+import math
+from collections import Counter
+
+from .fonts import load_font_metrics
+from .profiling import profiled
+from .svg import Group, Label, render_to_string, write_tree
+from .templates import TemplateNode, load_template, template_step
+
+# Predefined user preferences
+DEFAULT_TYPOGRAPHY = {
+    "font_family": "Roboto",
+    "bold_weight": "700",
+    "regular_weight": "400",
+    "light_weight": "300",
+    "body_small_size": "12",
+    "body_small_line_height": "1.5",
+    "body_medium_size": "14",
+    "body_medium_line_height": "1.5",
+    "body_large_size": "16",
+    "body_large_line_height": "1.5",
+    "caption_size": "10",
+    "caption_line_height": "1.2",
+}
+# Resolved font family and variations of a batch brand, for the Figma push
+TYPOGRAPHY_FILENAME = "typography.json"
+
+
+def build_variations(
+    bold_weight,
+    regular_weight,
+    light_weight,
+    body_small_size,
+    body_small_line_height,
+    body_medium_size,
+    body_medium_line_height,
+    body_large_size,
+    body_large_line_height,
+    caption_size,
+    caption_line_height,
+):
+    return {
+        "Headings": {
+            "H1": ("36", "1.2", bold_weight),
+            "H2": ("32", "1.4", bold_weight),
+            "H3": ("28", "1.4", bold_weight),
+            "H4": ("24", "1.4", bold_weight),
+            "H5": ("20", "1.4", bold_weight),
+            "H6": ("16", "1.4", bold_weight),
+        },
+        "Bold": {
+            "Body Small": (body_small_size, body_small_line_height, bold_weight),
+            "Body Medium": (body_medium_size, body_medium_line_height, bold_weight),
+            "Body Large": (body_large_size, body_large_line_height, bold_weight),
+        },
+        "Regular": {
+            "Body Small": (body_small_size, body_small_line_height, regular_weight),
+            "Body Medium": (body_medium_size, body_medium_line_height, regular_weight),
+            "Body Large": (body_large_size, body_large_line_height, regular_weight),
+        },
+        "Light": {
+            "Body Small": (body_small_size, body_small_line_height, light_weight),
+            "Body Medium": (body_medium_size, body_medium_line_height, light_weight),
+            "Body Large": (body_large_size, body_large_line_height, light_weight),
+        },
+        "Captions": {
+            "Caption": (caption_size, caption_line_height, light_weight),
+            # Add other caption styles as needed
+        },
+    }
+
+
+# Modular scale step of every variation; Body Large and H6 sit on the base
+TYPE_SCALE_STEPS = {
+    "Headings": {"H1": 5, "H2": 4, "H3": 3, "H4": 2, "H5": 1, "H6": 0},
+    "Bold": {"Body Small": -2, "Body Medium": -1, "Body Large": 0},
+    "Regular": {"Body Small": -2, "Body Medium": -1, "Body Large": 0},
+    "Light": {"Body Small": -2, "Body Medium": -1, "Body Large": 0},
+    "Captions": {"Caption": -3},
+}
+# Base size and ratio at the widest viewport, and at the narrowest one for
+# the fluid clamp() sizes
+DEFAULT_TYPE_SCALE = {
+    "base_size": 16,
+    "ratio": 1.2,
+    "min_base_size": 14,
+    "min_ratio": 1.125,
+    "min_viewport": 320,
+    "max_viewport": 1280,
+}
+
+
+def modular_scale(base_size, ratio, step):
+    """
+    Returns:
+        float: The size step steps away from base_size on the scale.
+    """
+    return base_size * ratio**step
+
+
+def _format_number(value, digits=2):
+    return f"{round(value, digits):g}"
+
+
+def build_type_scale(
+    base_size=16,
+    ratio=1.2,
+    bold_weight="700",
+    regular_weight="400",
+    light_weight="300",
+    heading_line_height=1.2,
+    body_line_height=1.5,
+    baseline_grid=4,
+):
+    """
+    Generates the variations on a modular scale instead of fixed sizes.
+
+    Args:
+        base_size (float): Size of Body Large and H6 in px.
+        ratio (float): Ratio between neighbouring steps, e.g. 1.25 for a
+            major third.
+        bold_weight, regular_weight, light_weight (str): Font weights.
+        heading_line_height (float): Line height of headings and captions.
+        body_line_height (float): Line height of body text.
+        baseline_grid (int): Line heights are rounded up to a multiple of
+            this many px; 0 keeps them exact.
+
+    Returns:
+        dict: Groups of variations in the same shape as build_variations,
+        with sizes rounded to 0.01 px.
+    """
+    weights = {
+        "Headings": bold_weight,
+        "Bold": bold_weight,
+        "Regular": regular_weight,
+        "Light": light_weight,
+        "Captions": light_weight,
+    }
+    variations = {}
+    for group_name, steps in TYPE_SCALE_STEPS.items():
+        factor = body_line_height
+        if group_name in ("Headings", "Captions"):
+            factor = heading_line_height
+        group = variations[group_name] = {}
+        for variation_name, step in steps.items():
+            size = round(modular_scale(base_size, ratio, step), 2)
+            line = size * factor
+            if baseline_grid:
+                line = math.ceil(round(line / baseline_grid, 6)) * baseline_grid
+            group[variation_name] = (
+                _format_number(size),
+                _format_number(line / size, 3),
+                weights[group_name],
+            )
+    return variations
+
+
+def fluid_font_size(min_size, max_size, min_viewport=320, max_viewport=1280):
+    """
+    Builds a CSS clamp() that grows linearly with the viewport width.
+
+    Args:
+        min_size (float): Size in px at min_viewport and below.
+        max_size (float): Size in px at max_viewport and above.
+
+    Returns:
+        str: e.g. "clamp(0.875rem, 0.8333rem + 0.2083vw, 1rem)", in rem of
+        a 16 px root.
+    """
+    slope = (max_size - min_size) / (max_viewport - min_viewport)
+    intercept = min_size - slope * min_viewport
+    low, high = sorted((min_size, max_size))
+    return (
+        f"clamp({_format_number(low / 16, 4)}rem, "
+        f"{_format_number(intercept / 16, 4)}rem + "
+        f"{_format_number(slope * 100, 4)}vw, {_format_number(high / 16, 4)}rem)"
+    )
+
+
+def build_fluid_sizes(type_scale=None):
+    """
+    Computes a responsive clamp() font size for every scale step.
+
+    Args:
+        type_scale (dict): Overrides of DEFAULT_TYPE_SCALE. The sizes grow
+            from the min_base_size/min_ratio scale at min_viewport to the
+            base_size/ratio scale at max_viewport.
+
+    Returns:
+        dict: (group name, variation name) -> clamp() expression, for
+        generate_css.
+    """
+    scale = {**DEFAULT_TYPE_SCALE, **(type_scale or {})}
+    return {
+        (group_name, variation_name): fluid_font_size(
+            round(modular_scale(scale["min_base_size"], scale["min_ratio"], step), 2),
+            round(modular_scale(scale["base_size"], scale["ratio"], step), 2),
+            scale["min_viewport"],
+            scale["max_viewport"],
+        )
+        for group_name, steps in TYPE_SCALE_STEPS.items()
+        for variation_name, step in steps.items()
+    }
+
+
+def _slug(name):
+    return name.lower().replace(" ", "-")
+
+
+def css_class_names(variations):
+    """
+    Gives every variation a unique CSS class.
+
+    Variation names used by a single group keep their short class (".h1");
+    names shared by several groups, such as "Body Small" in Bold, Regular and
+    Light, are prefixed with the group (".bold-body-small"), like the slugs
+    of the token exporters.
+
+    Returns:
+        dict: (group name, variation name) -> class name.
+    """
+    uses = Counter(name for group in variations.values() for name in group)
+    return {
+        (group_name, variation_name): _slug(
+            variation_name
+            if uses[variation_name] == 1
+            else f"{group_name} {variation_name}"
+        )
+        for group_name, group_variations in variations.items()
+        for variation_name in group_variations
+    }
+
+
+def _css_rules(rules):
+    # Classes with the same declarations share a single rule
+    merged = {}
+    for class_name, declarations in rules.items():
+        merged.setdefault(tuple(declarations), []).append(f".{class_name}")
+    return [
+        (selectors, list(declarations))
+        for declarations, selectors in merged.items()
+        if declarations
+    ]
+
+
+def _format_css(blocks, minify, indent=""):
+    # blocks: (selectors, declarations) rules and (at-rule, blocks) groups
+    formatted = []
+    for selectors, body in blocks:
+        if isinstance(selectors, str):
+            inner = _format_css(body, minify, "" if minify else indent + "  ")
+            if minify:
+                formatted.append(f"{selectors}{{{inner}}}")
+            else:
+                formatted.append(f"{indent}{selectors} {{\n{inner}\n{indent}}}")
+        elif minify:
+            declarations = ";".join(f"{name}:{value}" for name, value in body)
+            formatted.append(f"{','.join(selectors)}{{{declarations}}}")
+        else:
+            declarations = "".join(
+                f"{indent}  {name}: {value};\n" for name, value in body
+            )
+            selector = f",\n{indent}".join(selectors)
+            formatted.append(f"{indent}{selector} {{\n{declarations}{indent}}}")
+    return ("" if minify else "\n\n").join(formatted)
+
+
+def generate_css(
+    font_family, variations, fluid_sizes=None, breakpoints=None, minify=False
+):
+    """
+    Generates the typography stylesheet.
+
+    Every variation gets its own class (see css_class_names). Declarations
+    all classes have in common, at least the font family and margin, are
+    written once in a shared base rule, and classes left with identical
+    declarations share a rule.
+
+    Args:
+        font_family (str): Font family of every class.
+        variations (dict): Output of build_variations or build_type_scale.
+        fluid_sizes (dict): Optional clamp() font sizes from
+            build_fluid_sizes, used instead of the fixed px sizes.
+        breakpoints (dict): Optional min-width (px) -> scale. Each adds a
+            media query multiplying the font sizes by its scale.
+        minify (bool): Drop comments and all optional whitespace.
+
+    Returns:
+        str: The stylesheet.
+    """
+    class_names = css_class_names(variations)
+    rules = {}
+    for (group_name, variation_name), class_name in class_names.items():
+        size, line_height, weight = variations[group_name][variation_name]
+        font_size = f"{size}px"
+        if fluid_sizes is not None:
+            font_size = fluid_sizes.get((group_name, variation_name), font_size)
+        rules[class_name] = [
+            ("font-size", font_size),
+            ("line-height", line_height),
+            ("font-weight", weight),
+            ("font-family", f"'{font_family}'"),
+            ("margin", "0"),
+        ]
+
+    # Declarations every class has move into one base rule
+    shared = []
+    if rules:
+        declaration_sets = [set(declarations) for declarations in rules.values()]
+        common = set.intersection(*declaration_sets)
+        shared = [item for item in next(iter(rules.values())) if item in common]
+    for declarations in rules.values():
+        declarations[:] = [item for item in declarations if item not in shared]
+
+    font_stack = f"'{font_family}',{'' if minify else ' '}sans-serif"
+    blocks = [(["body"], [("font-family", font_stack), ("margin", "0")])]
+    if shared:
+        blocks.append(([f".{name}" for name in rules], shared))
+    blocks += _css_rules(rules)
+
+    # JSON specs give the min-widths as strings
+    breakpoints = sorted(
+        (int(width), scale) for width, scale in (breakpoints or {}).items()
+    )
+    for min_width, scale in breakpoints:
+        scaled = {}
+        for (group_name, variation_name), class_name in class_names.items():
+            size = float(variations[group_name][variation_name][0]) * scale
+            scaled[class_name] = [("font-size", f"{_format_number(size)}px")]
+        blocks.append((f"@media (min-width:{min_width}px)", _css_rules(scaled)))
+
+    if minify:
+        return _format_css(blocks, True)
+    return f"/* Base settings */\n{_format_css(blocks, False)}\n"
+
+
+# Slots filled for every variation of a typography template
+TYPOGRAPHY_SLOTS = (
+    "id",
+    "x",
+    "y",
+    "name",
+    "size",
+    "line_height",
+    "weight",
+    "font_family",
+    "properties",
+)
+
+
+def _template_variation(template, variation_id, name, props, font_family, y):
+    size, line_height, weight = props
+    return TemplateNode(
+        template,
+        {
+            "id": variation_id,
+            "x": 20,
+            "y": y,
+            "name": name,
+            "size": size,
+            "line_height": line_height,
+            "weight": weight,
+            "font_family": font_family,
+            "properties": f"{size}px / W{weight}",
+        },
+    )
+
+
+# Typography board layout
+SAMPLE_TEXT = "The quick brown fox jumps over the lazy dog."
+LABEL_FONT = "Arial"
+GROUP_LABEL_SIZE = 28
+PROPERTIES_SIZE = 12
+BOARD_PADDING = 20
+LINE_SPACING = 8  # Between the lines of a variation
+VARIATION_SPACING = 24
+GROUP_SPACING = 48
+
+
+@profiled("typography.layout")
+def layout_typography(font_family, variations, font_dirs=None):
+    """
+    Places every line of the typography board from real font metrics.
+
+    Each baseline sits one ascent below the bottom of the line above, and
+    the sample line is one line height of its style below the name, so the
+    board's size is exact instead of estimated.
+
+    Args:
+        font_family (str): Font family used for the samples.
+        variations (dict): Groups of variations as returned by build_variations.
+        font_dirs (tuple): Font directories searched for the families, such
+            as fonts.font_dirs(). By default only the built-in metrics are
+            used, so the board does not depend on the installed fonts.
+
+    Returns:
+        tuple: Group name -> label baseline, (group, variation) -> (name,
+        sample, properties) baselines, and the board's (width, height).
+    """
+    font_dirs = () if font_dirs is None else tuple(font_dirs)
+    label_font = load_font_metrics(LABEL_FONT, 700, dirs=font_dirs)
+    properties_font = load_font_metrics(LABEL_FONT, 400, dirs=font_dirs)
+    name_font = load_font_metrics(font_family, 400, dirs=font_dirs)
+
+    labels, lines = {}, {}
+    y = BOARD_PADDING
+    right = 0
+    for group_name, group_variations in variations.items():
+        labels[group_name] = y + label_font.ascent(GROUP_LABEL_SIZE)
+        right = max(right, 10 + label_font.measure(group_name, GROUP_LABEL_SIZE))
+        y = labels[group_name] + label_font.descent(GROUP_LABEL_SIZE) + LINE_SPACING
+
+        for variation_name, (size, line_height, weight) in group_variations.items():
+            properties = f"{size}px / W{weight}"
+            size = float(size)
+            sample_font = load_font_metrics(font_family, weight, dirs=font_dirs)
+            name_y = y + name_font.ascent(size)
+            sample_y = name_y + max(
+                size * float(line_height),
+                name_font.descent(size) + sample_font.ascent(size),
+            )
+            properties_y = (
+                sample_y
+                + sample_font.descent(size)
+                + LINE_SPACING
+                + properties_font.ascent(PROPERTIES_SIZE)
+            )
+            lines[group_name, variation_name] = (name_y, sample_y, properties_y)
+            right = max(
+                right,
+                20 + name_font.measure(variation_name, size),
+                20 + sample_font.measure(SAMPLE_TEXT, size),
+                20 + properties_font.measure(properties, PROPERTIES_SIZE),
+            )
+            y = (
+                properties_y
+                + properties_font.descent(PROPERTIES_SIZE)
+                + VARIATION_SPACING
+            )
+        y += GROUP_SPACING - VARIATION_SPACING
+
+    height = y - GROUP_SPACING + BOARD_PADDING if variations else 0
+    return labels, lines, (math.ceil(right + BOARD_PADDING), math.ceil(height))
+
+
+@profiled("typography.assemble")
+def build_typography_tree(font_family, variations, template=None, font_dirs=None):
+    """
+    Builds the node tree for the typography board.
+
+    Args:
+        font_family (str): Font family used for the samples.
+        variations (dict): Groups of variations as returned by build_variations.
+        template: Optional SvgTemplate or template path, such as
+            DEFAULT_TEMPLATES["typography"], instantiated for every variation.
+            It can bind the slots in TYPOGRAPHY_SLOTS.
+        font_dirs (tuple): Font directories the board is measured with,
+            see layout_typography.
+
+    Returns:
+        Group: The root <svg> node, sized to fit every line. Groups are
+        built lazily while the tree is written.
+    """
+    if template is not None:
+        template = load_template(template)
+        template.check_slots(TYPOGRAPHY_SLOTS)
+        return _build_template_tree(font_family, variations, template, font_dirs)
+
+    labels, lines, (width, height) = layout_typography(
+        font_family, variations, font_dirs
+    )
+
+    def variation_groups():
+        for group_name, group_variations in variations.items():
+            # Normalize group name for ID (e.g., "Body Bold" -> "bold")
+            group_id = group_name.lower().replace(" ", "_")
+
+            # Main group label
+            group = Group(
+                group_id,
+                children=[
+                    Label(
+                        group_name,
+                        10,
+                        round(labels[group_name]),
+                        GROUP_LABEL_SIZE,
+                        fill="#02080A",
+                        attributes=' font-weight="bold"',
+                    )
+                ],
+                indent="\n  ",
+                tail="\n",
+            )
+
+            for variation_name, variation_props in group_variations.items():
+                # Normalize variation name for ID (e.g., "Body Small" -> "body/small")
+                variation_id = variation_name.lower().replace(" ", "/")
+                size, line_height, weight = variation_props
+                name_y, sample_y, properties_y = lines[group_name, variation_name]
+
+                # Individual variation group
+                group.append(
+                    Group(
+                        f"{group_id}/{variation_id}",
+                        children=[
+                            # Variation name
+                            Label(
+                                variation_name,
+                                20,
+                                round(name_y),
+                                size,
+                                fill="#02080A",
+                                font_family=font_family,
+                            ),
+                            # Example usage with detailed ID
+                            Label(
+                                SAMPLE_TEXT,
+                                20,
+                                round(sample_y),
+                                size,
+                                fill="#50616A",
+                                font_family=font_family,
+                                attributes=f' font-weight="{weight}" id="{group_id}/{variation_id}"',
+                            ),
+                            # Typography properties
+                            Label(
+                                f"{size}px / W{weight}",
+                                20,
+                                round(properties_y),
+                                PROPERTIES_SIZE,
+                                fill="#50616A",
+                            ),
+                        ],
+                        indent="\n    ",
+                        tail="\n  ",
+                    )
+                )
+
+            yield group
+
+    return Group(
+        "typography",
+        children=variation_groups(),
+        tag="svg",
+        attributes=f' width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg"',
+        indent="\n",
+        tail="\n",
+    )
+
+
+def _template_layout(variations, template, font_dirs):
+    # Like layout_typography, with every variation one template instance
+    font_dirs = () if font_dirs is None else tuple(font_dirs)
+    label_font = load_font_metrics(LABEL_FONT, 700, dirs=font_dirs)
+    element_spacing = template_step(template.height, 10)
+
+    labels, tops = {}, {}
+    y = BOARD_PADDING
+    right = 20 + template.width
+    for group_name, group_variations in variations.items():
+        labels[group_name] = y + label_font.ascent(GROUP_LABEL_SIZE)
+        right = max(right, 10 + label_font.measure(group_name, GROUP_LABEL_SIZE))
+        y = labels[group_name] + label_font.descent(GROUP_LABEL_SIZE)
+        bottom = y
+        y += LINE_SPACING
+        for variation_name in group_variations:
+            tops[group_name, variation_name] = y
+            bottom = y + template.height
+            y += element_spacing
+        y = bottom + GROUP_SPACING
+
+    height = y - GROUP_SPACING + BOARD_PADDING if variations else 0
+    return labels, tops, (math.ceil(right + BOARD_PADDING), math.ceil(height))
+
+
+def _build_template_tree(font_family, variations, template, font_dirs=None):
+    # Template instances are stacked at the template's height
+    labels, tops, (width, height) = _template_layout(variations, template, font_dirs)
+
+    def variation_groups():
+        for group_name, group_variations in variations.items():
+            group_id = group_name.lower().replace(" ", "_")
+            group = Group(
+                group_id,
+                children=[
+                    Label(
+                        group_name,
+                        10,
+                        round(labels[group_name]),
+                        GROUP_LABEL_SIZE,
+                        fill="#02080A",
+                        attributes=' font-weight="bold"',
+                    )
+                ],
+                indent="\n  ",
+                tail="\n",
+            )
+            for variation_name, variation_props in group_variations.items():
+                variation_id = variation_name.lower().replace(" ", "/")
+                group.append(
+                    _template_variation(
+                        template,
+                        f"{group_id}/{variation_id}",
+                        variation_name,
+                        variation_props,
+                        font_family,
+                        round(tops[group_name, variation_name]),
+                    )
+                )
+            yield group
+
+    return Group(
+        "typography",
+        children=variation_groups(),
+        tag="svg",
+        attributes=f' width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg"',
+        indent="\n",
+        tail="\n",
+    )
+
+
+def write_typography_svg(
+    out, font_family, variations, minify=False, template=None, font_dirs=None
+):
+    """
+    Streams every typography variation to a text stream.
+
+    Args:
+        out: Text stream with a write(str) method.
+        font_family (str): Font family used for the samples.
+        variations (dict): Groups of variations as returned by build_variations.
+        minify (bool): Write the minified board, see SvgWriter.
+        template: Optional variation component, see build_typography_tree.
+        font_dirs (tuple): Font directories, see layout_typography.
+    """
+    tree = build_typography_tree(font_family, variations, template, font_dirs)
+    write_tree(out, tree, minify)
+
+
+def render_typography_svg(
+    font_family, variations, minify=False, template=None, font_dirs=None
+):
+    """
+    Renders every typography variation into one board.
+
+    Args:
+        font_family (str): Font family used for the samples.
+        variations (dict): Groups of variations as returned by build_variations.
+        minify (bool): Render the minified board, see SvgWriter.
+        template: Optional variation component, see build_typography_tree.
+        font_dirs (tuple): Font directories, see layout_typography.
+
+    Returns:
+        str: The typography_variations.svg document.
+    """
+    return render_to_string(
+        write_typography_svg,
+        font_family,
+        variations,
+        minify=minify,
+        template=template,
+        font_dirs=font_dirs,
+    )
@@ -0,0 +1,88 @@
+import os
+import shutil
+
+import pytest
+
+from figma_generator import batch
+from figma_generator.files import load_json, save_json
+from figma_generator.fonts import font_dirs, font_index, read_font_metrics
+from figma_generator.palette import DEFAULT_COLORS
+
+
+@pytest.fixture
+def spec(tmp_path):
+    path = save_json(
+        str(tmp_path / "acme.json"),
+        {
+            "colors": DEFAULT_COLORS,
+            "derive_themes": {"dark_dimmed": {"base": "dark", "surface_offset": 6}},
+        },
+    )
+    return batch.load_brand_spec(path)
+
+
+def test_derived_themes_are_written(spec, tmp_path):
+    batch.generate_brand(spec, str(tmp_path / "build"))
+    brand_dir = tmp_path / "build" / "acme"
+    template = load_json(str(brand_dir / "dark_dimmed_theme_semantic.json"))
+    colors = load_json(str(brand_dir / "dark_dimmed_theme_colors.json"))
+    assert set(template) == set(colors)
+
+
+def test_fresh_build_does_not_derive_themes(spec, tmp_path, monkeypatch):
+    output_dir, cache_dir = str(tmp_path / "build"), str(tmp_path / "cache")
+    assert batch.generate_brand(spec, output_dir, cache_dir)
+
+    def derive_themes(*args):
+        raise AssertionError("themes derived although every artifact is fresh")
+
+    monkeypatch.setattr(batch, "derive_themes", derive_themes)
+    monkeypatch.setattr(batch, "generate_palette", derive_themes)
+    assert batch.generate_brand(spec, output_dir, cache_dir) == []
+    assert os.path.exists(os.path.join(output_dir, "acme", "light_theme_colors.json"))
+
+
+def _font_file():
+    installed = font_index(font_dirs())
+    for faces in installed.values():
+        for _, _, path, font_number in faces:
+            if font_number == 0 and path.lower().endswith(".ttf"):
+                return path
+    pytest.skip("no TrueType font installed")
+
+
+def test_font_dirs_opt_in_keys_the_typography_board(tmp_path):
+    font_dir = tmp_path / "fonts"
+    font_dir.mkdir()
+    font = shutil.copy(_font_file(), font_dir)
+    family = read_font_metrics(font).family
+    spec_path = save_json(
+        str(tmp_path / "acme.json"),
+        {"colors": DEFAULT_COLORS, "typography": {"font_family": family}},
+    )
+    output_dir, cache_dir = str(tmp_path / "build"), str(tmp_path / "cache")
+    board = os.path.join(output_dir, "acme", "typography_variations.svg")
+
+    batch.generate_brand(batch.load_brand_spec(spec_path), output_dir, cache_dir)
+    with open(board) as file:
+        builtin = file.read()
+
+    spec = batch.load_brand_spec(spec_path, [str(font_dir)])
+    assert spec["font_dirs"] == (str(font_dir),)
+    assert board in batch.generate_brand(spec, output_dir, cache_dir)
+    with open(board) as file:
+        assert file.read() != builtin
+    assert batch.generate_brand(spec, output_dir, cache_dir) == []
+
+    # The spec key, relative to the spec file, takes precedence
+    keyed = save_json(
+        str(tmp_path / "keyed.json"), {"colors": DEFAULT_COLORS, "font_dirs": ["fonts"]}
+    )
+    assert batch.load_brand_spec(keyed, ["elsewhere"])["font_dirs"] == (
+        os.path.join(str(tmp_path), "fonts"),
+    )
+
+    # A changed font file rebuilds the board
+    stat = os.stat(font)
+    os.utime(font, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert batch.generate_brand(spec, output_dir, cache_dir) == [board]
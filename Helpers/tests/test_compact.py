@@ -0,0 +1,48 @@
+import pytest
+
+from figma_generator.compact import (
+    load_color_maps,
+    pack_strings,
+    save_color_maps,
+    unpack_strings,
+)
+from figma_generator.tokens import TokenIndex, UNRESOLVED_HEX
+
+PRIMITIVES = {"grey-0": "#000000", "grey-variant-400": "#6b6b80", "white": "#fff"}
+
+
+def test_string_table_round_trip():
+    data = b"head" + pack_strings(["a", "", "grey-variant", "ü"])
+    assert len(data) % 4 == 0
+    assert unpack_strings(data, 4) == (["a", "", "grey-variant", "ü"], len(data))
+    assert unpack_strings(pack_strings([]), 0) == ([], 8)
+    with pytest.raises(ValueError):
+        pack_strings(["two\nlines"])
+
+
+def test_color_maps_round_trip(tmp_path):
+    maps = {
+        "primitive_colors_map": PRIMITIVES,
+        "light_theme_colors": {"primary": "#000000", "on_primary": "#FFFFFF"},
+    }
+    path = save_color_maps(str(tmp_path / "maps.bin"), maps)
+    assert load_color_maps(path) == maps
+    assert load_color_maps(path, mmap=True) == maps
+
+
+def test_snapshot_keeps_unresolved_references(tmp_path):
+    themes = {
+        "light": {"surface": "grey-0", "primary": "primary-400"},
+        "dark": {"surface": "grey-variant-400"},
+    }
+    primitives = {"grey-0": "#000000", "grey-variant-400": "#6b6b80"}
+    index = TokenIndex.from_maps(primitives, themes, strict=False)
+    path = index.save(str(tmp_path / "token_index.bin"))
+    for loaded in (TokenIndex.load(path), TokenIndex.load(path, mmap=True)):
+        assert loaded.unresolved == [("light", "primary", "primary-400")]
+        assert loaded.theme_colors("light") == {
+            "surface": "#000000",
+            "primary": UNRESOLVED_HEX,
+        }
+        assert loaded.theme_colors("dark") == index.theme_colors("dark")
+        assert loaded.primitives == index.primitives
@@ -0,0 +1,92 @@
+import os
+import shutil
+
+from figma_generator import batch
+from figma_generator.diff import apply_patches, apply_svg_patch, diff_builds, svg_patch
+from figma_generator.files import load_json, save_json
+from figma_generator.palette import DEFAULT_COLORS, render_palette_svg
+from figma_generator.templates import DEFAULT_TEMPLATES
+
+
+def _spec(directory, **options):
+    os.makedirs(directory, exist_ok=True)
+    path = save_json(os.path.join(directory, "acme.json"), options)
+    return batch.load_brand_spec(path)
+
+
+def _contents(directory):
+    contents = {}
+    for filename in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, filename), "rb") as file:
+            contents[filename] = file.read()
+    return contents
+
+
+def test_repeated_ids_are_patched_by_occurrence():
+    swatches = '<g id="a"><rect fill="#000"/></g><g id="a"><rect fill="#111"/></g>'
+    old = f"<svg>{swatches}</svg>"
+    new = old.replace("#111", "#222")
+    patch = svg_patch(old, new)
+    assert patch == {"nodes": [["a", 1, '<g id="a"><rect fill="#222"/></g>']]}
+    assert apply_svg_patch(old, patch) == new
+
+
+def test_template_instances_are_patched_as_nodes():
+    colors = {"grey": "#808080", "primary": "#ffc800"}
+    template = DEFAULT_TEMPLATES["palette"]
+    old = render_palette_svg(colors, [10, 50, 90], template=template)
+    new = render_palette_svg(
+        {**colors, "primary": "#0055ff"}, [10, 50, 90], template=template
+    )
+    patch = svg_patch(old, new)
+    assert [node_id for node_id, _, _ in patch["nodes"]] == [
+        "primary-100",
+        "primary-500",
+        "primary-900",
+    ]
+    assert apply_svg_patch(old, patch) == new
+
+
+def test_patches_reproduce_the_new_build(tmp_path):
+    old_spec = _spec(str(tmp_path / "old"), colors=DEFAULT_COLORS, templates=True)
+    new_spec = _spec(
+        str(tmp_path / "new"),
+        colors={**DEFAULT_COLORS, "primary": "0055ff"},
+        templates=True,
+        derive_themes={"dark_dimmed": {"base": "dark", "surface_offset": 6}},
+    )
+    batch.generate_brand(old_spec, str(tmp_path / "old_build"))
+    batch.generate_brand(new_spec, str(tmp_path / "new_build"))
+    old_dir = str(tmp_path / "old_build" / "acme")
+    new_dir = str(tmp_path / "new_build" / "acme")
+    patch_dir = str(tmp_path / "patches")
+
+    diff_builds(old_dir, new_dir, patch_dir, "acme")
+    patch = load_json(os.path.join(patch_dir, "primitive_colors.svg.patch.json"))
+    assert patch["format"] == "svg-nodes"
+    new_file = load_json(
+        os.path.join(patch_dir, "dark_dimmed_theme_colors.json.patch.json")
+    )
+    assert new_file["format"] == "full"
+
+    copy_dir = str(tmp_path / "copy")
+    shutil.copytree(old_dir, copy_dir)
+    apply_patches(copy_dir, patch_dir)
+    assert _contents(copy_dir) == _contents(new_dir)
+
+
+def test_batch_patches_reproduce_the_rebuild(tmp_path):
+    output_dir, patch_dir = str(tmp_path / "build"), str(tmp_path / "patches")
+    old_spec = _spec(str(tmp_path / "old"), colors=DEFAULT_COLORS)
+    batch.generate_brand(old_spec, output_dir)
+    copy_dir = str(tmp_path / "copy")
+    shutil.copytree(os.path.join(output_dir, "acme"), copy_dir)
+
+    spec = _spec(
+        str(tmp_path / "new"),
+        colors={**DEFAULT_COLORS, "grey": "777777"},
+        breakpoints={"768": 1.125},
+    )
+    batch.generate_brand(spec, output_dir, patch_dir=patch_dir)
+    apply_patches(copy_dir, os.path.join(patch_dir, "acme"))
+    assert _contents(copy_dir) == _contents(os.path.join(output_dir, "acme"))
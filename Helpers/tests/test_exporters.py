@@ -0,0 +1,118 @@
+import json
+import os
+import re
+
+import pytest
+
+from figma_generator.exporters import (
+    EXPORTERS,
+    ResolvedModel,
+    export_tokens,
+    figma_variables_payload,
+)
+from figma_generator.derive import THEME_VARIANTS, derive_themes
+from figma_generator.files import DEFAULT_COLOR_MAP_PATH, DEFAULT_THEME_PATHS, load_json
+
+
+@pytest.fixture(scope="module")
+def model():
+    themes = {theme: load_json(path) for theme, path in DEFAULT_THEME_PATHS.items()}
+    return ResolvedModel.from_maps(load_json(DEFAULT_COLOR_MAP_PATH), themes)
+
+
+@pytest.fixture(scope="module")
+def derived_model():
+    color_map = load_json(DEFAULT_COLOR_MAP_PATH)
+    return ResolvedModel.from_maps(color_map, derive_themes(color_map, THEME_VARIANTS))
+
+
+def _tailwind_config(model):
+    source = EXPORTERS["tailwind"](model)["tailwind.tokens.js"]
+    return json.loads(source[len("module.exports = ") : -len(";\n")])
+
+
+def test_tailwind_keeps_every_ramp(model):
+    colors = _tailwind_config(model)["theme"]["extend"]["colors"]
+    for ramp, shades in model.ramps.items():
+        assert isinstance(colors[ramp], dict), ramp
+        for shade, _, hex_value in shades:
+            assert colors[ramp][shade] == hex_value
+
+
+def test_tailwind_semantic_colors(model):
+    colors = _tailwind_config(model)["theme"]["extend"]["colors"]
+    assert colors["primary"]["DEFAULT"] == "var(--primary)"
+    assert colors["on-primary"] == "var(--on-primary)"
+    assert colors["surface-container-high"] == "var(--surface-container-high)"
+
+
+def test_css_declares_primitives_and_themes(model):
+    css = EXPORTERS["css"](model)["tokens.css"]
+    declared = set(re.findall(r"--([\w-]+):", css))
+    assert set(model.primitives) <= declared
+    assert ':root,\n[data-theme="light"] {' in css
+    assert '[data-theme="dark"] {' in css
+    assert "--on-primary: var(--primary-1000);" in css
+
+
+def test_w3c_aliases_resolve(model):
+    tokens = json.loads(EXPORTERS["w3c"](model)["tokens.json"])
+    for theme in model.themes:
+        for name, primitive, hex_value in model.themes[theme]:
+            alias = tokens[theme][name]["$value"]
+            path = alias.strip("{}").split(".")
+            assert tokens[path[0]][path[1]][path[2]]["$value"] == hex_value
+
+
+def test_android_night_resources(model):
+    files = EXPORTERS["android"](model)
+    assert set(files) == {
+        "android/values/colors.xml",
+        "android/values-night/colors.xml",
+    }
+    assert "@color/primary_400" in files["android/values-night/colors.xml"]
+
+
+def test_android_leaves_out_variants_without_a_qualifier(derived_model):
+    files = EXPORTERS["android"](derived_model)
+    assert set(files) == {
+        "android/values/colors.xml",
+        "android/values-night/colors.xml",
+    }
+
+
+def test_ios_maps_variants_to_appearances(derived_model):
+    files = EXPORTERS["ios"](derived_model)
+    colorset = json.loads(files["ios/Colors.xcassets/primary.colorset/Contents.json"])
+    appearances = [
+        tuple(
+            (entry["appearance"], entry["value"])
+            for entry in color.get("appearances", ())
+        )
+        for color in colorset["colors"]
+    ]
+    assert appearances == [
+        (),
+        (("luminosity", "dark"),),
+        (("contrast", "high"),),
+        (("luminosity", "dark"), ("contrast", "high")),
+    ]
+
+
+def test_figma_payload_aliases_known_variables(model):
+    payload = figma_variables_payload(model)
+    ids = {variable["id"] for variable in payload["variables"]}
+    for mode_value in payload["variableModeValues"]:
+        value = mode_value["value"]
+        if isinstance(value, dict) and value.get("type") == "VARIABLE_ALIAS":
+            assert value["id"] in ids
+
+
+def test_export_tokens_writes_every_format(model, tmp_path):
+    written = export_tokens(model, str(tmp_path))
+    assert all(os.path.exists(path) for path in written)
+    assert (tmp_path / "tailwind.tokens.js").exists()
+    palette = tmp_path / "ios" / "Colors.xcassets" / "Palette"
+    assert (palette / "grey-0.colorset" / "Contents.json").exists()
+    with pytest.raises(ValueError):
+        export_tokens(model, str(tmp_path), formats=["sketch"])
@@ -0,0 +1,54 @@
+import io
+
+import pytest
+
+from figma_generator.nearest import PaletteIndex, rewrite_css
+
+PALETTE = {"grey-700": "#aabbcc", "primary-400": "#ffc800"}
+
+
+def _rewrite(css, **options):
+    out = io.StringIO()
+    count = rewrite_css(io.StringIO(css), out, PaletteIndex(PALETTE), **options)
+    return out.getvalue(), count
+
+
+def test_nearest_matches_palette_tokens():
+    match, near = PaletteIndex(PALETTE).nearest(["#aabbcc", "#ffc700"])
+    assert (match.key, match.distance) == ("grey-700", 0)
+    assert near.key == "primary-400"
+
+
+def test_nearest_rejects_empty_palette():
+    with pytest.raises(ValueError):
+        PaletteIndex({}).nearest(["#ffffff"])
+
+
+def test_rewrites_declaration_values_only():
+    source = "#abc { color: #abc; }\n.a { border: 1px solid\n  #ffc801; }\n"
+    css, count = _rewrite(source)
+    assert css == (
+        "#abc { color: var(--grey-700); }\n"
+        ".a { border: 1px solid\n  var(--primary-400); }\n"
+    )
+    assert count == 2
+
+
+def test_selector_list_in_media_block_is_kept():
+    source = (
+        "@media (max-width: 600px) {\n"
+        "  a:hover,\n"
+        "  #abc,\n"
+        "  .x { color: #abc; }\n"
+        "}\n"
+    )
+    css, count = _rewrite(source, replace="hex")
+    assert "  #abc,\n" in css
+    assert "color: #aabbcc;" in css
+    assert count == 1
+
+
+def test_max_distance_leaves_far_colors():
+    css, count = _rewrite(".a { color: #000000; }\n", max_distance=0.05)
+    assert css == ".a { color: #000000; }\n"
+    assert count == 0
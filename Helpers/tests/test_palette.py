@@ -0,0 +1,27 @@
+import pytest
+
+from figma_generator.palette import (
+    DEFAULT_COLORS,
+    DEFAULT_SHADE_VALUES,
+    generate_palette,
+    hex_to_rgb_array,
+)
+from figma_generator.perceptual import COLOR_SPACES
+
+
+@pytest.mark.parametrize("color_space", COLOR_SPACES)
+def test_every_color_space_accepts_the_default_colors(color_space):
+    palette = generate_palette(DEFAULT_COLORS, DEFAULT_SHADE_VALUES, color_space)
+    assert len(palette) == len(DEFAULT_COLORS) * len(DEFAULT_SHADE_VALUES)
+    assert all(len(value) == 7 for value in palette.values())
+
+
+def test_default_error_color_keeps_the_legacy_ramp():
+    assert generate_palette(DEFAULT_COLORS)["error-500"] == "#fa7d04"
+    legacy, spelled_out = hex_to_rgb_array(["f87c4", DEFAULT_COLORS["error"]])
+    assert legacy.tolist() == spelled_out.tolist()
+
+
+def test_perceptual_spaces_reject_malformed_colors():
+    with pytest.raises(ValueError):
+        generate_palette({"error": "f87c4"}, [50], "oklch")
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from figma_generator import batch
+from figma_generator.exporters import ResolvedModel, figma_variables_payload
+from figma_generator.files import (
+    DEFAULT_COLOR_MAP_PATH,
+    DEFAULT_THEME_PATHS,
+    load_json,
+    save_json,
+)
+from figma_generator.palette import DEFAULT_COLORS
+from figma_generator.push import (
+    FigmaClient,
+    FigmaError,
+    MockFigmaServer,
+    PushState,
+    plan_batches,
+    push_brands,
+    push_payload,
+)
+from figma_generator.typography import TYPOGRAPHY_FILENAME
+
+BATCH_SIZE = 200
+
+
+@pytest.fixture(scope="module")
+def payload():
+    themes = {theme: load_json(path) for theme, path in DEFAULT_THEME_PATHS.items()}
+    model = ResolvedModel.from_maps(load_json(DEFAULT_COLOR_MAP_PATH), themes)
+    return figma_variables_payload(model)
+
+
+def _batch_count(payload):
+    return sum(len(level) for level in plan_batches(payload, BATCH_SIZE))
+
+
+def test_resumed_push_skips_every_batch(payload, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    with MockFigmaServer() as mock:
+        client = FigmaClient("token", mock.url)
+        first = push_payload(
+            client, "file", payload, PushState(state_path, "file"), BATCH_SIZE
+        )
+        assert first["sent"] == first["batches"] == _batch_count(payload)
+        variables = client.local_variables("file")["meta"]["variables"]
+        assert len(variables) == len(payload["variables"])
+        requests = mock.requests
+
+        resumed = push_payload(
+            client, "file", payload, PushState(state_path, "file"), BATCH_SIZE
+        )
+        assert (resumed["sent"], resumed["skipped"]) == (0, first["batches"])
+        assert mock.requests == requests
+
+
+def test_state_of_another_file_is_ignored(payload, tmp_path):
+    state_path = str(tmp_path / "state.json")
+    with MockFigmaServer() as mock:
+        client = FigmaClient("token", mock.url)
+        push_payload(client, "file", payload, PushState(state_path, "file"), BATCH_SIZE)
+        other = push_payload(
+            client, "other", payload, PushState(state_path, "other"), BATCH_SIZE
+        )
+        assert other["skipped"] == 0
+
+
+def test_rate_limited_requests_are_retried(payload):
+    with MockFigmaServer(rate_limit=(2, 0.05)) as mock:
+        client = FigmaClient("token", mock.url, backoff=0.01)
+        summary = push_payload(client, "file", payload, batch_size=BATCH_SIZE)
+        assert summary["sent"] == _batch_count(payload)
+        assert mock.rate_limited > 0
+        assert client.retries == mock.rate_limited
+        variables = client.local_variables("file")["meta"]["variables"]
+        assert len(variables) == len(payload["variables"])
+
+
+def test_errors_that_retrying_cannot_fix_are_raised():
+    with MockFigmaServer() as mock:
+        client = FigmaClient("", mock.url)
+        with pytest.raises(FigmaError) as error:
+            client.local_variables("file")
+        assert error.value.status == 403
+        assert mock.requests == 1
+
+
+def test_brands_are_pushed_with_their_own_typography(tmp_path):
+    build_dir = str(tmp_path / "build")
+    type_scales = {"a": {"base_size": 16, "ratio": 1.2}, "b": {"base_size": 20}}
+    for name, type_scale in type_scales.items():
+        spec_path = save_json(
+            str(tmp_path / f"{name}.json"),
+            {"colors": DEFAULT_COLORS, "type_scale": type_scale},
+        )
+        batch.generate_brand(batch.load_brand_spec(spec_path), build_dir)
+
+    with MockFigmaServer() as mock:
+        client = FigmaClient("token", mock.url)
+        file_keys = {"a": "file-a", "b": "file-b"}
+        push_brands(client, build_dir, file_keys, batch_size=BATCH_SIZE)
+        sizes = {}
+        for name, file_key in file_keys.items():
+            variables = client.local_variables(file_key)["meta"]["variables"]
+            h1 = next(
+                variable
+                for variable in variables.values()
+                if variable["name"] == "Headings/H1/font-size"
+            )
+            (sizes[name],) = h1["valuesByMode"].values()
+            saved = load_json(os.path.join(build_dir, name, TYPOGRAPHY_FILENAME))
+            assert sizes[name] == float(saved["variations"]["Headings"]["H1"][0])
+    assert sizes["a"] != sizes["b"]
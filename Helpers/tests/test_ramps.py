@@ -0,0 +1,58 @@
+import pytest
+
+from figma_generator.palette import (
+    DEFAULT_COLORS,
+    DEFAULT_SHADE_VALUES,
+    generate_palette,
+)
+from figma_generator.ramps import LazyPalette, parse_shade_key, shade_key
+
+
+def test_shade_keys_round_trip():
+    assert parse_shade_key("primary-455") == ("primary", 45.5)
+    assert parse_shade_key("grey-variant-400") == ("grey-variant", 40.0)
+    assert shade_key("primary", 45.5) == "primary-455"
+    assert shade_key("primary", 40) == "primary-400"
+    with pytest.raises(ValueError):
+        parse_shade_key("primary")
+
+
+def test_lookup_by_key():
+    palette = LazyPalette({"primary": "ffc800"})
+    assert palette["primary-455"] == palette.shade("primary", 45.5)
+    assert "primary-455" in palette
+    assert "secondary-400" not in palette
+    assert palette.get("secondary-400") is None
+    with pytest.raises(KeyError):
+        palette["primary-2000"]
+
+
+def test_least_recently_used_shades_are_evicted():
+    palette = LazyPalette({"primary": "ffc800"}, maxsize=2)
+    palette.shade("primary", 10)
+    palette.shade("primary", 20)
+    palette.shade("primary", 10)
+    palette.shade("primary", 30)  # evicts 20, used least recently
+    assert palette.cache_info() == (1, 3, 2, 2)
+    palette.shade("primary", 10)
+    palette.shade("primary", 20)
+    assert palette.cache_info().hits == 2
+    assert palette.cache_info().misses == 4
+    palette.cache_clear()
+    assert palette.cache_info() == (0, 0, 2, 0)
+
+
+def test_prefetch_computes_only_missing_shades():
+    palette = LazyPalette({"primary": "ffc800", "grey": "6B7280"})
+    palette.shade("primary", 50)
+    assert palette.prefetch([40, 50]) == 3
+    assert palette.prefetch([40, 50]) == 0
+    assert palette.cache_info().currsize == 4
+
+
+@pytest.mark.parametrize("color_space", ["hsl", "oklch"])
+def test_materialize_matches_generate_palette(color_space):
+    palette = LazyPalette(DEFAULT_COLORS, color_space, maxsize=None)
+    materialized = palette.materialize()
+    expected = generate_palette(DEFAULT_COLORS, DEFAULT_SHADE_VALUES, color_space)
+    assert list(materialized.items()) == list(expected.items())
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+from figma_generator.files import DEFAULT_COLOR_MAP_PATH, DEFAULT_THEME_PATHS, load_json
+from figma_generator.server import TokenStore, start_server
+
+
+@pytest.fixture
+def store(tmp_path):
+    color_map_path = shutil.copy(DEFAULT_COLOR_MAP_PATH, tmp_path)
+    theme_paths = {
+        theme: shutil.copy(path, tmp_path)
+        for theme, path in DEFAULT_THEME_PATHS.items()
+    }
+    return TokenStore(color_map_path, theme_paths)
+
+
+async def _response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line == "\r\n":
+            break
+        name, _, value = line.partition(":")
+        headers[name.lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return status, headers, body
+
+
+def _serve(store, client):
+    # Runs client(host, port) against a server on a free port
+    async def run():
+        server, watcher = await start_server(store, port=0, poll_interval=0.02)
+        try:
+            host, port = server.sockets[0].getsockname()[:2]
+            return await client(host, port)
+        finally:
+            watcher.cancel()
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(run())
+
+
+def test_lookups_share_a_keep_alive_connection(store):
+    async def client(host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GET /tokens/light/primary HTTP/1.1\r\nHost: x\r\n\r\n")
+        first = await _response(reader)
+        writer.write(b"GET /primitives/primary-400 HTTP/1.1\r\nHost: x\r\n\r\n")
+        second = await _response(reader)
+        writer.close()
+        return first, second
+
+    (status, headers, body), (second_status, _, second_body) = _serve(store, client)
+    assert (status, headers["connection"]) == (200, "keep-alive")
+    token = json.loads(body)
+    assert token["primitive"] == "primary-400"
+    assert second_status == 200
+    assert json.loads(second_body)["hex"] == token["hex"]
+
+
+def test_request_bodies_are_skipped_after_a_405(store):
+    async def client(host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        body = b"GET /health HTTP/1.1\r\n\r\n"
+        writer.write(
+            b"POST /tokens HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+        )
+        rejected = await _response(reader)
+        writer.write(b"GET /health HTTP/1.1\r\n\r\n")
+        health = await _response(reader)
+        writer.write(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n")
+        await _response(reader)
+        trailing = await reader.read()
+        writer.close()
+        return rejected, health, trailing
+
+    (status, _, _), (health_status, _, _), trailing = _serve(store, client)
+    assert (status, health_status) == (405, 200)
+    assert trailing == b""
+
+
+def test_changed_color_map_is_reloaded(store):
+    async def client(host, port):
+        color_map = load_json(store.color_map_path)
+        color_map["primary-400"] = "#123456"
+        with open(store.color_map_path, "w") as file:
+            json.dump(color_map, file)
+        # Make sure the stamp changes even on coarse file system clocks
+        stat = os.stat(store.color_map_path)
+        os.utime(store.color_map_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        for _ in range(100):
+            if store.generation > 1:
+                break
+            await asyncio.sleep(0.02)
+
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"GET /tokens/light/primary HTTP/1.1\r\nConnection: close\r\n\r\n")
+        response = await _response(reader)
+        writer.close()
+        return response
+
+    status, _, body = _serve(store, client)
+    assert store.generation == 2
+    assert (status, json.loads(body)["hex"]) == (200, "#123456")
@@ -0,0 +1,34 @@
+import re
+from collections import Counter
+
+import pytest
+
+from figma_generator.palette import render_palette_svg
+from figma_generator.templates import DEFAULT_TEMPLATES, SvgTemplate
+
+_ID = re.compile(r' id="([^"]*)"')
+
+
+def test_static_ids_take_the_instance_id_as_prefix():
+    template = SvgTemplate(
+        '<svg id="Name" width="10" height="10" data-bind="id:id">'
+        '<g id="label"><text data-bind="text:hex">#000</text></g></svg>'
+    )
+    markup = template.render({"id": "grey-100", "hex": "#fafafa"})
+    assert _ID.findall(markup) == ["grey-100", "grey-100/label"]
+
+
+def test_template_palette_board_has_unique_ids():
+    board = render_palette_svg(
+        {"grey": "#808080", "primary": "#ffc800"},
+        [10, 50, 90],
+        template=DEFAULT_TEMPLATES["palette"],
+    )
+    ids = Counter(_ID.findall(board))
+    assert "grey-500/shades" in ids
+    assert [name for name, count in ids.items() if count > 1] == []
+
+
+def test_invalid_binding_is_rejected():
+    with pytest.raises(ValueError):
+        SvgTemplate('<svg width="1" height="1" data-bind="fill:not-a-slot"/>')
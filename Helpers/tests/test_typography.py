@@ -0,0 +1,43 @@
+import re
+
+import pytest
+
+from figma_generator.fonts import fallback_metrics, font_dirs, font_index
+from figma_generator.templates import DEFAULT_TEMPLATES, load_template
+from figma_generator.typography import (
+    DEFAULT_TYPOGRAPHY,
+    build_variations,
+    layout_typography,
+    render_typography_svg,
+)
+
+VARIATIONS = build_variations(
+    *(value for key, value in DEFAULT_TYPOGRAPHY.items() if key != "font_family")
+)
+
+
+def test_default_layout_uses_the_builtin_metrics():
+    assert layout_typography("Roboto", VARIATIONS) == layout_typography(
+        "Roboto", VARIATIONS, font_dirs=()
+    )
+
+
+def test_installed_fonts_are_used_only_when_asked_for():
+    installed = sorted(font_index(font_dirs()))
+    if not installed:
+        pytest.skip("no fonts installed")
+    family = installed[0]
+    default = layout_typography(family, VARIATIONS)
+    assert default == layout_typography("Roboto", VARIATIONS)
+    measured = layout_typography(family, VARIATIONS, font_dirs=font_dirs())
+    assert measured != default
+
+
+def test_template_board_is_laid_out_from_the_label_metrics():
+    template = load_template(DEFAULT_TEMPLATES["typography"])
+    board = render_typography_svg("Roboto", VARIATIONS, template=template)
+    label_y = int(re.search(r'<text x="10" y="(\d+)"', board).group(1))
+    assert label_y == round(20 + fallback_metrics(700).ascent(28))
+    height = int(re.search(r'height="(\d+)"', board).group(1))
+    instances = sum(len(group) for group in VARIATIONS.values())
+    assert height > instances * template.height